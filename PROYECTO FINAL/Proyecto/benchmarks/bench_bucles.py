@@ -0,0 +1,109 @@
+# bench_bucles.py
+# Modo tree con y sin especialización de bucles calientes: tiempo de
+# ejecución de varios programas dominados por bucles, con la salida de
+# ambas ejecuciones comparada para asegurar que es la misma.
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from compilador import create_executor, run_front_end
+
+# Sin indentación, el cuerpo de un bucle llega hasta el siguiente elif o
+# else: cada bucle va en su fase y el print final en la siguiente
+PROGRAMAS = {
+    "contador_while": '''for fase in range(2):
+    if fase == 0:
+        total = 0
+        i = 0
+        while i < {n}:
+            total = total + i * 2 % 7
+            i = i + 1
+    else:
+        print(total, i)
+''',
+    "for_anidado": '''for fase in range(2):
+    if fase == 0:
+        suma = 0.0
+        for i in range({raiz}):
+            for j in range({raiz}):
+                suma = suma + (i * j) / (j + 1) - i % 3
+    else:
+        print(suma)
+''',
+    "atributos": '''for fase in range(3):
+    if fase == 0:
+        class Punto:
+            def __init__(self, x, y):
+                self.x = x
+                self.y = y
+    elif fase == 1:
+        p = Punto(0, 0)
+        k = 0
+        while k < {n}:
+            p.x = p.x + 1
+            p.y = p.y + p.x % 5
+            k = k + 1
+    else:
+        print(p.x, p.y)
+''',
+    # v alterna entre float y str: las guardas fallan y el bucle se especializa de nuevo
+    "cambio_de_tipo": '''for ronda in range(20):
+    print(ronda, w)
+    v = ronda % 2 == 0 and ronda / 2 or "r"
+    r = 0
+    while r < {ronda}:
+        w = v * 2
+        r = r + 1
+''',
+}
+
+def prepare(code, specialize):
+    _, ast, analyzer = run_front_end(code)
+    if analyzer.errors:
+        raise SystemExit(f"❌ Errores semánticos en el programa de prueba: {analyzer.errors}")
+    executor = create_executor(ast.body, mode="tree")
+    if not specialize:
+        executor.specializer.detach()
+    return executor
+
+def run(code, specialize):
+    executor = prepare(code, specialize)
+    output = io.StringIO()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(output):
+        executor.run()
+    return time.perf_counter() - start, output.getvalue(), executor.specializer
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Especialización de bucles del modo tree")
+    arg_parser.add_argument("--iteraciones", type=int, default=300_000,
+                            help="iteraciones de los bucles de cada programa")
+    arg_parser.add_argument("--repeticiones", type=int, default=5)
+    args = arg_parser.parse_args()
+
+    n = args.iteraciones
+    sizes = {"n": n, "raiz": int(n ** 0.5), "ronda": n // 20}
+    print(f"{'programa':<16} {'interpretado':>13} {'especializado':>14} {'aceleración':>12} {'bucles':>7}")
+    for name, template in PROGRAMAS.items():
+        code = template.format(**sizes)
+        plain = special = None
+        for _ in range(args.repeticiones):
+            # Alternadas para que el ruido de la máquina afecte por igual a las dos
+            elapsed, plain_output, _ = run(code, False)
+            plain = elapsed if plain is None else min(plain, elapsed)
+            elapsed, output, specializer = run(code, True)
+            special = elapsed if special is None else min(special, elapsed)
+            if output != plain_output:
+                print(f"❌ {name}: la salida especializada no coincide con la interpretada")
+                sys.exit(1)
+        loops = sum(1 for state in specializer.loops.values() if state.versions)
+        print(f"{name:<16} {plain * 1000:>10.1f} ms {special * 1000:>11.1f} ms "
+              f"{plain / special:>11.1f}x {loops:>7}")
+
+if __name__ == "__main__":
+    main()
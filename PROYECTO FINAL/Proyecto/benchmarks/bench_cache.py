@@ -0,0 +1,88 @@
+# bench_cache.py
+# Arranque con y sin la caché de compilación: front end completo frente a
+# cargar el AST ya analizado desde disco (hash del fuente, mmap, marshal y
+# reconstrucción de los nodos).
+import argparse
+import marshal
+import os
+import subprocess
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cache_compilacion import HEADER_SIZE, CompilationCache
+from compilador import run_front_end
+from nodos import from_data
+
+# Sin errores semánticos (si no, no se guardaría) y sin cuerpos que se
+# traguen el resto del archivo
+PLANTILLA = '''valor_{n} = {n} * 2 + 1
+nombre_{n} = "elemento {n}"
+total_{n} = (valor_{n} + 3) * (valor_{n} - 1) % 7
+activo_{n} = total_{n} > 2 and valor_{n} != 0 or False
+class Clase{n}:
+    pass
+punto_{n} = Clase{n}()
+punto_{n}.x = valor_{n} / 2
+punto_{n}.x = punto_{n}.x + total_{n}
+print(nombre_{n}, punto_{n}.x, activo_{n})
+'''
+
+def build_source(lines):
+    block = PLANTILLA.count("\n")
+    return "".join(PLANTILLA.format(n=n) for n in range(lines // block + 1))
+
+def best(repeat, function):
+    return min(timeit.repeat(function, number=1, repeat=repeat))
+
+def process_ms(repeat, path, *flags):
+    # Proceso completo: arranque de Python, front end o caché y ejecución
+    command = [sys.executable, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                            "compilador.py"), "--modo", "tree", *flags, path]
+    return best(repeat, lambda: subprocess.run(command, stdout=subprocess.DEVNULL, check=True)) * 1000
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Arranque con y sin caché de compilación")
+    arg_parser.add_argument("--lineas", type=int, default=10_000)
+    arg_parser.add_argument("--repeticiones", type=int, default=5)
+    args = arg_parser.parse_args()
+
+    code = build_source(args.lineas)
+    lines = code.count("\n")
+    with tempfile.TemporaryDirectory() as directory:
+        cache = CompilationCache(directory)
+        _, program, _ = run_front_end(code)
+        cache.store(code, program)
+        with open(cache.path(cache.key(code)), "rb") as file:
+            payload = file.read()[HEADER_SIZE:]
+        if cache.load(code) != program:
+            print("❌ El AST cargado de la caché no coincide")
+            sys.exit(1)
+
+        front_end = best(args.repeticiones, lambda: run_front_end(code))
+        store = best(args.repeticiones, lambda: cache.store(code, program))
+        load = best(args.repeticiones, lambda: cache.load(code))
+        key = best(args.repeticiones, lambda: cache.key(code))
+        unmarshal = best(args.repeticiones, lambda: marshal.loads(payload))
+        rebuild = best(args.repeticiones, lambda: from_data(marshal.loads(payload))) - unmarshal
+
+        print(f"Entrada: {lines:,} líneas, {len(code) / 1024:.0f} KiB de fuente, "
+              f"{len(payload) / 1024:.0f} KiB en caché")
+        print(f"  front end completo        {front_end * 1000:8.1f} ms")
+        print(f"  guardar en caché (fallo)  {store * 1000:8.1f} ms")
+        print(f"  cargar de caché (acierto) {load * 1000:8.1f} ms  ({front_end / load:.1f}x)")
+        print(f"    hash del fuente         {key * 1000:8.1f} ms")
+        print(f"    marshal                 {unmarshal * 1000:8.1f} ms")
+        print(f"    reconstruir nodos       {rebuild * 1000:8.1f} ms")
+
+        path = os.path.join(directory, "programa.py")
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(code)
+        cold = process_ms(args.repeticiones, path, "--sin-cache")
+        warm = process_ms(args.repeticiones, path, "--dir-cache", directory)
+        print(f"\nProceso completo: sin caché {cold:.0f} ms, con caché {warm:.0f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# bench_entrada_salida.py
+# Programa que imprime muchas líneas en cada modo de ejecución, con print
+# directo (STANDARD_IO) y con la salida en buffer de ProgramIO. La salida
+# va a un archivo temporal, como al redirigirla, y se compara entre ambas.
+import argparse
+import contextlib
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from compilador import EXECUTION_MODES, create_executor, run_front_end
+from entrada_salida import FLUSH_POLICIES, FLUSH_SIZE, STANDARD_IO, ProgramIO
+
+PROGRAMA = '''for i in range({n}):
+    print(i, i * 2)
+'''
+
+def run(statements, mode, io, path):
+    executor = create_executor(statements, mode=mode, io=io)
+    with open(path, "w", encoding="utf-8") as output, contextlib.redirect_stdout(output):
+        start = time.perf_counter()
+        executor.run()
+        elapsed = time.perf_counter() - start
+    with open(path, "rb") as output:
+        return elapsed, output.read()
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Salida con buffer frente a print directo")
+    arg_parser.add_argument("--lineas", type=int, default=1_000_000, help="líneas que imprime el programa")
+    arg_parser.add_argument("--modos", nargs="+", choices=sorted(EXECUTION_MODES),
+                            default=["tree", "vm", "closures", "native"])
+    arg_parser.add_argument("--politica", choices=FLUSH_POLICIES, default=FLUSH_SIZE)
+    arg_parser.add_argument("--repeticiones", type=int, default=3)
+    args = arg_parser.parse_args()
+
+    _, ast, analyzer = run_front_end(PROGRAMA.format(n=args.lineas))
+    if analyzer.errors:
+        raise SystemExit(f"❌ Errores semánticos en el programa de prueba: {analyzer.errors}")
+
+    print(f"{args.lineas} líneas, política {args.politica}")
+    print(f"{'modo':<10} {'print':>12} {'buffer':>12} {'aceleración':>12}")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "salida.txt")
+        for mode in args.modos:
+            plain = buffered = None
+            for _ in range(args.repeticiones):
+                # Alternadas para que el ruido de la máquina afecte por igual a las dos
+                elapsed, plain_output = run(ast.body, mode, STANDARD_IO, path)
+                plain = elapsed if plain is None else min(plain, elapsed)
+                elapsed, output = run(ast.body, mode, ProgramIO(policy=args.politica), path)
+                buffered = elapsed if buffered is None else min(buffered, elapsed)
+                if output != plain_output:
+                    print(f"❌ {mode}: la salida con buffer no coincide con la de print")
+                    sys.exit(1)
+            print(f"{mode:<10} {plain * 1000:>9.1f} ms {buffered * 1000:>9.1f} ms {plain / buffered:>11.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# bench_incremental.py
+# Latencia por edición del front end incremental frente a re-analizar todo
+# el archivo, sobre una fuente de ~20k líneas.
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from compilador import Lexer, Parser
+from incremental import IncrementalDocument
+
+PLANTILLA = '''valor_{n} = {n} * 2 + 1
+nombre_{n} = "elemento {n}"
+print(valor_{n}, nombre_{n})
+class Clase{n}:
+    pass
+resultado_{n} = valor_{n} % 7 == 3
+'''
+
+def build_source(lines):
+    block = PLANTILLA.count("\n")
+    return "".join(PLANTILLA.format(n=n) for n in range(lines // block + 1))
+
+def editable(line):
+    # Sentencias simples de nivel superior: editarlas deja el programa válido
+    # (cambiar la cabecera o el cuerpo de una clase rompería su indentación)
+    return not line[:1].isspace() and not line.startswith("class")
+
+def full_front_end(code):
+    tokens = Lexer(code).tokens
+    return list(tokens), Parser(tokens).parse()
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Benchmark del re-análisis incremental")
+    arg_parser.add_argument("--lineas", type=int, default=20_000)
+    arg_parser.add_argument("--ediciones", type=int, default=200)
+    args = arg_parser.parse_args()
+
+    code = build_source(args.lineas)
+    start = time.perf_counter()
+    full_front_end(code)
+    full_time = time.perf_counter() - start
+
+    document = IncrementalDocument(code)
+    total_lines = len(document.lines)
+    print(f"Entrada: {total_lines:,} líneas, {len(document.tokens):,} tokens")
+    print(f"Re-análisis completo: {full_time * 1000:.1f} ms")
+
+    cases = [
+        ("tecla dentro de una línea", lambda i: (i, i, f"valor_x = {i} * 3 + 1\n")),
+        ("insertar una línea", lambda i: (i, i - 1, f"extra_{i} = {i}\n")),
+        ("borrar una línea", lambda i: (i, i, "")),
+    ]
+    for label, make_edit in cases:
+        latencies = []
+        stats = None
+        for k in range(args.ediciones):
+            line = 1 + (k * 7919) % (len(document.lines) - 1)
+            while not editable(document.lines[line - 1]):
+                line = line % (len(document.lines) - 1) + 1
+            first, last, text = make_edit(line)
+            start = time.perf_counter()
+            stats = document.edit(first, last, text)
+            latencies.append(time.perf_counter() - start)
+        latencies.sort()
+        median = latencies[len(latencies) // 2]
+        print(f"{label:<28} mediana {median * 1000:7.3f} ms  "
+              f"({full_time / median:,.0f}x más rápido)  última: {stats}")
+
+    tokens, ast = full_front_end(document.code)
+    if tokens != document.tokens or ast != document.ast:
+        print("❌ El resultado incremental difiere del re-análisis completo")
+        sys.exit(1)
+    print("Resultado idéntico al re-análisis completo")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+# bench_instancias.py
+# Bytes por instancia y coste de los accesos a atributos en los modos
+# interpretados. La memoria se compara con el dict {"__class__", "__dict__"}
+# que usaban antes los ejecutores para cada instancia.
+import argparse
+import os
+import sys
+import time
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from compilador import run_front_end, create_executor
+from instancias import Instance, UserClass
+
+PROGRAMA = '''for fase in range(2):
+    if fase == 0:
+        class Punto:
+            def __init__(self, x, y):
+                self.x = x
+                self.y = y
+    elif carga == "atributos":
+        p = Punto(1, 2)
+        for i in range(n):
+            p.x = p.x + p.y
+        resultado = p.x
+    elif carga == "variables":
+        x = 1
+        y = 2
+        for i in range(n):
+            x = x + y
+        resultado = x
+    else:
+        for i in range(n):
+            p = Punto(i, i)
+        resultado = p.y
+'''
+
+NAMES = ["x", "y", "vx", "vy", "masa", "carga", "radio", "color"]
+
+def old_instance(attributes):
+    instance = {"__class__": "Particula", "__dict__": {}}
+    for name in attributes:
+        instance["__dict__"][name] = 0
+    return instance
+
+def new_instance(root, attributes):
+    instance = Instance(root)
+    for name in attributes:
+        instance.set(name, 0)
+    return instance
+
+def bytes_per_instance(build, count):
+    # Los valores son el int 0 compartido: solo cuenta la estructura
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    instances = [build() for _ in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (after - before) / len(instances) - 8  # sin el puntero de la lista
+
+def access_ns(repeat, number):
+    """ns por lectura y escritura de atributo: dict anterior frente a forma con caché.
+
+    Las funciones reproducen el camino rápido de los ejecutores; se miden
+    intercaladas en el mismo proceso para que el ruido afecte a ambas.
+    """
+    old = old_instance(["x", "y"])
+    new = new_instance(UserClass("Particula", {}).shape, ["x", "y"])
+    cached_shape, cached_index = new.shape, 1
+
+    def old_read(obj=old):
+        if isinstance(obj, dict) and "__class__" in obj:
+            return obj["__dict__"].get("y", None)
+
+    def new_read(obj=new):
+        if type(obj) is Instance and obj.shape is cached_shape:
+            return obj.values[cached_index]
+
+    def old_write(obj=old):
+        if isinstance(obj, dict) and "__class__" in obj:
+            obj["__dict__"]["y"] = 1
+
+    def new_write(obj=new):
+        if type(obj) is Instance and obj.shape is cached_shape:
+            obj.values[cached_index] = 1
+
+    cases = [old_read, new_read, old_write, new_write]
+    best = [float("inf")] * len(cases)
+    for _ in range(repeat):
+        for i, case in enumerate(cases):
+            best[i] = min(best[i], timeit.timeit(case, number=number) / number * 1e9)
+    return best
+
+def run(statements, mode, workload, n):
+    symbols = {"carga": {"value": workload}, "n": {"value": n}}
+    executor = create_executor(statements, symbols, mode=mode)
+    start = time.perf_counter()
+    executor.run()
+    return time.perf_counter() - start, symbols["resultado"]["value"]
+
+def best_of(repeat, statements, mode, workload, n):
+    return min(run(statements, mode, workload, n)[0] for _ in range(repeat))
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Benchmark de instancias y atributos")
+    arg_parser.add_argument("--instancias", type=int, default=100_000)
+    arg_parser.add_argument("-n", type=int, default=100_000, help="iteraciones de los bucles")
+    arg_parser.add_argument("--repeticiones", type=int, default=5)
+    arg_parser.add_argument("--modos", nargs="+", default=["tree", "vm", "closures"])
+    args = arg_parser.parse_args()
+
+    print("Bytes por instancia (sin contar los valores):")
+    for count in (2, 4, 8):
+        attributes = NAMES[:count]
+        root = UserClass("Particula", {}).shape
+        old = bytes_per_instance(lambda: old_instance(attributes), args.instancias)
+        new = bytes_per_instance(lambda: new_instance(root, attributes), args.instancias)
+        print(f"  {count} atributos: dict {old:6.0f} B  forma {new:6.0f} B  ({1 - new / old:.0%} menos)")
+
+    old_read, new_read, old_write, new_write = access_ns(args.repeticiones * 3, 200_000)
+    print("\nAcceso a atributo (camino de los ejecutores):")
+    print(f"  lectura:   dict {old_read:5.1f} ns  forma {new_read:5.1f} ns  ({1 - new_read / old_read:.0%} menos)")
+    print(f"  escritura: dict {old_write:5.1f} ns  forma {new_write:5.1f} ns  ({1 - new_write / old_write:.0%} menos)")
+
+    _, ast, _ = run_front_end(PROGRAMA)
+    statements = ast.body
+    n = args.n
+    print(f"\n{'modo':<9} {'bucle con atributos':>20} {'mismo bucle con variables':>26} {'crear instancia':>16}")
+    for mode in args.modos:
+        elapsed, result = run(statements, mode, "atributos", n)
+        if result != 1 + 2 * n:
+            print(f"❌ Resultado inesperado en {mode}: {result}")
+            sys.exit(1)
+        # Sin indentación el cuerpo del for llega hasta el final, así que la
+        # asignación a resultado también está en el bucle: cada iteración hace
+        # tres lecturas y una escritura de atributo
+        attributes = best_of(args.repeticiones, statements, mode, "atributos", n)
+        variables = best_of(args.repeticiones, statements, mode, "variables", n)
+        creation = best_of(args.repeticiones, statements, mode, "instancias", n)
+        print(f"{mode:<9} {attributes / n * 1e9:14.0f} ns/it {variables / n * 1e9:20.0f} ns/it "
+              f"{creation / n * 1e6:13.2f} µs")
+
+if __name__ == "__main__":
+    main()
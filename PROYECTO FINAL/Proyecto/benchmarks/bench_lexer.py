@@ -0,0 +1,101 @@
+# bench_lexer.py
+# Compara el Lexer con tabla de palabras reservadas contra el escáner
+# anterior (una expresión regular con todas las alternativas de TOKENS,
+# reconstruida en cada instancia) sobre una entrada de 100k líneas.
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from compilador import TOKENS, Lexer
+
+PLANTILLA = '''# bloque {n}
+contador_{n} = {n}
+nombre = "usuario {n}"
+def calcular_{n}(a, b):
+    resultado = a * b + 3.75 - a % 2
+    if resultado >= 10 and a != b or a <= 0:
+        return resultado / 2
+    elif resultado == 4:
+        pass
+    else:
+        return None
+class Clase{n}:
+    def metodo(self, x):
+        self.valor = x
+for i in range(0, {n}):
+    while contador_{n} > 0 and not False:
+        contador_{n} = contador_{n} - 1
+        print(f'valor {{i}}', input("> "), True)
+'''
+
+def legacy_tokenize(code):
+    """Escáner anterior: regex con todas las alternativas, construida por llamada."""
+    tokens = []
+    line_num = 1
+    line_start = 0
+    token_regex = "|".join("(?P<%s>%s)" % pair for pair in TOKENS)
+
+    for mo in re.finditer(token_regex, code):
+        kind = mo.lastgroup
+        value = mo.group()
+        column = mo.start() - line_start + 1
+
+        if kind == "NEWLINE":
+            line_num += 1
+            line_start = mo.end()
+            tokens.append((kind, value, line_num, column))
+            continue
+        elif kind in ("SKIP", "COMMENT"):
+            continue
+        elif kind == "MISMATCH":
+            raise SyntaxError(f"❌ Error léxico (línea {line_num}, col {column}): carácter inesperado '{value}'")
+        else:
+            tokens.append((kind, value, line_num, column))
+    return tokens
+
+def build_source(lines):
+    block = PLANTILLA.count("\n")
+    return "".join(PLANTILLA.format(n=n) for n in range(lines // block + 1))
+
+def measure(function, code, repeat):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(code)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Benchmark del analizador léxico")
+    arg_parser.add_argument("--lineas", type=int, default=100_000)
+    arg_parser.add_argument("--repeticiones", type=int, default=3)
+    args = arg_parser.parse_args()
+
+    code = build_source(args.lineas)
+    print(f"Entrada: {code.count(chr(10)):,} líneas, {len(code):,} caracteres")
+
+    legacy_time, legacy_tokens = measure(legacy_tokenize, code, args.repeticiones)
+    new_time, new_tokens = measure(lambda source: Lexer(source).tokens, code, args.repeticiones)
+
+    if legacy_tokens != new_tokens:
+        for i, (old, new) in enumerate(zip(legacy_tokens, new_tokens)):
+            if old != new:
+                print(f"❌ Diferencia en el token {i}: {old} != {new}")
+                break
+        else:
+            print(f"❌ Distinto número de tokens: {len(legacy_tokens)} != {len(new_tokens)}")
+        sys.exit(1)
+
+    count = len(new_tokens)
+    print(f"Tokens idénticos: {count:,}")
+    print(f"anterior: {legacy_time:.3f} s  {count / legacy_time:,.0f} tokens/s")
+    print(f"tabla:    {new_time:.3f} s  {count / new_time:,.0f} tokens/s")
+    print(f"mejora:   {legacy_time / new_time:.2f}x")
+
+if __name__ == "__main__":
+    main()
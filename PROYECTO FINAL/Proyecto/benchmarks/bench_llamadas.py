@@ -0,0 +1,94 @@
+# bench_llamadas.py
+# Coste por llamada de los modos interpretados según el tamaño del programa:
+# fib recursivo y un bucle de Contador.incrementar, con la tabla de símbolos
+# global rellenada con cada vez más variables.
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from compilador import run_front_end, create_executor
+
+PROGRAMA = '''for fase in range(3):
+    if fase == 0:
+        def fib(n):
+            if n < 2:
+                return n
+            else:
+                return fib(n - 1) + fib(n - 2)
+    elif fase == 1:
+        class Contador:
+            def __init__(self, valor_inicial):
+                self.valor = valor_inicial
+            def incrementar(self):
+                self.valor = self.valor + 1
+                return self.valor
+    elif carga == "fib":
+        resultado = fib(n_fib)
+    else:
+        contador = Contador(0)
+        for k in range(n_metodos):
+            resultado = contador.incrementar()
+'''
+
+def fib_calls(n):
+    # Número de llamadas que hace fib(n): c(n) = c(n-1) + c(n-2) + 1
+    a, b = 1, 1
+    for _ in range(n):
+        a, b = b, a + b + 1
+    return a
+
+def fib_value(n):
+    a, b = 0, 1
+    for _ in range(n):
+        a, b = b, a + b
+    return a
+
+def measure(statements, mode, globals_count, workload, args):
+    best = float("inf")
+    result = None
+    for _ in range(args.repeticiones):
+        symbols = {f"relleno_{i}": {"value": i} for i in range(globals_count)}
+        symbols["carga"] = {"value": workload}
+        symbols["n_fib"] = {"value": args.fib}
+        symbols["n_metodos"] = {"value": args.metodos}
+        executor = create_executor(statements, symbols, mode=mode)
+        start = time.perf_counter()
+        executor.run()
+        best = min(best, time.perf_counter() - start)
+        result = symbols["resultado"]["value"]
+    return best, result
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Benchmark del coste de las llamadas")
+    arg_parser.add_argument("--fib", type=int, default=16)
+    arg_parser.add_argument("--metodos", type=int, default=5000)
+    arg_parser.add_argument("--globales", type=int, nargs="+", default=[0, 1000, 10000])
+    arg_parser.add_argument("--repeticiones", type=int, default=3)
+    arg_parser.add_argument("--modos", nargs="+", default=["tree", "vm", "closures"])
+    args = arg_parser.parse_args()
+
+    _, ast, _ = run_front_end(PROGRAMA)
+    statements = ast.body
+    workloads = [
+        ("fib", fib_calls(args.fib), fib_value(args.fib)),
+        ("metodos", args.metodos, args.metodos),
+    ]
+
+    print(f"{'carga':<8} {'modo':<9}" + "".join(f"{f'{n} globales':>16}" for n in args.globales))
+    for workload, calls, expected in workloads:
+        for mode in args.modos:
+            row = []
+            for globals_count in args.globales:
+                elapsed, result = measure(statements, mode, globals_count, workload, args)
+                if result != expected:
+                    print(f"❌ Resultado inesperado en {workload}/{mode}: {result} != {expected}")
+                    sys.exit(1)
+                row.append(f"{elapsed / calls * 1e6:12.2f} µs")
+            print(f"{workload:<8} {mode:<9}" + "".join(f"{cell:>16}" for cell in row))
+    print("(tiempo medio por llamada)")
+
+if __name__ == "__main__":
+    main()
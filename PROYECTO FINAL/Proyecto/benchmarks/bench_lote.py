@@ -0,0 +1,76 @@
+# bench_lote.py
+# Escalado de la compilación por lotes con el número de procesos: genera un
+# corpus de archivos pequeños (como los scripts de prueba de los alumnos) y
+# mide archivos por segundo y eficiencia respecto a un solo proceso.
+import argparse
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lote import BatchReport, check_files, source_files
+
+PLANTILLA = '''x_{n} = {n}
+y = "hola"
+def saludar(nombre):
+    print("Hola", nombre)
+    total = 0
+    for i in range(x_{n}):
+        total = total + i * 2
+    return total
+def doble(v):
+    return v * 2 + x_{n} % 7
+class Persona{n}:
+    def __init__(self, nombre, edad):
+        self.nombre = nombre
+        self.edad = edad
+    def cumple(self):
+        self.edad = self.edad + 1
+        return self.edad
+'''
+
+def build_corpus(directory, files, per_dir=500):
+    for n in range(files):
+        sub = os.path.join(directory, f"grupo_{n // per_dir:03d}")
+        os.makedirs(sub, exist_ok=True)
+        with open(os.path.join(sub, f"alumno_{n:05d}.py"), "w", encoding="utf-8") as file:
+            file.write(PLANTILLA.format(n=n))
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Escalado de lote.py con el número de procesos")
+    arg_parser.add_argument("--archivos", type=int, default=10_000)
+    arg_parser.add_argument("--procesos", type=int, nargs="+", default=None,
+                            help="por defecto: 1, 2, 4... hasta el número de núcleos")
+    args = arg_parser.parse_args()
+
+    cores = os.cpu_count() or 1
+    # Siempre se mide primero un solo proceso: es la referencia de la aceleración
+    counts = sorted(set(args.procesos or {cores} | {2 ** i for i in range(8) if 2 ** i < cores}) | {1})
+    with tempfile.TemporaryDirectory() as directory:
+        build_corpus(directory, args.archivos)
+        paths = list(source_files(directory))
+        print(f"{len(paths):,} archivos, {cores} núcleos")
+        print(f"{'procesos':>8} {'segundos':>9} {'archivos/s':>11} {'aceleración':>12} {'eficiencia':>11}")
+        baseline = None
+        for processes in counts:
+            # El lote completo: pool, informe y escritura (a memoria)
+            start = time.perf_counter()
+            report = BatchReport(directory, processes)
+            for result in check_files(paths, processes):
+                report.add(result)
+            report.write(io.StringIO())
+            elapsed = time.perf_counter() - start
+            if not report.ok:
+                print("❌ El corpus generado tiene errores")
+                sys.exit(1)
+            if baseline is None:
+                baseline = elapsed
+            speedup = baseline / elapsed
+            print(f"{processes:>8} {elapsed:>9.2f} {len(paths) / elapsed:>11.0f} "
+                  f"{speedup:>11.2f}x {speedup / processes:>10.0%}")
+
+if __name__ == "__main__":
+    main()
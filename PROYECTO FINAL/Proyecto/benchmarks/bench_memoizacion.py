@@ -0,0 +1,94 @@
+# bench_memoizacion.py
+# Modo tree con y sin memoización de funciones puras: funciones recursivas
+# que repiten llamadas idénticas y una sin repeticiones, donde la caché
+# solo añade su coste. La salida de ambas ejecuciones se compara.
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from compilador import create_executor, run_front_end
+from memoizacion import Memoizer
+
+# Cada def en su fase: sin indentación, el cuerpo llega hasta el siguiente def
+PROGRAMAS = {
+    "fibonacci": '''for fase in range(2):
+    if fase == 0:
+        def fib(n):
+            if n < 2:
+                return n
+            else:
+                return fib(n - 1) + fib(n - 2)
+    else:
+        print(fib({fib}))
+''',
+    "combinatoria": '''for fase in range(2):
+    if fase == 0:
+        def comb(n, k):
+            if k == 0:
+                return 1
+            elif k == n:
+                return 1
+            else:
+                return comb(n - 1, k - 1) + comb(n - 1, k)
+    else:
+        print(comb({comb}, {mitad}))
+''',
+    # Argumentos siempre distintos: todo son fallos y desalojos
+    "sin_repeticiones": '''for fase in range(2):
+    if fase == 0:
+        def cuadrado(x):
+            return x * x
+    else:
+        total = 0
+        for i in range({n}):
+            total = total + cuadrado(i)
+        print(total)
+''',
+}
+
+def run(code, memoize, maxsize):
+    _, ast, analyzer = run_front_end(code)
+    if analyzer.errors:
+        raise SystemExit(f"❌ Errores semánticos en el programa de prueba: {analyzer.errors}")
+    executor = create_executor(ast.body, mode="tree")
+    memoizer = Memoizer(executor, maxsize) if memoize else None
+    output = io.StringIO()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(output):
+        executor.run()
+    return time.perf_counter() - start, output.getvalue(), memoizer
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Memoización de funciones puras del modo tree")
+    arg_parser.add_argument("--fib", type=int, default=22, help="n de fib(n)")
+    arg_parser.add_argument("--llamadas", type=int, default=20_000,
+                            help="llamadas del programa sin repeticiones")
+    arg_parser.add_argument("--memo-max", type=int, default=1024)
+    arg_parser.add_argument("--repeticiones", type=int, default=3)
+    args = arg_parser.parse_args()
+
+    sizes = {"fib": args.fib, "comb": args.fib - 2, "mitad": (args.fib - 2) // 2, "n": args.llamadas}
+    print(f"{'programa':<18} {'sin memoizar':>13} {'memoizado':>12} {'aceleración':>12} {'aciertos':>9}")
+    for name, template in PROGRAMAS.items():
+        code = template.format(**sizes)
+        plain = memo = None
+        for _ in range(args.repeticiones):
+            elapsed, plain_output, _ = run(code, False, args.memo_max)
+            plain = elapsed if plain is None else min(plain, elapsed)
+            elapsed, output, memoizer = run(code, True, args.memo_max)
+            memo = elapsed if memo is None else min(memo, elapsed)
+            if output != plain_output:
+                print(f"❌ {name}: la salida memoizada no coincide")
+                sys.exit(1)
+        hits = sum(entry.hits for entry in memoizer.memos.values())
+        calls = hits + sum(entry.misses for entry in memoizer.memos.values())
+        rate = hits / calls if calls else 0.0
+        print(f"{name:<18} {plain * 1000:>10.1f} ms {memo * 1000:>9.1f} ms {plain / memo:>11.1f}x {rate:>9.1%}")
+
+if __name__ == "__main__":
+    main()
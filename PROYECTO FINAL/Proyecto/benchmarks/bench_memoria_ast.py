@@ -0,0 +1,76 @@
+# bench_memoria_ast.py
+# Memoria del AST por cada 10k líneas de fuente: nodos con __slots__ del
+# módulo nodos frente al formato de tuplas anterior (nodos.as_tuple). El
+# análisis semántico anota los mismos nodos en lugar de construir una copia
+# resuelta del árbol, así que solo queda un AST en memoria.
+import argparse
+import gc
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from compilador import Lexer, Parser, SemanticAnalyzer
+from nodos import as_tuple
+
+# Sentencias de nivel superior: sin indentación, un cuerpo se tragaría el resto
+PLANTILLA = '''valor_{n} = {n} * 2 + 1
+nombre_{n} = "elemento {n}"
+print(valor_{n}, nombre_{n}, 1.5)
+total_{n} = (valor_{n} + 3) * (valor_{n} - 1) % 7
+activo_{n} = total_{n} > 2 and valor_{n} != 0 or False
+resultado_{n} = calcular(valor_{n}, total_{n})
+punto_{n}.mover(valor_{n} / 2)
+punto_{n}.x = punto_{n}.x + 1
+class Clase{n}:
+    pass
+'''
+
+def build_source(lines):
+    block = PLANTILLA.count("\n")
+    return "".join(PLANTILLA.format(n=n) for n in range(lines // block + 1))
+
+def deep_size(root):
+    """Bytes de todos los objetos alcanzables desde root, contando cada uno una vez."""
+    seen = set()
+    total = 0
+    pending = [root]
+    while pending:
+        obj = pending.pop()
+        if id(obj) in seen or isinstance(obj, type):
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+        pending.extend(gc.get_referents(obj))
+    return total
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Memoria del AST por cada 10k líneas")
+    arg_parser.add_argument("--lineas", type=int, default=20_000)
+    args = arg_parser.parse_args()
+
+    code = build_source(args.lineas)
+    lines = code.count("\n")
+    tokens = Lexer(code).tokens
+
+    start = time.perf_counter()
+    program = Parser(tokens).parse()
+    parse_time = time.perf_counter() - start
+    tuples = as_tuple(program)
+    tuple_size = deep_size(tuples)
+    node_size = deep_size(program)
+    SemanticAnalyzer(tokens).analyze(program.body)
+    resolved_size = deep_size(program)
+
+    print(f"Entrada: {lines:,} líneas, {len(tokens):,} tokens (parseo: {parse_time * 1000:.0f} ms)")
+    rows = [
+        ("tuplas (formato anterior)", tuple_size),
+        ("nodos con __slots__", node_size),
+        ("nodos tras el análisis", resolved_size),
+    ]
+    for label, size in rows:
+        print(f"{label:<26} {size * 10_000 / lines / 2**20:8.2f} MiB por 10k líneas")
+
+if __name__ == "__main__":
+    main()
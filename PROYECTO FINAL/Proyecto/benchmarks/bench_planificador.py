@@ -0,0 +1,85 @@
+# bench_planificador.py
+# Coste de ejecutar por turnos: muchos programas de la VM uno detrás de
+# otro con run() frente al planificador con varios quantum, más algunos
+# bucles infinitos que el planificador debe cortar por combustible. La
+# salida de cada programa que termina se compara con la de run().
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from compilador import create_executor, run_front_end
+from planificador import Scheduler
+
+PROGRAMA = '''total = 0
+i = 0
+while i < {n}:
+    total = total + i % {k}
+    i = i + 1
+print(total)
+'''
+
+INFINITO = '''x = 0
+while x < 1:
+    x = x * 1
+'''
+
+def run_scheduler(codes, quantum, fuel, infinite, expected):
+    scheduler = Scheduler(quantum, fuel=fuel)
+    tasks = [scheduler.add(f"p{index}", code) for index, code in enumerate(codes)]
+    for index in range(infinite):
+        scheduler.add(f"infinito{index}", INFINITO)
+    start = time.perf_counter()
+    scheduler.run()
+    elapsed = time.perf_counter() - start
+    if [task.output for task in tasks] != expected:
+        print(f"❌ quantum {quantum}: la salida no coincide con la de run()")
+        sys.exit(1)
+    stopped = sum(1 for task in scheduler.tasks if task.status == "sin_combustible")
+    if stopped != infinite:
+        print(f"❌ quantum {quantum}: {stopped} programas cortados por combustible, se esperaban {infinite}")
+        sys.exit(1)
+    return elapsed, scheduler
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Planificador cooperativo frente a ejecución secuencial")
+    arg_parser.add_argument("--programas", type=int, default=200)
+    arg_parser.add_argument("--iteraciones", type=int, default=2000, help="vueltas de bucle de cada programa")
+    arg_parser.add_argument("--infinitos", type=int, default=5, help="programas que no terminan")
+    arg_parser.add_argument("--quantum", type=int, nargs="+", default=[10, 100, 1000])
+    args = arg_parser.parse_args()
+
+    codes = [PROGRAMA.format(n=args.iteraciones + index, k=index % 7 + 2) for index in range(args.programas)]
+    fuel = args.iteraciones * 10
+
+    executors = [create_executor(run_front_end(code)[1].body, mode="vm") for code in codes]
+    expected = []
+    start = time.perf_counter()
+    for executor in executors:
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            executor.run()
+        expected.append(output.getvalue())
+    sequential = time.perf_counter() - start
+
+    print(f"{args.programas} programas de ~{args.iteraciones} pasos")
+    print(f"{'ejecución':<22} {'tiempo':>10} {'turnos':>8} {'relativo':>9}")
+    print(f"{'secuencial (run)':<22} {sequential * 1000:>7.1f} ms {'-':>8} {1:>8.2f}x")
+    for quantum in args.quantum:
+        elapsed, scheduler = run_scheduler(codes, quantum, fuel, 0, expected)
+        print(f"{f'quantum {quantum}':<22} {elapsed * 1000:>7.1f} ms {scheduler.switches:>8} "
+              f"{elapsed / sequential:>8.2f}x")
+
+    # Los infinitos se cortan al gastar su combustible sin bloquear a los demás
+    quantum = args.quantum[-1]
+    elapsed, scheduler = run_scheduler(codes, quantum, fuel, args.infinitos, expected)
+    label = f"+{args.infinitos} infinitos"
+    print(f"{label:<22} {elapsed * 1000:>7.1f} ms {scheduler.switches:>8} {elapsed / sequential:>8.2f}x"
+          f"  (quantum {quantum}, combustible {fuel})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+# bench_servidor.py
+# Latencia de compilar y ejecutar programas pequeños invocando
+# compilador.py en un proceso nuevo cada vez frente a enviarlos al
+# servidor de compilación ya arrancado. La salida de ambos se compara.
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+PROYECTO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROYECTO)
+
+from servidor import send_request
+
+FRAGMENTOS = [
+    "x = 2\nprint(x * 3)\n",
+    "total = 0\nfor i in range(50):\n    total = total + i\nprint(total)\n",
+    "nombre = input(\"¿Nombre? \")\nprint(\"Hola\", nombre)\n",
+]
+
+def wait_for_socket(path, process, timeout=10.0):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if process.poll() is not None:
+            raise SystemExit("❌ El servidor terminó al arrancar")
+        try:
+            send_request(path, {"comando": "ping"}, timeout=1.0)
+            return
+        except OSError:
+            time.sleep(0.05)
+    raise SystemExit("❌ El servidor no respondió a tiempo")
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Servidor de compilación frente a un proceso por programa")
+    arg_parser.add_argument("--peticiones", type=int, default=30, help="programas que se envían con cada método")
+    arg_parser.add_argument("--modo", default="native")
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        socket_path = os.path.join(directory, "servidor.sock")
+        server = subprocess.Popen([sys.executable, os.path.join(PROYECTO, "servidor.py"), "--socket", socket_path,
+                                   "iniciar", "-j", "1"], stderr=subprocess.DEVNULL)
+        try:
+            wait_for_socket(socket_path, server)
+            sources = []
+            for index, code in enumerate(FRAGMENTOS):
+                path = os.path.join(directory, f"fragmento_{index}.py")
+                with open(path, "w", encoding="utf-8") as file:
+                    file.write(code)
+                sources.append((path, code))
+
+            process_time = server_time = 0.0
+            for request in range(args.peticiones):
+                path, code = sources[request % len(sources)]
+                start = time.perf_counter()
+                expected = subprocess.run([sys.executable, os.path.join(PROYECTO, "compilador.py"), "--sin-cache",
+                                           "--modo", args.modo, path], input="Ana\n", capture_output=True,
+                                          text=True).stdout
+                process_time += time.perf_counter() - start
+
+                start = time.perf_counter()
+                response = send_request(socket_path, {"codigo": code, "entrada": ["Ana"], "modo": args.modo,
+                                                      "secciones": ["errores", "salida"]})
+                server_time += time.perf_counter() - start
+                if response.get("salida") != expected:
+                    print(f"❌ La salida del servidor no coincide para {os.path.basename(path)}")
+                    sys.exit(1)
+        finally:
+            server.terminate()
+            server.wait()
+
+    print(f"{args.peticiones} programas en modo {args.modo}")
+    print(f"{'proceso nuevo':<15} {process_time / args.peticiones * 1000:>9.2f} ms por programa")
+    print(f"{'servidor':<15} {server_time / args.peticiones * 1000:>9.2f} ms por programa")
+    print(f"{'aceleración':<15} {process_time / server_time:>9.1f}x")
+
+if __name__ == "__main__":
+    main()
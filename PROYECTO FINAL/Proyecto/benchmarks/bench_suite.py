@@ -0,0 +1,456 @@
+# bench_suite.py
+# Suite de microbenchmarks con cargas fijas para todas las fases del
+# compilador: tiempo por fase, operaciones por segundo y memoria pico de
+# cada carga y modo. Los resultados se guardan en JSON y dos ejecuciones
+# se comparan con un umbral de regresión. stdin y stdout se sustituyen
+# durante la ejecución, así que corre sin terminal y sin red.
+import argparse
+import contextlib
+import datetime
+import gc
+import hashlib
+import io
+import json
+import math
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from compilador import EXECUTION_MODES, Lexer, Parser, SemanticAnalyzer, create_executor
+from nodos import walk
+from optimizador import optimize
+
+RESULTS_VERSION = 1
+PHASES = ("lexico", "sintactico", "semantico", "optimizacion", "compilacion", "ejecucion")
+
+# ------------------------
+# CARGAS
+# ------------------------
+class Workload:
+    """Programa fijo de la suite.
+
+    phase es la fase que mide la carga: sus operaciones por segundo se
+    calculan con el tiempo de esa fase. ops es el número de operaciones
+    (None: se cuentan al pasar por el front end). Las cargas que no se
+    ejecutan solo pasan por el front end y no dependen del modo.
+    """
+
+    def __init__(self, name, code, phase, unit, ops=None, inputs=""):
+        self.name = name
+        self.code = code
+        self.phase = phase
+        self.unit = unit
+        self.ops = ops
+        self.inputs = inputs
+
+    @property
+    def executes(self) -> bool:
+        return self.phase in ("optimizacion", "compilacion", "ejecucion")
+
+# Solo sentencias simples: un if se tragaría todos los bloques siguientes
+LEXER_BLOCK = '''# bloque {n}: comentarios, cadenas, números y palabras clave
+valor_{n} = {n} * 2.5 + 1
+nombre_{n} = "elemento {n}"
+activo_{n} = valor_{n} >= 3 and True or False
+print(nombre_{n}, valor_{n} % 7, 'fin', valor_{n} != 0)
+'''
+
+def lexer_workload(scale):
+    lines = int(20_000 * scale)
+    block = LEXER_BLOCK.count("\n")
+    code = "".join(LEXER_BLOCK.format(n=n) for n in range(lines // block))
+    return Workload("lexer_grande", code, "lexico", "tokens")
+
+def parser_workload(scale):
+    # Paréntesis anidados y cadenas largas de operadores
+    depth, width = 25, 60
+    nested = "a"
+    for level in range(depth):
+        nested = f"({nested} + {level}) * b" if level % 2 else f"({nested} - b) % {level + 7}"
+    flat = " + ".join(f"a * {i} - b" for i in range(width))
+    lines = ["a = 3", "b = 5"]
+    for n in range(int(400 * scale)):
+        lines.append(f"x_{n} = {nested}")
+        lines.append(f"y_{n} = {flat} > x_{n} or a == b")
+    return Workload("parser_profundo", "\n".join(lines) + "\n", "sintactico", "nodos")
+
+def while_workload(scale):
+    n = int(30_000 * scale)
+    code = f'''n = {n}
+i = 0
+total = 0
+while i < n:
+    total = total + i % 7
+    i = i + 1
+'''
+    return Workload("bucle_while", code, "ejecucion", "iteraciones", n)
+
+def range_workload(scale):
+    # El patrón de conteo más común: for anidados sobre range
+    rows = int(300 * scale)
+    code = f'''total = 0
+for i in range({rows}):
+    for j in range(100):
+        total = total + j % 7
+'''
+    return Workload("bucle_range", code, "ejecucion", "iteraciones", rows * 101)
+
+def fib_calls(n):
+    # Llamadas que hace fib(n): c(n) = c(n-1) + c(n-2) + 1
+    a, b = 1, 1
+    for _ in range(n):
+        a, b = b, a + b + 1
+    return a
+
+def recursion_workload(scale):
+    # Las llamadas crecen como 1.618**n: la escala suma a n su logaritmo
+    n = max(5, round(18 + math.log(scale, 1.618)))
+    code = f'''for fase in range(2):
+    if fase == 0:
+        def fib(n):
+            if n < 2:
+                return n
+            else:
+                return fib(n - 1) + fib(n - 2)
+    else:
+        print(fib({n}))
+'''
+    return Workload("recursion_fib", code, "ejecucion", "llamadas", fib_calls(n))
+
+def classes_workload(scale):
+    # Como Contador en prueba_funciones_clases.py, con muchas instancias
+    n = int(5_000 * scale)
+    code = f'''for fase in range(3):
+    if fase == 0:
+        class Contador:
+            def __init__(self, valor_inicial):
+                self.valor = valor_inicial
+            def incrementar(self):
+                self.valor = self.valor + 1
+                return self.valor
+            def obtener_valor(self):
+                return self.valor
+    elif fase == 1:
+        total = 0
+    else:
+        for i in range({n}):
+            contador = Contador(i)
+            contador.incrementar()
+            total = total + contador.incrementar() + contador.obtener_valor()
+        print(total)
+'''
+    # Por iteración: una instanciación y tres llamadas a métodos
+    return Workload("clases_contador", code, "ejecucion", "llamadas", 4 * n)
+
+def print_workload(scale):
+    n = int(10_000 * scale)
+    code = f'''for i in range({n}):
+    print("linea", i, i * 2, "texto de salida")
+'''
+    return Workload("salida_print", code, "ejecucion", "prints", n)
+
+# prueba.py reescrito sin lo que la gramática no admite (expresión condicional,
+# f-strings y escapes): tal cual solo lo ejecuta --modo native, con CPython
+MENU = '''print("=== PROGRAMA DE PRUEBA DEL COMPILADOR ===")
+nombre = input("Ingresa tu nombre: ")
+print("Hola,", nombre, "Bienvenido a la prueba del compilador.")
+opcion = ""
+while opcion != "3":
+    print("Menú de opciones:")
+    print("1. Realizar operaciones básicas")
+    print("2. Contar hasta 5")
+    print("3. Salir")
+    opcion = input("Elige una opción (1-3): ")
+    if opcion == "1":
+        a = int(input("Ingresa el primer número: "))
+        b = int(input("Ingresa el segundo número: "))
+        suma = a + b
+        print("Suma:", suma, "Resta:", a - b, "Multiplicación:", a * b)
+    elif opcion == "2":
+        for i in range(1, 6):
+            print(i)
+    elif opcion == "3":
+        print("Gracias por usar el programa. Hasta luego!")
+    else:
+        print("Opción no válida. Intenta de nuevo.")
+'''
+
+def menu_workload(scale):
+    # El menú de prueba.py con entradas guionizadas: sumar, contar y una opción inválida
+    rounds = int(1_000 * scale)
+    inputs = "Ana\n" + "1\n7\n5\n2\n9\n" * rounds + "3\n"
+    return Workload("menu_interactivo", MENU, "ejecucion", "opciones", 3 * rounds + 1, inputs)
+
+WORKLOADS = {
+    "lexer_grande": lexer_workload,
+    "parser_profundo": parser_workload,
+    "bucle_while": while_workload,
+    "bucle_range": range_workload,
+    "recursion_fib": recursion_workload,
+    "clases_contador": classes_workload,
+    "salida_print": print_workload,
+    "menu_interactivo": menu_workload,
+}
+
+# ------------------------
+# E/S SUSTITUIDA
+# ------------------------
+class OutputSink:
+    """stdout de los programas: no guarda el texto, solo su hash y tamaño."""
+
+    def __init__(self):
+        self.hash = hashlib.sha1()
+        self.bytes = 0
+        self.runtime_error = None
+
+    def write(self, text):
+        # Los ejecutores informan de los errores en ejecución por stdout
+        if text.startswith("Error durante la ejecución") and self.runtime_error is None:
+            self.runtime_error = text
+        self.hash.update(text.encode("utf-8", "surrogatepass"))
+        self.bytes += len(text)
+        return len(text)
+
+    def flush(self):
+        pass
+
+@contextlib.contextmanager
+def stubbed_io(inputs: str):
+    stdin, stdout = sys.stdin, sys.stdout
+    sink = OutputSink()
+    sys.stdin, sys.stdout = io.StringIO(inputs), sink
+    try:
+        yield sink
+    finally:
+        sys.stdin, sys.stdout = stdin, stdout
+
+# ------------------------
+# MEDICIÓN
+# ------------------------
+class WorkloadError(Exception):
+    pass
+
+def run_pipeline(workload, mode):
+    """Una pasada completa; devuelve (ms por fase, operaciones, salida)."""
+    timings = dict.fromkeys(PHASES, 0.0)
+    clock = time.perf_counter
+
+    start = clock()
+    try:
+        tokens = Lexer(workload.code).tokens
+        timings["lexico"] = clock() - start
+
+        start = clock()
+        ast = Parser(tokens).parse()
+        timings["sintactico"] = clock() - start
+    except SyntaxError as e:
+        raise WorkloadError(str(e))
+    except RecursionError:
+        raise WorkloadError("❌ Anidamiento demasiado profundo para el parser")
+
+    start = clock()
+    analyzer = SemanticAnalyzer(tokens)
+    analyzer.analyze(ast.body)
+    timings["semantico"] = clock() - start
+    if analyzer.errors:
+        raise WorkloadError(f"❌ Error semántico: {analyzer.errors[0]}")
+
+    ops = workload.ops
+    if ops is None:
+        ops = len(tokens) if workload.phase == "lexico" else sum(1 for _ in walk(ast)) - 1
+    if not workload.executes:
+        return timings, ops, None
+
+    start = clock()
+    statements, _ = optimize(ast.body)
+    timings["optimizacion"] = clock() - start
+
+    start = clock()
+    executor = create_executor(statements, {}, mode=mode)
+    timings["compilacion"] = clock() - start
+
+    with stubbed_io(workload.inputs) as sink:
+        start = clock()
+        executor.run()
+        timings["ejecucion"] = clock() - start
+    if sink.runtime_error:
+        raise WorkloadError(f"❌ {sink.runtime_error.strip()}")
+    return timings, ops, sink
+
+def peak_memory(workload, mode) -> int:
+    # Pasada aparte: tracemalloc ralentiza mucho y falsearía los tiempos
+    gc.collect()
+    tracemalloc.start()
+    try:
+        run_pipeline(workload, mode)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def measure(workload, mode, repeat):
+    best = dict.fromkeys(PHASES, float("inf"))
+    ops = output = None
+    for _ in range(repeat):
+        gc.collect()
+        timings, ops, sink = run_pipeline(workload, mode)
+        for phase, value in timings.items():
+            best[phase] = min(best[phase], value)
+        output = sink and sink.hash.hexdigest()
+    main_time = best[workload.phase]
+    return {
+        "fase": workload.phase,
+        "fases_ms": {phase: round(value * 1000, 3) for phase, value in best.items()
+                     if workload.executes or phase in ("lexico", "sintactico", "semantico")},
+        "total_ms": round(sum(best.values()) * 1000, 3),
+        "operaciones": ops,
+        "unidad": workload.unit,
+        "ops_por_segundo": round(ops / main_time, 1) if main_time else None,
+        "memoria_pico_kib": round(peak_memory(workload, mode) / 1024, 1),
+        "salida_sha1": output,
+    }
+
+def run_suite(workloads, modes, repeat, log=print):
+    results = {}
+    outputs = {}
+    for workload in workloads:
+        for mode in (modes if workload.executes else [None]):
+            key = workload.name if mode is None else f"{workload.name}/{mode}"
+            try:
+                entry = measure(workload, mode or "tree", repeat)
+            except WorkloadError as e:
+                results[key] = {"error": str(e)}
+                log(f"{key:<28} {e}")
+                continue
+            # Todos los modos tienen que imprimir lo mismo
+            expected = outputs.setdefault(workload.name, entry["salida_sha1"])
+            if entry["salida_sha1"] != expected:
+                entry["error"] = "❌ la salida no coincide con la de los otros modos"
+            results[key] = entry
+            log(format_entry(key, entry))
+    return results
+
+def format_entry(key, entry) -> str:
+    line = (f"{key:<28} {entry['fases_ms'][entry['fase']]:10.2f} ms {entry['fase']:<12} "
+            f"{entry['ops_por_segundo']:>14,.0f} {entry['unidad']}/s "
+            f"{entry['memoria_pico_kib']:>10,.0f} KiB pico")
+    if "error" in entry:
+        line += f"  {entry['error']}"
+    return line
+
+# ------------------------
+# COMPARACIÓN
+# ------------------------
+# Cambios absolutos por debajo de esto son ruido aunque superen el umbral
+MIN_TIME_MS = 1.0
+MIN_MEMORY_KIB = 64.0
+
+def compare(base, new, threshold: float):
+    """Líneas del informe y si hay alguna regresión mayor que threshold (%)."""
+    lines = [f"{'carga':<28} {'métrica':<10} {'base':>12} {'nuevo':>12} {'cambio':>8}"]
+    regressions = 0
+    base_results, new_results = base["resultados"], new["resultados"]
+    for key in sorted(base_results.keys() & new_results.keys()):
+        old, current = base_results[key], new_results[key]
+        if "error" in current and "error" not in old:
+            lines.append(f"{key:<28} {current['error']}")
+            regressions += 1
+            continue
+        if "error" in old or "error" in current:
+            continue
+        if old["operaciones"] != current["operaciones"]:
+            lines.append(f"{key:<28} (carga distinta: {old['operaciones']} frente a "
+                         f"{current['operaciones']} {current['unidad']})")
+            continue
+        metrics = [("tiempo", old["fases_ms"][old["fase"]], current["fases_ms"][current["fase"]],
+                    "ms", MIN_TIME_MS),
+                   ("memoria", old["memoria_pico_kib"], current["memoria_pico_kib"], "KiB", MIN_MEMORY_KIB)]
+        for name, before, after, unit, noise in metrics:
+            change = (after - before) / before * 100 if before else 0.0
+            mark = ""
+            if abs(after - before) >= noise:
+                if change > threshold:
+                    mark = "  REGRESIÓN"
+                    regressions += 1
+                elif change < -threshold:
+                    mark = "  mejora"
+            lines.append(f"{key:<28} {name:<10} {before:>9.2f} {unit:<3}{after:>9.2f} {unit:<3}"
+                         f"{change:>+7.1f}%{mark}")
+    only_base = sorted(base_results.keys() - new_results.keys())
+    only_new = sorted(new_results.keys() - base_results.keys())
+    if only_base:
+        lines.append(f"Solo en la base: {', '.join(only_base)}")
+    if only_new:
+        lines.append(f"Solo en la nueva: {', '.join(only_new)}")
+    lines.append(f"{regressions} regresiones por encima del {threshold:g}%")
+    return "\n".join(lines), regressions > 0
+
+def load_results(path):
+    with open(path, "r", encoding="utf-8") as file:
+        data = json.load(file)
+    if data.get("version") != RESULTS_VERSION:
+        raise SystemExit(f"❌ {path}: versión de resultados no soportada")
+    return data
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Suite de microbenchmarks del compilador")
+    arg_parser.add_argument("--cargas", nargs="+", choices=list(WORKLOADS), default=list(WORKLOADS))
+    arg_parser.add_argument("--modos", nargs="+", choices=sorted(EXECUTION_MODES),
+                            default=["tree", "vm", "closures", "native"])
+    arg_parser.add_argument("--repeticiones", type=int, default=3)
+    arg_parser.add_argument("--escala", type=float, default=1.0, help="multiplica el tamaño de las cargas")
+    arg_parser.add_argument("--programa", action="append", default=[], metavar="ARCHIVO",
+                            help="añade un programa propio como carga (se puede repetir)")
+    arg_parser.add_argument("--entrada", metavar="ARCHIVO",
+                            help="texto que reciben por stdin los programas de --programa")
+    arg_parser.add_argument("-o", "--salida", metavar="JSON", help="guardar los resultados")
+    arg_parser.add_argument("--base", metavar="JSON", help="comparar los resultados con una ejecución anterior")
+    arg_parser.add_argument("--comparar", nargs=2, metavar=("BASE", "NUEVO"),
+                            help="solo comparar dos archivos de resultados")
+    arg_parser.add_argument("--umbral", type=float, default=10.0,
+                            help="porcentaje de empeoramiento que cuenta como regresión")
+    args = arg_parser.parse_args()
+
+    if args.comparar:
+        report, regressed = compare(load_results(args.comparar[0]), load_results(args.comparar[1]),
+                                    args.umbral)
+        print(report)
+        sys.exit(1 if regressed else 0)
+
+    workloads = [WORKLOADS[name](args.escala) for name in args.cargas]
+    inputs = ""
+    if args.entrada:
+        with open(args.entrada, "r", encoding="utf-8") as file:
+            inputs = file.read()
+    for path in args.programa:
+        with open(path, "r", encoding="utf-8") as file:
+            name = os.path.splitext(os.path.basename(path))[0]
+            workloads.append(Workload(name, file.read(), "ejecucion", "ejecuciones", 1, inputs))
+
+    results = run_suite(workloads, args.modos, args.repeticiones)
+    data = {
+        "version": RESULTS_VERSION,
+        "fecha": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "maquina": platform.platform(),
+        "escala": args.escala,
+        "repeticiones": args.repeticiones,
+        "resultados": results,
+    }
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as file:
+            json.dump(data, file, ensure_ascii=False, indent=1)
+        print(f"Resultados: {args.salida}")
+
+    failed = any("error" in entry for entry in results.values())
+    if args.base:
+        report, regressed = compare(load_results(args.base), data, args.umbral)
+        print(f"\n{report}")
+        failed = failed or regressed
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,397 @@
+# bench_tokens.py
+# Memoria por millón de tokens y velocidad del Parser con el TokenStream
+# (códigos enteros y offsets en arrays) frente a la lista de tuplas
+# (tipo, valor, línea, columna) que producía el Lexer. La referencia de
+# velocidad es una copia del Parser anterior (LegacyParser), que compara el
+# tipo de cada token como str; también se mide el Parser actual sobre la
+# lista con TupleTokens, como en incremental.py. Los tres AST se comparan.
+import argparse
+import gc
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from compilador import Lexer, Parser
+from nodos import (Assign, Attribute, AttrAssign, BinOp, Call, ClassDef, Constant, FunctionDef, Input,
+                   MethodCall, Name, Pass, Print, Program, Return, decode_number, decode_string)
+
+# Sentencias de nivel superior: sin indentación, un cuerpo se tragaría el resto
+PLANTILLA = '''valor_{n} = {n} * 2 + 1
+nombre_{n} = "elemento {n}"
+print(valor_{n}, nombre_{n}, 1.5)
+total_{n} = (valor_{n} + 3) * (valor_{n} - 1) % 7
+activo_{n} = total_{n} >= 2 and valor_{n} != 0 or False
+resultado_{n} = calcular(valor_{n}, total_{n}) / 2.5
+punto_{n}.mover(valor_{n} / 2)
+punto_{n}.x = punto_{n}.x + 1
+class Clase{n}:
+    pass
+'''
+
+def build_source(lines):
+    block = PLANTILLA.count("\n")
+    return "".join(PLANTILLA.format(n=n) for n in range(lines // block + 1))
+
+class LegacyParser:
+    """Parser anterior, que compara el tipo de cada token como str.
+
+    Copia del Parser previo al TokenStream, sobre la lista de tuplas, con
+    solo las sentencias que usa PLANTILLA: es la referencia de velocidad.
+    """
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.pos = 0
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else ("EOF", "", 0, 0)
+
+    def peek_type(self, type_):
+        return self.peek()[0] == type_
+
+    def match(self, *expected):
+        tok = self.peek()
+        if tok[0] in expected:
+            self.pos += 1
+            return tok
+        raise SyntaxError(f"❌ Error sintáctico línea {tok[2]}: se esperaba {expected} y se encontró {tok[0]}")
+
+    def parse(self):
+        statements = []
+        while not self.peek_type("EOF"):
+            if self.peek_type("NEWLINE"):
+                self.pos += 1
+                continue
+            statements.append(self.top_level_statement())
+        return Program(statements)
+
+    def top_level_statement(self):
+        stmt = self.statement()
+        if not stmt:
+            # Sin avanzar el parser se quedaría en un bucle infinito
+            tok = self.peek()
+            raise SyntaxError(f"❌ Error sintáctico línea {tok[2]}: sentencia inesperada '{tok[1]}'")
+        return stmt
+
+    def statement(self):
+        if self.peek_type("EOF"):
+            return None
+
+        tok = self.peek()
+
+        # Retorno de funciones
+        if self.peek_type("RETURN"):
+            self.match("RETURN")
+            expr = self.expression()
+            return Return(expr, tok[2], tok[3])
+
+        # (if, for y while no están: la plantilla no los usa)
+
+
+        # Función
+        if self.peek_type("DEF"):
+            return self.func_def()
+
+        # Clase
+        if self.peek_type("CLASS"):
+            return self.class_def()
+
+        # Asignación o llamada
+        if self.peek_type("IDENT"):
+            ident = self.match("IDENT")
+
+            # Acceso a atributo: obj.attr = value
+            if self.peek_type("DOT"):
+                self.match("DOT")
+                attr = self.match("IDENT")[1]
+                if self.peek_type("ASSIGN"):
+                    self.match("ASSIGN")
+                    expr = self.expression()
+                    return AttrAssign(ident[1], attr, expr, ident[2], ident[3])
+                elif self.peek_type("LPAREN"):
+                    # Llamada a método: obj.method()
+                    args = self.call_args()
+                    return MethodCall(ident[1], attr, args, ident[2], ident[3])
+                else:
+                    # Solo acceso: obj.attr
+                    return Attribute(ident[1], attr, ident[2], ident[3])
+
+            elif self.peek_type("ASSIGN"):
+                self.match("ASSIGN")
+                expr = self.expression()
+                return Assign(ident[1], expr, ident[2], ident[3])
+            elif self.peek_type("LPAREN"):
+                args = self.call_args()
+                return Call(ident[1], args, ident[2], ident[3])
+            else:
+                return Name(ident[1], ident[2], ident[3])
+
+        # Print
+        if self.peek_type("PRINT"):
+            self.match("PRINT")
+            args = self.call_args()
+            return Print(args, tok[2], tok[3])
+
+        # Input
+        if self.peek_type("INPUT"):
+            self.match("INPUT")
+            args = self.call_args()
+            return Input(args, tok[2], tok[3])
+
+        # Pass
+        if self.peek_type("PASS"):
+            self.match("PASS")
+            return Pass(tok[2], tok[3])
+
+        return None
+
+    def func_def(self):
+        def_tok = self.match("DEF")
+        name = self.match("IDENT")[1]
+        self.match("LPAREN")
+        params = []
+        while not self.peek_type("RPAREN"):
+            param = self.match("IDENT")[1]
+            params.append(param)
+            if self.peek_type("COMMA"):
+                self.match("COMMA")
+        self.match("RPAREN")
+        self.match("COLON")
+
+        if self.peek_type("NEWLINE"):
+            self.match("NEWLINE")
+
+        body = []
+        while not self.peek_type("EOF"):
+            if self.peek_type("DEF"):
+                break
+
+            if self.peek_type("NEWLINE"):
+                self.match("NEWLINE")
+                continue
+
+            stmt = self.statement()
+            if stmt:
+                body.append(stmt)
+            else:
+                break
+
+        return FunctionDef(name, params, body, def_tok[2], def_tok[3])
+
+    def class_def(self):
+        class_tok = self.match("CLASS")
+        name = self.match("IDENT")[1]
+        base = None
+        if self.peek_type("LPAREN"):
+            # Herencia simple: class Hijo(Padre):
+            self.match("LPAREN")
+            base = self.match("IDENT")[1]
+            self.match("RPAREN")
+        self.match("COLON")
+
+        if self.peek_type("NEWLINE"):
+            self.match("NEWLINE")
+
+        methods = []
+        while not self.peek_type("EOF"):
+            if self.peek_type("CLASS") or self.peek_type("DEF"):
+                # Si encontramos otra clase o función global, salir
+                if self.peek_type("CLASS"):
+                    break
+                # Si es DEF, verificar si es un método de la clase
+                if self.peek_type("DEF"):
+                    method = self.func_def()
+                    methods.append(method)
+            elif self.peek_type("NEWLINE"):
+                self.match("NEWLINE")
+                continue
+            elif self.peek_type("PASS"):
+                self.match("PASS")
+                if self.peek_type("NEWLINE"):
+                    self.match("NEWLINE")
+                break
+            else:
+                break
+
+        return ClassDef(name, methods, class_tok[2], class_tok[3], base)
+
+    def call_args(self):
+        args = []
+        self.match("LPAREN")
+        while not self.peek_type("RPAREN"):
+            args.append(self.expression())
+            if self.peek_type("COMMA"):
+                self.match("COMMA")
+        self.match("RPAREN")
+        return args
+
+    def expression(self):
+        return self.logical_or()
+
+    def logical_or(self):
+        expr = self.logical_and()
+        while self.peek_type("OR"):
+            op_tok = self.match("OR")
+            op = op_tok[1]
+            right = self.logical_and()
+            expr = BinOp(op, expr, right, op_tok[2], op_tok[3])
+        return expr
+
+    def logical_and(self):
+        expr = self.comparison()
+        while self.peek_type("AND"):
+            op_tok = self.match("AND")
+            op = op_tok[1]
+            right = self.comparison()
+            expr = BinOp(op, expr, right, op_tok[2], op_tok[3])
+        return expr
+
+    def comparison(self):
+        expr = self.addition()
+        while self.peek_type("EQ") or self.peek_type("NEQ") or self.peek_type("LT") or \
+            self.peek_type("GT") or self.peek_type("LE") or self.peek_type("GE"):
+            op_tok = self.match("EQ", "NEQ", "LT", "GT", "LE", "GE")
+            op = op_tok[1]
+            right = self.addition()
+            expr = BinOp(op, expr, right, op_tok[2], op_tok[3])
+        return expr
+
+    def addition(self):
+        expr = self.term()
+        while self.peek_type("PLUS") or self.peek_type("MINUS"):
+            op_tok = self.match("PLUS", "MINUS")
+            op = op_tok[1]
+            right = self.term()
+            expr = BinOp(op, expr, right, op_tok[2], op_tok[3])
+        return expr
+
+    def term(self):
+        expr = self.factor()
+        while self.peek_type("MUL") or self.peek_type("DIV") or self.peek_type("MOD"):
+            op_tok = self.match("MUL", "DIV", "MOD")
+            op = op_tok[1]
+            right = self.factor()
+            expr = BinOp(op, expr, right, op_tok[2], op_tok[3])
+        return expr
+
+    def factor(self):
+        tok = self.peek()
+        if tok[0] == "NUMBER":
+            self.match("NUMBER")
+            return Constant(decode_number(tok[1]), tok[1], tok[2], tok[3])
+        elif tok[0] == "STRING":
+            self.match("STRING")
+            return Constant(decode_string(tok[1]), tok[1], tok[2], tok[3])
+        elif tok[0] == "IDENT":
+            ident = self.match("IDENT")
+
+            # Acceso a atributo o método
+            if self.peek_type("DOT"):
+                self.match("DOT")
+                attr = self.match("IDENT")[1]
+                if self.peek_type("LPAREN"):
+                    # Llamada a método
+                    args = self.call_args()
+                    return MethodCall(ident[1], attr, args, tok[2], tok[3])
+                else:
+                    # Acceso a atributo
+                    return Attribute(ident[1], attr, tok[2], tok[3])
+
+            elif self.peek_type("LPAREN"):
+                args = self.call_args()
+                return Call(ident[1], args, tok[2], tok[3])
+            else:
+                return Name(ident[1], tok[2], tok[3])
+        elif tok[0] == "LPAREN":
+            self.match("LPAREN")
+            expr = self.expression()
+            self.match("RPAREN")
+            return expr
+        elif tok[0] in ("TRUE", "FALSE"):
+            self.match(tok[0])
+            return Constant(tok[1] == "True", tok[1], tok[2], tok[3])
+        elif tok[0] == "INPUT":
+            self.match("INPUT")
+            args = self.call_args()
+            return Call("input", args, tok[2], tok[3])
+        else:
+            raise SyntaxError(f"❌ Error sintáctico línea {tok[2]}: expresión inesperada '{tok[1]}'")
+
+def deep_size(root):
+    """Bytes de todos los objetos alcanzables desde root, contando cada uno una vez."""
+    seen = set()
+    total = 0
+    pending = [root]
+    while pending:
+        obj = pending.pop()
+        if id(obj) in seen or isinstance(obj, type):
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+        pending.extend(gc.get_referents(obj))
+    return total
+
+def stream_size(stream):
+    # Sin el fuente, que existe igual con cualquiera de los dos formatos
+    columns = (stream.kinds, stream.starts, stream.ends, stream.lines, stream.columns)
+    return sys.getsizeof(stream) + sum(sys.getsizeof(column) for column in columns)
+
+def measure(function, repeat):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="TokenStream frente a la lista de tuplas")
+    arg_parser.add_argument("--lineas", type=int, default=100_000)
+    arg_parser.add_argument("--repeticiones", type=int, default=3)
+    args = arg_parser.parse_args()
+
+    code = build_source(args.lineas)
+    stream = Lexer(code).tokens
+    tuples = list(stream)
+    count = len(stream)
+    print(f"Entrada: {code.count(chr(10)):,} líneas, {count:,} tokens")
+
+    per_million = 1_000_000 / count / 2**20
+    tuple_memory = deep_size(tuples)
+    array_memory = stream_size(stream)
+    print(f"{'memoria':<26} {'MiB por millón de tokens':>26}")
+    print(f"{'lista de tuplas':<26} {tuple_memory * per_million:>26.1f}")
+    print(f"{'TokenStream':<26} {array_memory * per_million:>26.1f}  "
+          f"({tuple_memory / array_memory:.1f}x menos)")
+
+    # Se alternan para que el ruido de la máquina afecte a todos por igual
+    parsers = [
+        ("anterior (tuplas, str)", lambda: LegacyParser(tuples).parse()),
+        ("actual con TupleTokens", lambda: Parser(tuples).parse()),
+        ("actual con TokenStream", lambda: Parser(stream).parse()),
+    ]
+    times = [float("inf")] * len(parsers)
+    expected = parsers[0][1]()
+    for repetition in range(args.repeticiones):
+        for index, (label, parse) in enumerate(parsers):
+            # Solo un AST vivo además del esperado: el recolector cuesta lo mismo a todos
+            gc.collect()
+            start = time.perf_counter()
+            ast = parse()
+            times[index] = min(times[index], time.perf_counter() - start)
+            if repetition == 0 and ast != expected:
+                print(f"❌ El AST de '{label}' difiere del del parser anterior")
+                sys.exit(1)
+            del ast
+    lex_time, _ = measure(lambda: Lexer(code).tokens, args.repeticiones)
+
+    print(f"{'parser':<26} {'tiempo':>10} {'tokens/s':>14}")
+    for (label, _), elapsed in zip(parsers, times):
+        print(f"{label:<26} {elapsed * 1000:>7.0f} ms {count / elapsed:>14,.0f}  ({times[0] / elapsed:.2f}x)")
+    print(f"{'lexer (TokenStream)':<26} {lex_time * 1000:>7.0f} ms {count / lex_time:>14,.0f}")
+
+if __name__ == "__main__":
+    main()
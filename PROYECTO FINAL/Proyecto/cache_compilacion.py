@@ -0,0 +1,159 @@
+# cache_compilacion.py
+# Caché en disco del front end, al estilo de __pycache__: tras un análisis
+# sin errores el AST se guarda en un archivo binario cuyo nombre es un hash
+# del fuente y de la versión del compilador. Las siguientes ejecuciones del
+# mismo fuente lo cargan con mmap en lugar de pasar otra vez por Lexer,
+# Parser y SemanticAnalyzer.
+import hashlib
+import marshal
+import mmap
+import os
+import sys
+import tempfile
+
+from nodos import from_data, to_data
+
+FORMAT_VERSION = 1
+MAGIC = b"ASTC"
+KEY_SIZE = 16
+HEADER_SIZE = len(MAGIC) + KEY_SIZE
+EXTENSION = ".ast"
+DEFAULT_MAX_BYTES = 64 * 2**20
+
+# Módulos que definen o validan el AST guardado (tipos.py decide qué
+# programas se aceptan y anota los BinOp; optimizador.py reescribe el mismo
+# AST): si cambian, cambian todas las claves
+_COMPILER_MODULES = ("compilador.py", "nodos.py", "tipos.py", "optimizador.py")
+
+_compiler_version = None
+
+def compiler_version() -> bytes:
+    """Huella del compilador: formato de la caché, versión de Python y fuente del front end."""
+    global _compiler_version
+    if _compiler_version is None:
+        digest = hashlib.blake2b(digest_size=KEY_SIZE)
+        digest.update(f"{FORMAT_VERSION}:{sys.version_info[0]}.{sys.version_info[1]}".encode())
+        here = os.path.dirname(os.path.abspath(__file__))
+        for name in _COMPILER_MODULES:
+            with open(os.path.join(here, name), "rb") as file:
+                digest.update(file.read())
+        _compiler_version = digest.digest()
+    return _compiler_version
+
+def default_directory() -> str:
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "compilador")
+
+# ------------------------
+# CACHÉ
+# ------------------------
+class CompilationCache:
+    """Directorio de ASTs ya analizados, indexado por el hash del fuente.
+
+    Cada entrada es MAGIC + clave + el AST en el formato de nodos.to_data
+    serializado con marshal. Una entrada no se invalida en el sitio: si el
+    fuente o el compilador cambian, cambia la clave y la entrada antigua
+    deja de usarse hasta que la desaloja el límite de tamaño. Las entradas
+    corruptas o de otra clave se borran al leerlas.
+
+    El límite es LRU: leer una entrada actualiza su mtime y al guardar se
+    borran las de mtime más antiguo hasta que el directorio cabe en
+    max_bytes. Un fallo de la caché nunca impide compilar: cualquier error
+    de E/S cuenta como un fallo.
+    """
+
+    def __init__(self, directory: str = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory or default_directory()
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    def key(self, code: str) -> bytes:
+        digest = hashlib.blake2b(compiler_version(), digest_size=KEY_SIZE)
+        digest.update(code.encode("utf-8"))
+        return digest.digest()
+
+    def path(self, key: bytes) -> str:
+        return os.path.join(self.directory, key.hex() + EXTENSION)
+
+    def load(self, code: str):
+        """Program guardado para este fuente, o None si no hay una entrada válida."""
+        key = self.key(code)
+        path = self.path(key)
+        try:
+            with open(path, "rb") as file, \
+                    mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                if data[:HEADER_SIZE] != MAGIC + key:
+                    raise ValueError("cabecera inválida")
+                # marshal lee directamente de las páginas mapeadas, sin copiar el archivo
+                with memoryview(data) as view, view[HEADER_SIZE:] as payload:
+                    program = from_data(marshal.loads(payload))
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (OSError, ValueError, EOFError, TypeError, IndexError):
+            # Archivo truncado, de otro formato o ilegible: se descarta
+            self.misses += 1
+            self._remove(path)
+            return None
+        self.hits += 1
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return program
+
+    def store(self, code: str, program) -> bool:
+        """Guarda el AST analizado de este fuente; devuelve si se escribió."""
+        key = self.key(code)
+        data = MAGIC + key + marshal.dumps(to_data(program))
+        if len(data) > self.max_bytes:
+            return False
+        temp = None
+        try:
+            os.makedirs(self.directory, mode=0o700, exist_ok=True)
+            # Escritura atómica: otro proceso nunca ve una entrada a medias
+            fd, temp = tempfile.mkstemp(suffix=".tmp", dir=self.directory)
+            with os.fdopen(fd, "wb") as file:
+                file.write(data)
+            os.replace(temp, self.path(key))
+        except OSError:
+            if temp is not None:
+                self._remove(temp)
+            return False
+        self.stores += 1
+        self.evict()
+        return True
+
+    def evict(self):
+        """Borra las entradas menos usadas hasta que el directorio quepa en max_bytes."""
+        entries = []
+        total = 0
+        try:
+            with os.scandir(self.directory) as scan:
+                for entry in scan:
+                    if entry.name.endswith(EXTENSION) and entry.is_file():
+                        stat = entry.stat()
+                        entries.append((stat.st_mtime, stat.st_size, entry.path))
+                        total += stat.st_size
+        except OSError:
+            return
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+            self.evictions += 1
+
+    def _remove(self, path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass  # ya no existe (otro proceso la borró) o no se puede borrar
+
+    def format_stats(self) -> str:
+        return (f"{self.hits} aciertos, {self.misses} fallos, {self.stores} guardadas, "
+                f"{self.evictions} desalojadas")
@@ -0,0 +1,448 @@
+# cierres.py
+# Ejecución por cierres: cada nodo del AST se convierte una sola vez en una
+# función de Python que ya conoce su operador, sus hijos y su variable.
+from compilador import BINARY_OPERATORS, assigned_names, defined_names
+from entrada_salida import PYTHON_RECURSION_ERROR, RUNTIME_ERROR, STANDARD_IO
+from instancias import Instance, MethodCache, UserClass
+from nodos import (VAR, CONST, BINOP, ATTR, CALL, METHOD_CALL, LOGICAL, ASSIGN, ATTR_ASSIGN, IF, WHILE,
+                   FOR, RETURN, PRINT, INPUT, FUNC_DEF, CLASS_DEF)
+
+def _no_op(scope):
+    return None
+
+def _missing_argument(scope):
+    # int() sin argumentos falla igual que en Executor
+    return [][0]
+
+# ------------------------
+# EJECUTOR POR CIERRES
+# ------------------------
+class ClosureExecutor:
+    """Compila el AST a cierres en el constructor; run() solo los invoca.
+
+    Las sentencias devuelven None si terminan normalmente y una tupla
+    (valor,) cuando ejecutan un return, para propagarlo sin excepciones.
+    El scope que reciben es el dict de variables locales de la llamada;
+    los nombres que no están en él se buscan en las globales. Como en el
+    Executor, dentro de una función se escribe en las globales todo nombre
+    que el módulo asigna o define, salvo los parámetros.
+    """
+
+    def __init__(self, ast, symbols, io=STANDARD_IO):
+        self.ast = ast
+        self.symbols = symbols
+        self.io = io         # se lee al compilar: print e input quedan ligados a sus métodos
+        self.functions = {}  # nombre -> (params, cuerpo compilado)
+        self.classes = {}    # nombre -> UserClass con {nombre_metodo: (receptor, resto de params, cuerpo compilado)}
+        self.method_caches = []  # una MethodCache por punto de llamada a método
+        self.module_names = assigned_names(ast) | defined_names(ast) | set(symbols)
+        self.global_names = frozenset()  # nombres globales del cuerpo que se compila
+        self.program = self.compile_block(ast)
+
+    def run(self):
+        try:
+            result = self.program(self.symbols)
+            if result is not None:
+                return result[0]
+        except RecursionError:
+            self.io.write(f"{RUNTIME_ERROR}: {PYTHON_RECURSION_ERROR}")
+        except Exception as e:
+            self.io.write(f"Error durante la ejecución: {e}")
+        finally:
+            self.io.flush()
+
+    # --- Bloques y sentencias ---
+    def compile_block(self, statements):
+        compiled = [stmt for stmt in map(self.compile_stmt, statements) if stmt is not None]
+        if not compiled:
+            return _no_op
+        if len(compiled) == 1:
+            return compiled[0]
+        if len(compiled) == 2:
+            first, second = compiled
+
+            def block2(scope):
+                result = first(scope)
+                if result is not None:
+                    return result
+                return second(scope)
+            return block2
+
+        compiled = tuple(compiled)
+
+        def block(scope):
+            for stmt in compiled:
+                result = stmt(scope)
+                if result is not None:
+                    return result
+        return block
+
+    def compile_stmt(self, node):
+        if node is None:
+            return None
+        kind = node.kind
+
+        if kind == ASSIGN:
+            name = node.name
+            value = self.compile_expr(node.value)
+            global_symbols = self.symbols
+
+            if name in self.global_names:
+                def assign_global(scope):
+                    val = value(scope)
+                    entry = global_symbols.get(name)
+                    if entry is None:
+                        global_symbols[name] = {"value": val}
+                    else:
+                        entry["value"] = val
+                return assign_global
+
+            def assign(scope):
+                val = value(scope)
+                entry = scope.get(name)
+                if entry is None:
+                    entry = global_symbols.get(name)
+                if entry is None:
+                    scope[name] = {"value": val}
+                else:
+                    entry["value"] = val
+            return assign
+
+        elif kind == ATTR_ASSIGN:
+            obj_name, attr_name = node.obj, node.attr
+            value = self.compile_expr(node.value)
+            global_symbols = self.symbols
+
+            # Caché de la última forma vista; cached_next es la forma tras
+            # añadir el atributo, o None si ya existía
+            cached_shape, cached_index, cached_next = None, 0, None
+
+            def attr_assign(scope):
+                nonlocal cached_shape, cached_index, cached_next
+                val = value(scope)
+                entry = scope.get(obj_name)
+                if entry is None:
+                    entry = global_symbols.get(obj_name)
+                if entry is None:
+                    return
+                obj = entry.get("value")
+                if type(obj) is not Instance:
+                    return
+                shape = obj.shape
+                if shape is not cached_shape:
+                    index = shape.index.get(attr_name)
+                    if index is None:
+                        cached_shape, cached_index, cached_next = shape, len(obj.values), shape.add(attr_name)
+                    else:
+                        cached_shape, cached_index, cached_next = shape, index, None
+                if cached_next is None:
+                    obj.values[cached_index] = val
+                else:
+                    obj.shape = cached_next
+                    obj.values.append(val)
+            return attr_assign
+
+        elif kind == IF:
+            condition = self.compile_expr(node.condition)
+            if_body = self.compile_block(node.body)
+            elif_cases = [(self.compile_expr(cond), self.compile_block(body))
+                          for cond, body in node.elifs]
+            else_body = self.compile_block(node.orelse)
+
+            if not elif_cases:
+                def run_if(scope):
+                    if condition(scope):
+                        return if_body(scope)
+                    return else_body(scope)
+                return run_if
+
+            def run_if_elif(scope):
+                if condition(scope):
+                    return if_body(scope)
+                for elif_cond, elif_body in elif_cases:
+                    if elif_cond(scope):
+                        return elif_body(scope)
+                return else_body(scope)
+            return run_if_elif
+
+        elif kind in (CALL, METHOD_CALL):
+            call = self.compile_expr(node)
+
+            def call_stmt(scope):
+                call(scope)
+            return call_stmt
+
+        elif kind == FUNC_DEF:
+            name = node.name
+            function = (node.params, self.compile_function(node.params, node.body))
+            functions = self.functions
+            global_symbols = self.symbols
+
+            def define_function(scope):
+                # Las funciones y clases se registran como globales, también las anidadas
+                functions[name] = function
+                if name not in global_symbols:
+                    global_symbols[name] = {"kind": "function", "value": None}
+            return define_function
+
+        elif kind == CLASS_DEF:
+            name, base_name = node.name, node.base
+            class_methods = {}
+            for method in node.methods:
+                if method.kind == FUNC_DEF:
+                    # El primer parámetro recibe el objeto: se separa una vez al compilar
+                    params = method.params
+                    class_methods[method.name] = (params[0] if params else None, params[1:],
+                                                  self.compile_function(params, method.body))
+            classes = self.classes
+            global_symbols = self.symbols
+
+            def define_class(scope):
+                base = None
+                if base_name is not None:
+                    base = classes.get(base_name)
+                    if base is None:
+                        raise RuntimeError(f"Clase base '{base_name}' no definida")
+                classes[name] = UserClass(name, class_methods, base)
+                if name not in global_symbols:
+                    global_symbols[name] = {"kind": "class", "value": None}
+            return define_class
+
+        elif kind == FOR:
+            var = node.var
+            iterable = self.compile_expr(node.iterable)
+            body = self.compile_block(node.body)
+
+            if var in self.global_names:
+                global_symbols = self.symbols
+
+                def run_for_global(scope):
+                    for item in iterable(scope):
+                        global_symbols[var] = {"value": item}
+                        result = body(scope)
+                        if result is not None:
+                            return result
+                return run_for_global
+
+            def run_for(scope):
+                for item in iterable(scope):
+                    scope[var] = {"value": item}
+                    result = body(scope)
+                    if result is not None:
+                        return result
+            return run_for
+
+        elif kind == WHILE:
+            condition = self.compile_expr(node.condition)
+            body = self.compile_block(node.body)
+
+            def run_while(scope):
+                while condition(scope):
+                    result = body(scope)
+                    if result is not None:
+                        return result
+            return run_while
+
+        elif kind == RETURN:
+            value = self.compile_expr(node.value)
+
+            def run_return(scope):
+                return (value(scope),)
+            return run_return
+
+        elif kind == PRINT:
+            args = self.compile_args(node.args)
+            write = self.io.write
+
+            def run_print(scope):
+                write(*[arg(scope) for arg in args])
+            return run_print
+
+        elif kind == INPUT:
+            read = self.compile_input(node.args)
+
+            def run_input(scope):
+                read(scope)
+            return run_input
+
+        # var, attr_access y pass como sentencia no hacen nada
+        return None
+
+    def compile_function(self, params, body):
+        # Cuerpo de una función o método con sus nombres globales
+        saved = self.global_names
+        self.global_names = self.module_names - set(params)
+        compiled = self.compile_block(body)
+        self.global_names = saved
+        return compiled
+
+    # --- Expresiones ---
+    def compile_args(self, args):
+        return tuple(self.compile_expr(arg) for arg in args)
+
+    def compile_expr(self, expr):
+        if expr is None:
+            return _no_op
+
+        kind = expr.kind
+
+        if kind == CONST:
+            value = expr.value
+            return lambda scope: value
+
+        elif kind == VAR:
+            name = expr.name
+            missing = f"[Variable {name} no definida]"
+            global_symbols = self.symbols
+
+            def load(scope):
+                entry = scope.get(name)
+                if entry is None:
+                    entry = global_symbols.get(name)
+                if entry is not None:
+                    return entry.get("value")
+                return missing
+            return load
+
+        elif kind == ATTR:
+            obj_name, attr_name = expr.obj, expr.attr
+            global_symbols = self.symbols
+
+            cached_shape, cached_index = None, 0
+
+            def attr_access(scope):
+                nonlocal cached_shape, cached_index
+                entry = scope.get(obj_name)
+                if entry is None:
+                    entry = global_symbols.get(obj_name)
+                if entry is None:
+                    return None
+                obj = entry.get("value")
+                if type(obj) is not Instance:
+                    return None
+                shape = obj.shape
+                if shape is not cached_shape:
+                    index = shape.index.get(attr_name)
+                    if index is None:
+                        return None
+                    cached_shape, cached_index = shape, index
+                return obj.values[cached_index]
+            return attr_access
+
+        elif kind == BINOP:
+            function = BINARY_OPERATORS[expr.op]
+            left = self.compile_expr(expr.left)
+            if expr.right.kind == CONST:
+                constant = expr.right.value
+                return lambda scope: function(left(scope), constant)
+            right = self.compile_expr(expr.right)
+            return lambda scope: function(left(scope), right(scope))
+
+        elif kind == LOGICAL:
+            left = self.compile_expr(expr.left)
+            right = self.compile_expr(expr.right)
+            if expr.op == 'and':
+                return lambda scope: left(scope) and right(scope)
+            return lambda scope: left(scope) or right(scope)
+
+        elif kind == CALL:
+            return self.compile_call(expr)
+
+        elif kind == METHOD_CALL:
+            return self.compile_method_call(expr)
+
+        return _no_op
+
+    def compile_input(self, args):
+        read = self.io.read
+        if not args:
+            return lambda scope: read("")
+        prompt = self.compile_expr(args[0])
+        return lambda scope: read(prompt(scope))
+
+    def compile_call(self, node):
+        func_name, arg_nodes = node.func, node.args
+
+        # Funciones builtin: se resuelven al compilar porque tienen prioridad
+        if func_name == "input":
+            return self.compile_input(arg_nodes)
+
+        args = self.compile_args(arg_nodes)
+
+        if func_name == "print":
+            write = self.io.write
+
+            def call_print(scope):
+                write(*[arg(scope) for arg in args])
+            return call_print
+        elif func_name == "int":
+            first = args[0] if args else _missing_argument
+
+            def call_int(scope):
+                val = first(scope)
+                return int(val) if val else 0
+            return call_int
+        elif func_name == "range":
+            if not 1 <= len(args) <= 3:
+                return _no_op
+            return lambda scope: range(*[arg(scope) for arg in args])
+
+        functions = self.functions
+        classes = self.classes
+        invoke_method = self.invoke_method
+
+        def call_user(scope):
+            values = [arg(scope) for arg in args]
+
+            function = functions.get(func_name)
+            if function is not None:
+                params, body = function
+                local = {}
+                for param, value in zip(params, values):
+                    local[param] = {"value": value}
+                result = body(local)
+                return result[0] if result is not None else None
+
+            cls = classes.get(func_name)
+            if cls is not None:
+                instance = Instance(cls.shape)
+                init_method = cls.methods.get("__init__")
+                if init_method is not None:
+                    invoke_method(init_method, instance, values)
+                return instance
+            return None
+        return call_user
+
+    def compile_method_call(self, node):
+        obj_name, method_name, arg_nodes = node.obj, node.method, node.args
+        args = self.compile_args(arg_nodes)
+        invoke_method = self.invoke_method
+        global_symbols = self.symbols
+        cache = MethodCache(method_name, node.line)
+        self.method_caches.append(cache)
+
+        def method_call(scope):
+            entry = scope.get(obj_name)
+            if entry is None:
+                entry = global_symbols.get(obj_name)
+            obj = entry.get("value") if entry is not None else None
+            values = [arg(scope) for arg in args]
+            if type(obj) is Instance:
+                cls = obj.shape.cls
+                if cls is cache.cls:
+                    cache.hits += 1
+                    method = cache.method
+                else:
+                    method = cache.lookup(cls)
+                if method is not None:
+                    return invoke_method(method, obj, values)
+            return None
+        return method_call
+
+    def invoke_method(self, method, obj, values):
+        receiver, params, body = method
+        local = {receiver: {"value": obj}} if receiver is not None else {}
+        for param, value in zip(params, values):
+            local[param] = {"value": value}
+        result = body(local)
+        return result[0] if result is not None else None
@@ -1,11 +1,25 @@
 # compilador.py
+import operator
 import re
 import sys
+from array import array
 from typing import List, Tuple, Dict, Any
 
+from entrada_salida import (DEFAULT_BUFFER_SIZE, FLUSH_POLICIES, FLUSH_SIZE, PYTHON_RECURSION_ERROR, RUNTIME_ERROR,
+                            STANDARD_IO, ProgramIO)
+from instancias import Instance, MethodCache, UserClass
+from nodos import (VAR, CONST, BINOP, ATTR, CALL, METHOD_CALL, LOGICAL, ASSIGN, ATTR_ASSIGN, IF,
+                   WHILE, FOR, RETURN, PRINT, INPUT, FUNC_DEF, CLASS_DEF, PASS, NODE_KINDS,
+                   Constant, Name, Attribute, BinOp, Call, MethodCall, Assign, AttrAssign,
+                   If, While, For, Return, Print, Input, FunctionDef, ClassDef, Pass, Program,
+                   decode_number, decode_string, walk)
+from tipos import BOOL, TypeInference, nonzero_constant
+
 # ------------------------
 # TOKENS
 # ------------------------
+# Especificación de referencia, en orden de prioridad. El Lexer no la
+# recorre alternativa por alternativa: usa las tablas de abajo.
 TOKENS = [
     ("PASS", r"\bpass\b"),
     ("NUMBER", r"\d+(\.\d+)?"),
@@ -25,11 +39,11 @@ TOKENS = [
     ("CONST", r"\bconst\b"),
     ("PRINT", r"\bprint\b"),
     ("INPUT", r"\binput\b"),
-    ("IDENT", r"[A-Za-z_]\w*"),
-    ("COMMENT", r"#.*"),
     ("AND", r"\band\b"),
     ("OR", r"\bor\b"),
     ("NOT", r"\bnot\b"),
+    ("IDENT", r"[A-Za-z_]\w*"),
+    ("COMMENT", r"#.*"),
     ("EQ", r"=="),
     ("NEQ", r"!="),
     ("LE", r"<="),
@@ -52,335 +66,585 @@ TOKENS = [
     ("MISMATCH", r"."),
 ]
 
+# Palabras reservadas: un identificador se clasifica con una búsqueda en dict
+KEYWORDS = {
+    "pass": "PASS",
+    "def": "DEF",
+    "class": "CLASS",
+    "if": "IF",
+    "else": "ELSE",
+    "elif": "ELIF",
+    "for": "FOR",
+    "while": "WHILE",
+    "return": "RETURN",
+    "in": "IN",
+    "True": "TRUE",
+    "False": "FALSE",
+    "None": "NONE",
+    "const": "CONST",
+    "print": "PRINT",
+    "input": "INPUT",
+    "and": "AND",
+    "or": "OR",
+    "not": "NOT",
+}
+
+OPERATORS = {
+    "==": "EQ",
+    "!=": "NEQ",
+    "<=": "LE",
+    ">=": "GE",
+    "<": "LT",
+    ">": "GT",
+    "+": "PLUS",
+    "-": "MINUS",
+    "*": "MUL",
+    "/": "DIV",
+    "%": "MOD",
+    "=": "ASSIGN",
+    ":": "COLON",
+    ",": "COMMA",
+    ".": "DOT",
+    "(": "LPAREN",
+    ")": "RPAREN",
+}
+
+# Código entero de cada tipo de token: el Lexer los guarda en un array y
+# el Parser compara enteros. El orden de TOKEN_KINDS es el de los códigos.
+T_EOF = 0
+T_NEWLINE = 1
+T_IDENT = 2
+T_NUMBER = 3
+T_STRING = 4
+T_LPAREN = 5
+T_RPAREN = 6
+T_COMMA = 7
+T_DOT = 8
+T_ASSIGN = 9
+T_COLON = 10
+T_PLUS = 11
+T_MINUS = 12
+T_MUL = 13
+T_DIV = 14
+T_MOD = 15
+T_EQ = 16
+T_NEQ = 17
+T_LT = 18
+T_GT = 19
+T_LE = 20
+T_GE = 21
+T_PASS = 22
+T_DEF = 23
+T_CLASS = 24
+T_IF = 25
+T_ELSE = 26
+T_ELIF = 27
+T_FOR = 28
+T_WHILE = 29
+T_RETURN = 30
+T_IN = 31
+T_TRUE = 32
+T_FALSE = 33
+T_NONE = 34
+T_CONST = 35
+T_PRINT = 36
+T_INPUT = 37
+T_AND = 38
+T_OR = 39
+T_NOT = 40
+
+TOKEN_KINDS = [
+    "EOF", "NEWLINE", "IDENT", "NUMBER", "STRING",
+    "LPAREN", "RPAREN", "COMMA", "DOT", "ASSIGN", "COLON",
+    "PLUS", "MINUS", "MUL", "DIV", "MOD", "EQ", "NEQ", "LT", "GT", "LE", "GE",
+    "PASS", "DEF", "CLASS", "IF", "ELSE", "ELIF", "FOR", "WHILE", "RETURN", "IN",
+    "TRUE", "FALSE", "NONE", "CONST", "PRINT", "INPUT", "AND", "OR", "NOT",
+]
+KIND_CODES = {name: code for code, name in enumerate(TOKEN_KINDS)}
+
+# Texto fijo de cada código (None si depende del fuente): palabras
+# reservadas, operadores y el salto de línea no necesitan cortar el fuente
+KIND_TEXT = [None] * len(TOKEN_KINDS)
+KIND_TEXT[T_EOF] = ""
+KIND_TEXT[T_NEWLINE] = "\n"
+for _text, _name in list(KEYWORDS.items()) + list(OPERATORS.items()):
+    KIND_TEXT[KIND_CODES[_name]] = _text
+
+_KEYWORD_CODES = {text: KIND_CODES[name] for text, name in KEYWORDS.items()}
+_OPERATOR_CODES = {text: KIND_CODES[name] for text, name in OPERATORS.items()}
+
+# Patrón maestro compilado una sola vez. Los operadores se prueban del más
+# largo al más corto para que "==" gane a "=".
+_OPERATOR_PATTERN = "|".join(re.escape(op) for op in sorted(OPERATORS, key=len, reverse=True))
+TOKEN_REGEX = re.compile(
+    r"(?P<NEWLINE>\n)"
+    r"|(?P<SKIP>[ \t]+)"
+    r"|(?P<STRING>f?\"[^\"\n]*\"|f?'[^'\n]*')"
+    r"|(?P<IDENT>[A-Za-z_]\w*)"
+    r"|(?P<OP>" + _OPERATOR_PATTERN + r")"
+    r"|(?P<NUMBER>\d+(?:\.\d+)?)"
+    r"|(?P<COMMENT>#.*)"
+    r"|(?P<MISMATCH>.)"
+)
+_WORD_CHAR = re.compile(r"\w")
+
+# Tokens que empiezan una sentencia compuesta: no caben en el cuerpo de una línea
+_COMPOUND_KINDS = (T_IF, T_FOR, T_WHILE, T_DEF, T_CLASS)
+
+# ------------------------
+# FLUJO DE TOKENS
+# ------------------------
+class TokenStream:
+    """Tokens de un fuente en arrays paralelos en lugar de una lista de tuplas.
+
+    kinds guarda el código de cada token (T_*), starts y ends su rango en
+    source, y lines y columns su posición. Los arrays terminan con un token
+    EOF centinela (línea y columna 0) que len() no cuenta, para que el
+    Parser lea kinds[pos] sin comprobar el final. El valor de un token se
+    corta del fuente solo al pedirlo (text), y la tupla (tipo, valor,
+    línea, columna) de antes solo al indexar o recorrer el flujo.
+    """
+
+    __slots__ = ("source", "kinds", "starts", "ends", "lines", "columns")
+
+    def __init__(self, source: str):
+        self.source = source
+        self.kinds = array("B")
+        self.starts = array("I")
+        self.ends = array("I")
+        self.lines = array("I")
+        self.columns = array("I")
+
+    def add_eof(self):
+        # El Lexer lo llama al terminar
+        for column in (self.kinds, self.starts, self.ends, self.lines, self.columns):
+            column.append(0)
+
+    def __len__(self):
+        return len(self.kinds) - 1
+
+    def text(self, i: int) -> str:
+        text = KIND_TEXT[self.kinds[i]]
+        return self.source[self.starts[i]:self.ends[i]] if text is None else text
+
+    def token(self, i: int) -> Tuple[str,str,int,int]:
+        # Admite i == len(self): el EOF centinela
+        kind = self.kinds[i]
+        value = self.text(i)
+        if kind == T_IDENT:
+            value = sys.intern(value)
+        return (TOKEN_KINDS[kind], value, self.lines[i], self.columns[i])
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self.token(j) for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("índice de token fuera de rango")
+        return self.token(i)
+
+    def __iter__(self):
+        return map(self.token, range(len(self)))
+
+    def __eq__(self, other):
+        if isinstance(other, (TokenStream, list)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"TokenStream({len(self)} tokens)"
+
+class _TupleColumn:
+    # Un campo de cada tupla de una lista, con valor por defecto tras el final
+    __slots__ = ("tokens", "read", "default")
+
+    def __init__(self, tokens, read, default):
+        self.tokens = tokens
+        self.read = read
+        self.default = default
+
+    def __getitem__(self, i):
+        tokens = self.tokens
+        return self.read(tokens[i]) if i < len(tokens) else self.default
+
+class TupleTokens:
+    """La interfaz que el Parser usa de TokenStream, sobre una lista de tuplas.
+
+    Es para quien guarda los tokens como lista y la modifica en el sitio
+    (incremental.py): el Parser la lee sin copiarla, a cambio de una
+    llamada por cada acceso.
+    """
+
+    __slots__ = ("tokens", "kinds", "lines", "columns")
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.kinds = _TupleColumn(tokens, lambda tok: KIND_CODES[tok[0]], T_EOF)
+        self.lines = _TupleColumn(tokens, operator.itemgetter(2), 0)
+        self.columns = _TupleColumn(tokens, operator.itemgetter(3), 0)
+
+    def __len__(self):
+        return len(self.tokens)
+
+    def token(self, i: int) -> Tuple[str,str,int,int]:
+        tokens = self.tokens
+        return tokens[i] if i < len(tokens) else ("EOF", "", 0, 0)
+
+    def text(self, i: int) -> str:
+        return self.token(i)[1]
+
 # ------------------------
 # LEXER
 # ------------------------
 class Lexer:
     def __init__(self, code: str):
         self.code = code
-        self.tokens: List[Tuple[str,str,int,int]] = []
+        self.tokens = TokenStream(code)
         self.tokenize()
 
     def tokenize(self):
+        code = self.code
+        tokens = self.tokens
+        add_kind = tokens.kinds.append
+        add_start = tokens.starts.append
+        add_end = tokens.ends.append
+        add_line = tokens.lines.append
+        add_column = tokens.columns.append
+        keywords = _KEYWORD_CODES
+        operators = _OPERATOR_CODES
+        kind_codes = KIND_CODES
+        word_char = _WORD_CHAR.match
         line_num = 1
         line_start = 0
-        token_regex = "|".join("(?P<%s>%s)" % pair for pair in TOKENS)
-        
-        for mo in re.finditer(token_regex, self.code):
+
+        for mo in TOKEN_REGEX.finditer(code):
             kind = mo.lastgroup
-            value = mo.group()
-            column = mo.start() - line_start + 1
-            
-            if kind == "NEWLINE":
-                line_num += 1
-                line_start = mo.end()
-                self.tokens.append((kind, value, line_num, column))
+
+            if kind == "SKIP" or kind == "COMMENT":
                 continue
-            elif kind in ("SKIP", "COMMENT"):
+            start, end = mo.span()
+            if kind == "IDENT":
+                code_ = keywords.get(mo.group(), T_IDENT)
+                # Pegado a un número ("12pass") no hay límite de palabra: sigue siendo IDENT
+                if code_ != T_IDENT and start and word_char(code, start - 1):
+                    code_ = T_IDENT
+                add_kind(code_)
+            elif kind == "OP":
+                add_kind(operators[mo.group()])
+            elif kind == "NEWLINE":
+                add_kind(T_NEWLINE)
+                add_start(start)
+                add_end(end)
+                add_column(start - line_start + 1)
+                line_num += 1
+                line_start = end
+                add_line(line_num)
                 continue
             elif kind == "MISMATCH":
-                raise SyntaxError(f"❌ Error léxico (línea {line_num}, col {column}): carácter inesperado '{value}'")
+                column = start - line_start + 1
+                raise SyntaxError(f"❌ Error léxico (línea {line_num}, col {column}): carácter inesperado '{mo.group()}'")
             else:
-                self.tokens.append((kind, value, line_num, column))
+                add_kind(kind_codes[kind])
+            add_start(start)
+            add_end(end)
+            add_line(line_num)
+            add_column(start - line_start + 1)
+        tokens.add_eof()
 
 # ------------------------
 # PARSER CORREGIDO
 # ------------------------
 class Parser:
+    """Parser descendente sobre un TokenStream (o una lista de tuplas).
+
+    Los métodos deciden comparando códigos enteros de kinds y solo cortan
+    del fuente el texto de los tokens que pasan al AST. match devuelve la
+    posición del token aceptado.
+
+    Los bloques terminan donde los termina Python: por la indentación, que
+    es la columna del primer token de cada línea. Lo que la gramática no
+    puede anidar igual que Python es un error, no otro programa.
+    """
+
     def __init__(self, tokens):
+        if not isinstance(tokens, TokenStream):
+            tokens = TupleTokens(tokens)
         self.tokens = tokens
+        self.kinds = tokens.kinds
+        self.lines = tokens.lines
+        self.columns = tokens.columns
         self.pos = 0
 
     def peek(self):
-        return self.tokens[self.pos] if self.pos < len(self.tokens) else ("EOF", "", 0, 0)
+        return self.tokens.token(self.pos)
 
-    def peek_type(self, type_):
-        return self.peek()[0] == type_
+    def peek_type(self, kind: int) -> bool:
+        return self.kinds[self.pos] == kind
 
-    def match(self, *expected):
+    def match(self, *expected) -> int:
+        pos = self.pos
+        if self.kinds[pos] in expected:
+            self.pos = pos + 1
+            return pos
         tok = self.peek()
-        if tok[0] in expected:
-            self.pos += 1
-            return tok
-        raise SyntaxError(f"❌ Error sintáctico línea {tok[2]}: se esperaba {expected} y se encontró {tok[0]}")
+        names = tuple(TOKEN_KINDS[kind] for kind in expected)
+        raise SyntaxError(f"❌ Error sintáctico línea {tok[2]}: se esperaba {names} y se encontró {tok[0]}")
+
+    def name(self, pos: int) -> str:
+        # Los nombres repetidos comparten un solo str en todo el AST
+        return sys.intern(self.tokens.text(pos))
 
     def parse(self):
         statements = []
-        while not self.peek_type("EOF"):
-            if self.peek_type("NEWLINE"):
+        kinds = self.kinds
+        while kinds[self.pos] != T_EOF:
+            if kinds[self.pos] == T_NEWLINE:
                 self.pos += 1
                 continue
-            stmt = self.statement()
-            if stmt:
-                statements.append(stmt)
-        return ("program", statements)
+            statements.append(self.top_level_statement())
+        return Program(statements)
+
+    def top_level_statement(self):
+        pos = self.pos
+        if self.columns[pos] != 1:
+            raise SyntaxError(f"❌ Error sintáctico línea {self.lines[pos]}: indentación inesperada")
+        stmt = self.statement()
+        if not stmt:
+            # Sin avanzar el parser se quedaría en un bucle infinito
+            tok = self.peek()
+            raise SyntaxError(f"❌ Error sintáctico línea {tok[2]}: sentencia inesperada '{tok[1]}'")
+        self.end_statement()
+        return stmt
+
+    def end_statement(self):
+        # Una sentencia simple acaba con su línea; una compuesta, al principio de otra
+        pos = self.pos
+        kind = self.kinds[pos]
+        if kind != T_NEWLINE and kind != T_EOF and self.kinds[pos - 1] != T_NEWLINE:
+            tok = self.peek()
+            raise SyntaxError(f"❌ Error sintáctico línea {tok[2]}: se esperaba fin de línea y se encontró {tok[0]}")
+
+    def continues(self, header: int, kind: int) -> bool:
+        """Si la siguiente línea empieza con kind (elif, else) a la altura de header; lo consume."""
+        kinds = self.kinds
+        pos = self.pos
+        while kinds[pos] == T_NEWLINE:
+            pos += 1
+        if kinds[pos] == kind and kinds[pos - 1] == T_NEWLINE and self.columns[pos] == self.columns[header]:
+            self.pos = pos + 1
+            return True
+        return False
 
     def statement(self):
-        if self.peek_type("EOF"):
+        pos = self.pos
+        kind = self.kinds[pos]
+        if kind == T_EOF:
             return None
-            
-        tok = self.peek()
+        line, col = self.lines[pos], self.columns[pos]
 
         # Retorno de funciones
-        if self.peek_type("RETURN"):
-            self.match("RETURN")
+        if kind == T_RETURN:
+            self.pos = pos + 1
             expr = self.expression()
-            return ("return", expr, tok[2])
+            return Return(expr, line, col)
 
         # Estructuras de control
-        if self.peek_type("IF"):
+        if kind == T_IF:
             return self.if_stmt()
-        if self.peek_type("FOR"):
+        if kind == T_FOR:
             return self.for_stmt()
-        if self.peek_type("WHILE"):
+        if kind == T_WHILE:
             return self.while_stmt()
 
         # Función
-        if self.peek_type("DEF"):
+        if kind == T_DEF:
             return self.func_def()
 
         # Clase
-        if self.peek_type("CLASS"):
+        if kind == T_CLASS:
             return self.class_def()
 
         # Asignación o llamada
-        if self.peek_type("IDENT"):
-            ident = self.match("IDENT")
-            
+        if kind == T_IDENT:
+            self.pos = pos + 1
+            ident = self.name(pos)
+            kind = self.kinds[self.pos]
+
             # Acceso a atributo: obj.attr = value
-            if self.peek_type("DOT"):
-                self.match("DOT")
-                attr = self.match("IDENT")[1]
-                if self.peek_type("ASSIGN"):
-                    self.match("ASSIGN")
+            if kind == T_DOT:
+                self.pos += 1
+                attr = self.name(self.match(T_IDENT))
+                kind = self.kinds[self.pos]
+                if kind == T_ASSIGN:
+                    self.pos += 1
                     expr = self.expression()
-                    return ("attr_assign", ident[1], attr, expr, ident[2])
-                elif self.peek_type("LPAREN"):
+                    return AttrAssign(ident, attr, expr, line, col)
+                elif kind == T_LPAREN:
                     # Llamada a método: obj.method()
                     args = self.call_args()
-                    return ("method_call", ident[1], attr, args, ident[2])
+                    return MethodCall(ident, attr, args, line, col)
                 else:
                     # Solo acceso: obj.attr
-                    return ("attr_access", ident[1], attr, ident[2])
-            
-            elif self.peek_type("ASSIGN"):
-                self.match("ASSIGN")
+                    return Attribute(ident, attr, line, col)
+
+            elif kind == T_ASSIGN:
+                self.pos += 1
                 expr = self.expression()
-                return ("assign", ident[1], expr, ident[2])
-            elif self.peek_type("LPAREN"):
+                return Assign(ident, expr, line, col)
+            elif kind == T_LPAREN:
                 args = self.call_args()
-                return ("call", ident[1], args, ident[2])
+                return Call(ident, args, line, col)
             else:
-                return ("var", ident[1], ident[2])
+                return Name(ident, line, col)
 
         # Print
-        if self.peek_type("PRINT"):
-            self.match("PRINT")
+        if kind == T_PRINT:
+            self.pos = pos + 1
             args = self.call_args()
-            return ("print", args, tok[2])
+            return Print(args, line, col)
 
         # Input
-        if self.peek_type("INPUT"):
-            self.match("INPUT")
+        if kind == T_INPUT:
+            self.pos = pos + 1
             args = self.call_args()
-            return ("input", args, tok[2])
+            return Input(args, line, col)
 
         # Pass
-        if self.peek_type("PASS"):
-            self.match("PASS")
-            return ("pass", tok[2])
+        if kind == T_PASS:
+            self.pos = pos + 1
+            return Pass(line, col)
 
         return None
 
+    def block(self, header: int):
+        """Cuerpo de la sentencia compuesta que empieza en el token header.
+
+        Son las líneas siguientes más indentadas que la cabecera, todas a la
+        misma columna, o una sentencia simple en la misma línea (if x: y = 1).
+        """
+        kinds = self.kinds
+        columns = self.columns
+        pos = self.pos
+        if kinds[pos] != T_NEWLINE and kinds[pos] != T_EOF:
+            if kinds[pos] in _COMPOUND_KINDS:
+                raise SyntaxError(f"❌ Error sintáctico línea {self.lines[pos]}: "
+                                  f"'{self.tokens.text(pos)}' debe empezar en una línea nueva")
+            stmt = self.statement()
+            if not stmt:
+                tok = self.peek()
+                raise SyntaxError(f"❌ Error sintáctico línea {tok[2]}: sentencia inesperada '{tok[1]}'")
+            return [stmt]
+
+        while kinds[pos] == T_NEWLINE:
+            pos += 1
+        self.pos = pos
+        indent = columns[pos]
+        if kinds[pos] == T_EOF or indent <= columns[header]:
+            raise SyntaxError(f"❌ Error sintáctico línea {self.lines[header]}: se esperaba un bloque indentado")
+        body = []
+        while True:
+            stmt = self.statement()
+            if not stmt:
+                tok = self.peek()
+                raise SyntaxError(f"❌ Error sintáctico línea {tok[2]}: sentencia inesperada '{tok[1]}'")
+            self.end_statement()
+            body.append(stmt)
+            pos = self.pos
+            while kinds[pos] == T_NEWLINE:
+                pos += 1
+            self.pos = pos
+            # Una línea menos indentada cierra el bloque; una más, es un error
+            if kinds[pos] == T_EOF or columns[pos] < indent:
+                return body
+            if columns[pos] > indent:
+                raise SyntaxError(f"❌ Error sintáctico línea {self.lines[pos]}: indentación inesperada")
+
     def func_def(self):
-        self.match("DEF")
-        name = self.match("IDENT")[1]
-        self.match("LPAREN")
+        def_tok = self.match(T_DEF)
+        name = self.name(self.match(T_IDENT))
+        self.match(T_LPAREN)
         params = []
-        while not self.peek_type("RPAREN"):
-            param = self.match("IDENT")[1]
+        while not self.peek_type(T_RPAREN):
+            param = self.name(self.match(T_IDENT))
             params.append(param)
-            if self.peek_type("COMMA"):
-                self.match("COMMA")
-        self.match("RPAREN")
-        self.match("COLON")
-        
-        if self.peek_type("NEWLINE"):
-            self.match("NEWLINE")
-        
-        body = []
-        while not self.peek_type("EOF"):
-            if self.peek_type("DEF"):
-                break
-            
-            if self.peek_type("NEWLINE"):
-                self.match("NEWLINE")
-                continue
-                
-            stmt = self.statement()
-            if stmt:
-                body.append(stmt)
-            else:
-                break
-        
-        return ("func_def", name, params, body)
+            if self.peek_type(T_COMMA):
+                self.pos += 1
+        self.match(T_RPAREN)
+        self.match(T_COLON)
+        body = self.block(def_tok)
+        return FunctionDef(name, params, body, self.lines[def_tok], self.columns[def_tok])
 
     def class_def(self):
-        self.match("CLASS")
-        name = self.match("IDENT")[1]
-        self.match("COLON")
-        
-        if self.peek_type("NEWLINE"):
-            self.match("NEWLINE")
-        
+        class_tok = self.match(T_CLASS)
+        name = self.name(self.match(T_IDENT))
+        base = None
+        if self.peek_type(T_LPAREN):
+            # Herencia simple: class Hijo(Padre):
+            self.pos += 1
+            base = self.name(self.match(T_IDENT))
+            self.match(T_RPAREN)
+        self.match(T_COLON)
+
+        # El cuerpo de una clase solo puede tener métodos y pass
         methods = []
-        while not self.peek_type("EOF"):
-            if self.peek_type("CLASS") or self.peek_type("DEF"):
-                # Si encontramos otra clase o función global, salir
-                if self.peek_type("CLASS"):
-                    break
-                # Si es DEF, verificar si es un método de la clase
-                if self.peek_type("DEF"):
-                    method = self.func_def()
-                    methods.append(method)
-            elif self.peek_type("NEWLINE"):
-                self.match("NEWLINE")
-                continue
-            elif self.peek_type("PASS"):
-                self.match("PASS")
-                if self.peek_type("NEWLINE"):
-                    self.match("NEWLINE")
-                break
-            else:
-                break
-        
-        return ("class_def", name, methods)
+        for stmt in self.block(class_tok):
+            if stmt.kind == FUNC_DEF:
+                methods.append(stmt)
+            elif stmt.kind != PASS:
+                raise SyntaxError(f"❌ Error sintáctico línea {stmt.line}: "
+                                  f"en una clase solo se admiten métodos (def) y pass")
+
+        return ClassDef(name, methods, self.lines[class_tok], self.columns[class_tok], base)
 
     def if_stmt(self):
-        self.match("IF")
+        if_tok = self.match(T_IF)
         condition = self.expression()
-        self.match("COLON")
-        
-        if self.peek_type("NEWLINE"):
-            self.match("NEWLINE")
-        
-        if_body = []
-        while (not self.peek_type("EOF") and 
-               not self.peek_type("ELSE") and 
-               not self.peek_type("ELIF")):
-            
-            if self.peek_type("NEWLINE"):
-                self.match("NEWLINE")
-                continue
-                
-            stmt = self.statement()
-            if stmt:
-                if_body.append(stmt)
-            else:
-                break
-        
+        self.match(T_COLON)
+        if_body = self.block(if_tok)
+
         elif_cases = []
-        while self.peek_type("ELIF"):
-            self.match("ELIF")
+        while self.continues(if_tok, T_ELIF):
             elif_condition = self.expression()
-            self.match("COLON")
-            
-            if self.peek_type("NEWLINE"):
-                self.match("NEWLINE")
-            
-            elif_body = []
-            while (not self.peek_type("EOF") and 
-                   not self.peek_type("ELSE") and 
-                   not self.peek_type("ELIF")):
-                
-                if self.peek_type("NEWLINE"):
-                    self.match("NEWLINE")
-                    continue
-                    
-                stmt = self.statement()
-                if stmt:
-                    elif_body.append(stmt)
-                else:
-                    break
-            
+            self.match(T_COLON)
+            elif_body = self.block(if_tok)
             elif_cases.append((elif_condition, elif_body))
-        
+
         # Manejar else
         else_body = []
-        if self.peek_type("ELSE"):
-            self.match("ELSE")
-            self.match("COLON")
-            
-            if self.peek_type("NEWLINE"):
-                self.match("NEWLINE")
-            
-            while not self.peek_type("EOF"):
-                if self.peek_type("NEWLINE"):
-                    self.match("NEWLINE")
-                    continue
-                    
-                stmt = self.statement()
-                if stmt:
-                    else_body.append(stmt)
-                else:
-                    break
-        
-        return ("if", condition, if_body, elif_cases, else_body)
+        if self.continues(if_tok, T_ELSE):
+            self.match(T_COLON)
+            else_body = self.block(if_tok)
+
+        return If(condition, if_body, elif_cases, else_body, self.lines[if_tok], self.columns[if_tok])
 
     def for_stmt(self):
-        self.match("FOR")
-        var = self.match("IDENT")[1]
-        self.match("IN")
+        for_tok = self.match(T_FOR)
+        var = self.name(self.match(T_IDENT))
+        self.match(T_IN)
         iterable = self.expression()
-        self.match("COLON")
-        
-        if self.peek_type("NEWLINE"):
-            self.match("NEWLINE")
-        
-        body = []
-        while not self.peek_type("EOF"):
-            if self.peek_type("NEWLINE"):
-                self.match("NEWLINE")
-                continue
-                
-            stmt = self.statement()
-            if stmt:
-                body.append(stmt)
-            else:
-                break
-        
-        return ("for", var, iterable, body)
+        self.match(T_COLON)
+        body = self.block(for_tok)
+        return For(var, iterable, body, self.lines[for_tok], self.columns[for_tok])
 
     def while_stmt(self):
-        self.match("WHILE")
+        while_tok = self.match(T_WHILE)
         condition = self.expression()
-        self.match("COLON")
-        
-        if self.peek_type("NEWLINE"):
-            self.match("NEWLINE")
-        
-        body = []
-        while not self.peek_type("EOF"):
-            if self.peek_type("NEWLINE"):
-                self.match("NEWLINE")
-                continue
-                
-            stmt = self.statement()
-            if stmt:
-                body.append(stmt)
-            else:
-                break
-        
-        return ("while", condition, body)
+        self.match(T_COLON)
+        body = self.block(while_tok)
+        return While(condition, body, self.lines[while_tok], self.columns[while_tok])
 
     def call_args(self):
         args = []
-        self.match("LPAREN")
-        while not self.peek_type("RPAREN"):
+        kinds = self.kinds
+        self.match(T_LPAREN)
+        while kinds[self.pos] != T_RPAREN:
             args.append(self.expression())
-            if self.peek_type("COMMA"):
-                self.match("COMMA")
-        self.match("RPAREN")
+            if kinds[self.pos] == T_COMMA:
+                self.pos += 1
+        self.match(T_RPAREN)
         return args
 
     def expression(self):
@@ -388,102 +652,193 @@ class Parser:
 
     def logical_or(self):
         expr = self.logical_and()
-        while self.peek_type("OR"):
-            op_tok = self.match("OR")
-            op = op_tok[1]
+        while self.kinds[self.pos] == T_OR:
+            op_tok = self.pos
+            self.pos = op_tok + 1
             right = self.logical_and()
-            expr = ("binop", op, expr, right, op_tok[2])
+            expr = BinOp("or", expr, right, self.lines[op_tok], self.columns[op_tok])
         return expr
 
     def logical_and(self):
         expr = self.comparison()
-        while self.peek_type("AND"):
-            op_tok = self.match("AND")
-            op = op_tok[1]
+        while self.kinds[self.pos] == T_AND:
+            op_tok = self.pos
+            self.pos = op_tok + 1
             right = self.comparison()
-            expr = ("binop", op, expr, right, op_tok[2])
+            expr = BinOp("and", expr, right, self.lines[op_tok], self.columns[op_tok])
         return expr
 
     def comparison(self):
         expr = self.addition()
-        while self.peek_type("EQ") or self.peek_type("NEQ") or self.peek_type("LT") or \
-            self.peek_type("GT") or self.peek_type("LE") or self.peek_type("GE"):
-            op_tok = self.match("EQ", "NEQ", "LT", "GT", "LE", "GE")
-            op = op_tok[1]
+        kinds = self.kinds
+        # EQ, NEQ, LT, GT, LE y GE tienen códigos consecutivos
+        while T_EQ <= kinds[self.pos] <= T_GE:
+            op_tok = self.pos
+            self.pos = op_tok + 1
             right = self.addition()
-            expr = ("binop", op, expr, right, op_tok[2])
+            expr = BinOp(KIND_TEXT[kinds[op_tok]], expr, right, self.lines[op_tok], self.columns[op_tok])
         return expr
 
     def addition(self):
         expr = self.term()
-        while self.peek_type("PLUS") or self.peek_type("MINUS"):
-            op_tok = self.match("PLUS", "MINUS")
-            op = op_tok[1]
+        kinds = self.kinds
+        while T_PLUS <= kinds[self.pos] <= T_MINUS:
+            op_tok = self.pos
+            self.pos = op_tok + 1
             right = self.term()
-            expr = ("binop", op, expr, right, op_tok[2])
+            expr = BinOp(KIND_TEXT[kinds[op_tok]], expr, right, self.lines[op_tok], self.columns[op_tok])
         return expr
 
     def term(self):
         expr = self.factor()
-        while self.peek_type("MUL") or self.peek_type("DIV") or self.peek_type("MOD"):
-            op_tok = self.match("MUL", "DIV", "MOD")
-            op = op_tok[1]
+        kinds = self.kinds
+        while T_MUL <= kinds[self.pos] <= T_MOD:
+            op_tok = self.pos
+            self.pos = op_tok + 1
             right = self.factor()
-            expr = ("binop", op, expr, right, op_tok[2])
+            expr = BinOp(KIND_TEXT[kinds[op_tok]], expr, right, self.lines[op_tok], self.columns[op_tok])
         return expr
 
     def factor(self):
-        tok = self.peek()
-        if tok[0] == "NUMBER":
-            self.match("NUMBER")
-            return ("number", tok[1])
-        elif tok[0] == "STRING":
-            self.match("STRING")
-            return ("string", tok[1])
-        elif tok[0] == "IDENT":
-            ident = self.match("IDENT")
-            
+        pos = self.pos
+        kind = self.kinds[pos]
+        line, col = self.lines[pos], self.columns[pos]
+        if kind == T_NUMBER:
+            self.pos = pos + 1
+            raw = self.tokens.text(pos)
+            return Constant(decode_number(raw), raw, line, col)
+        elif kind == T_STRING:
+            self.pos = pos + 1
+            raw = self.tokens.text(pos)
+            return Constant(decode_string(raw), raw, line, col)
+        elif kind == T_IDENT:
+            self.pos = pos + 1
+            ident = self.name(pos)
+            kind = self.kinds[self.pos]
+
             # Acceso a atributo o método
-            if self.peek_type("DOT"):
-                self.match("DOT")
-                attr = self.match("IDENT")[1]
-                if self.peek_type("LPAREN"):
+            if kind == T_DOT:
+                self.pos += 1
+                attr = self.name(self.match(T_IDENT))
+                if self.peek_type(T_LPAREN):
                     # Llamada a método
                     args = self.call_args()
-                    return ("method_call", ident[1], attr, args, tok[2])
+                    return MethodCall(ident, attr, args, line, col)
                 else:
                     # Acceso a atributo
-                    return ("attr_access", ident[1], attr, tok[2])
-            
-            elif self.peek_type("LPAREN"):
+                    return Attribute(ident, attr, line, col)
+
+            elif kind == T_LPAREN:
                 args = self.call_args()
-                return ("call", ident[1], args, tok[2])
+                return Call(ident, args, line, col)
             else:
-                return ("var", ident[1], tok[2])
-        elif tok[0] == "LPAREN":
-            self.match("LPAREN")
+                return Name(ident, line, col)
+        elif kind == T_LPAREN:
+            self.pos = pos + 1
             expr = self.expression()
-            self.match("RPAREN")
+            self.match(T_RPAREN)
             return expr
-        elif tok[0] in ("TRUE", "FALSE"):
-            self.match(tok[0])
-            return ("bool", tok[1], tok[2])
-        elif tok[0] == "INPUT":
-            self.match("INPUT")
+        elif kind == T_TRUE or kind == T_FALSE:
+            self.pos = pos + 1
+            return Constant(kind == T_TRUE, KIND_TEXT[kind], line, col)
+        elif kind == T_INPUT:
+            self.pos = pos + 1
             args = self.call_args()
-            return ("call", "input", args, tok[2])
+            return Call("input", args, line, col)
         else:
+            tok = self.peek()
             raise SyntaxError(f"❌ Error sintáctico línea {tok[2]}: expresión inesperada '{tok[1]}'")
 
 # ------------------------
 # SEMANTIC ANALYZER
 # ------------------------
+def assigned_names(statements, names=None):
+    """Nombres asignados en un bloque sin entrar en cuerpos de funciones o clases."""
+    names = set() if names is None else names
+    for node in statements:
+        if not node:
+            continue
+        kind = node.kind
+        if kind in (ASSIGN, FUNC_DEF, CLASS_DEF):
+            names.add(node.name)
+        elif kind == FOR:
+            names.add(node.var)
+            assigned_names(node.body, names)
+        elif kind == WHILE:
+            assigned_names(node.body, names)
+        elif kind == IF:
+            assigned_names(node.body, names)
+            for _, elif_body in node.elifs:
+                assigned_names(elif_body, names)
+            assigned_names(node.orelse, names)
+    return names
+
+def defined_names(statements, names=None):
+    """Funciones y clases definidas en un bloque: en el Executor son globales."""
+    names = set() if names is None else names
+    for node in statements:
+        if not node:
+            continue
+        kind = node.kind
+        if kind in (FUNC_DEF, CLASS_DEF):
+            names.add(node.name)
+            if kind == FUNC_DEF:
+                defined_names(node.body, names)
+        elif kind in (FOR, WHILE):
+            defined_names(node.body, names)
+        elif kind == IF:
+            defined_names(node.body, names)
+            for _, elif_body in node.elifs:
+                defined_names(elif_body, names)
+            defined_names(node.orelse, names)
+    return names
+
+def contains_return(statements) -> bool:
+    """Si un bloque tiene algún return propio (los de funciones anidadas no cuentan)."""
+    for node in statements:
+        if not node:
+            continue
+        kind = node.kind
+        if kind == RETURN:
+            return True
+        if kind in (FOR, WHILE) and contains_return(node.body):
+            return True
+        if kind == IF and (contains_return(node.body) or contains_return(node.orelse)
+                           or any(contains_return(elif_body) for _, elif_body in node.elifs)):
+            return True
+    return False
+
+def undefined_value(name: str):
+    # Valor inicial de un slot todavía no asignado
+    return f"[Variable {name} no definida]"
+
 class SemanticAnalyzer:
-    def __init__(self, tokens: List[Tuple[str,str,int,int]]):
+    """Resuelve cada variable a un slot y detecta errores estáticos.
+
+    analyze() anota en el sitio los nodos que nombran una variable (Name,
+    Assign, Attribute, AttrAssign, MethodCall, For) con su slot: un índice
+    >= 0 en el frame local de la función o un índice negativo ~i en la
+    tabla global. Las FunctionDef reciben además su frame inicial.
+
+    Como en el Executor, dentro de una función son locales los parámetros y
+    los nombres asignados que no se asignan también a nivel de programa; las
+    funciones y clases siempre son globales.
+
+    Después, TypeInference (tipos.py) infiere el tipo de cada símbolo, anota
+    cada BinOp con los tipos de sus operandos y añade a errors las
+    operaciones que fallan con cualquier valor que puedan tener.
+    """
+
+    def __init__(self, tokens: TokenStream):
         self.global_scope: Dict[str,Dict[str,Any]] = {}
         self.scopes: List[Dict[str,Dict[str,Any]]] = [self.global_scope]
         self.errors: List[str] = []
         self.tokens = tokens
+        self.global_names: List[str] = []  # nombre de cada slot global
+        self.global_refs: List[int] = []   # slot codificado (~i) de cada global
+        self.module_names = set()
+        self.undefined_slots = set()  # slots globales de nombres que el programa nunca define
+        self.local_scopes = []  # (FunctionDef, scope) de cada función resuelta
 
         self.define('print', {"kind":"builtin","type":"function","params":["*args"],"line":0})
         self.define('input', {"kind":"builtin","type":"function","params":["prompt"],"line":0})
@@ -492,379 +847,711 @@ class SemanticAnalyzer:
 
     def define(self, name: str, info: Dict[str,Any]):
         sc = self.current_scope()
-        if name in sc:
+        previous = sc.get(name)
+        if previous is not None and previous["kind"] != "var" and info["kind"] != "var":
             self.errors.append(f"Ln {info.get('line','?')}: Símbolo '{name}' ya definido en este scope")
+        if previous is not None and "slot" in previous:
+            info["slot"] = previous["slot"]
         sc[name] = info
+        return info
 
     def current_scope(self):
         return self.scopes[-1]
 
-    def analyze(self, ast: List[Any]):
-        # Análisis simplificado
-        for node in ast:
-            if not node: continue
-            kind = node[0]
-            if kind == "assign":
-                name = node[1]; line = node[3]
-                self.define(name, {"kind":"var","type":"unknown","line":line})
-            elif kind == "func_def":
-                name = node[1]; line = 0
-                self.define(name, {"kind":"function","type":"function","line":line})
+    def analyze(self, ast: List[Any], predefined=(), infer_types=True):
+        """Resuelve el programa; predefined son globales que ya existen al ejecutar.
+
+        Con infer_types False solo se asignan los slots, sin TypeInference.
+        """
+        self.module_names = assigned_names(ast) | defined_names(ast) | set(predefined)
+        for name in sorted(self.module_names):
+            self.global_slot(name)
+        self.resolve_block(ast)
+        if infer_types:
+            self.errors += TypeInference(self).run(ast, predefined)
+        return ast
+
+    # --- Slots ---
+    def global_slot(self, name: str) -> int:
+        info = self.global_scope.get(name)
+        if info is None:
+            info = self.global_scope[name] = {"kind":"var","type":"unknown","line":0}
+        if "slot" not in info:
+            info["slot"] = len(self.global_names)
+            self.global_names.append(name)
+            # Un solo int por slot codificado, compartido por todos los nodos
+            self.global_refs.append(~info["slot"])
+        return self.global_refs[info["slot"]]
+
+    def slot(self, name: str, line) -> int:
+        # Slot de una lectura; los nombres sin ninguna definición son un error
+        scope = self.current_scope()
+        if scope is not self.global_scope and name in scope:
+            return scope[name]["slot"]
+        if name not in self.module_names:
+            self.errors.append(f"Ln {line}: Variable '{name}' no definida")
+            self.module_names.add(name)
+            self.undefined_slots.add(self.global_slot(name))
+        return self.global_slot(name)
+
+    def store_slot(self, name: str) -> int:
+        # Slot de una escritura: local si la función lo declara, si no global
+        scope = self.current_scope()
+        if scope is not self.global_scope and name in scope:
+            return scope[name]["slot"]
+        return self.global_slot(name)
+
+    # --- Sentencias ---
+    def resolve_block(self, statements):
+        for stmt in statements:
+            if stmt:
+                self.resolve_stmt(stmt)
+
+    def resolve_stmt(self, node):
+        kind = node.kind
+
+        if kind == ASSIGN:
+            self.resolve_expr(node.value)
+            node.slot = self.store_slot(node.name)
+
+        elif kind == ATTR_ASSIGN:
+            self.resolve_expr(node.value)
+            node.slot = self.slot(node.obj, node.line)
+
+        elif kind == IF:
+            self.resolve_expr(node.condition)
+            self.resolve_block(node.body)
+            for condition, body in node.elifs:
+                self.resolve_expr(condition)
+                self.resolve_block(body)
+            self.resolve_block(node.orelse)
+
+        elif kind == FOR:
+            self.resolve_expr(node.iterable)
+            self.resolve_block(node.body)
+            node.slot = self.store_slot(node.var)
+
+        elif kind == WHILE:
+            self.resolve_expr(node.condition)
+            self.resolve_block(node.body)
+
+        elif kind == FUNC_DEF:
+            self.define_global(node.name, {"kind":"function","type":"function","params":node.params,
+                                           "line":node.line})
+            self.resolve_function(node)
+            node.slot = self.global_slot(node.name)
+
+        elif kind == CLASS_DEF:
+            if node.base is not None and node.base not in self.module_names:
+                self.errors.append(f"Ln {node.line}: Clase base '{node.base}' no definida")
+            self.define_global(node.name, {"kind":"class","type":"class","base":node.base,
+                                           "line":node.line})
+            for method in node.methods:
+                self.resolve_function(method)
+            node.slot = self.global_slot(node.name)
+
+        elif kind == RETURN:
+            self.resolve_expr(node.value)
+
+        elif kind in (PRINT, INPUT):
+            for arg in node.args:
+                self.resolve_expr(arg)
+
+        else:
+            self.resolve_expr(node)
+
+    def define_global(self, name, info):
+        self.scopes.append(self.global_scope)
+        self.define(name, info)
+        self.scopes.pop()
+
+    def resolve_function(self, node):
+        # Locales: parámetros y nombres asignados que no son globales
+        params = node.params
+        local_names = list(params)
+        module_names = self.module_names
+        local_names += sorted(n for n in assigned_names(node.body)
+                              if n not in module_names and n not in params)
+        scope: Dict[str,Dict[str,Any]] = {}
+        for index, local in enumerate(local_names):
+            scope[local] = {"kind":"param" if index < len(params) else "var",
+                            "type":"unknown","line":node.line,"slot":index}
+
+        self.scopes.append(scope)
+        self.resolve_block(node.body)
+        self.scopes.pop()
+        self.local_scopes.append((node, scope))
+        node.frame = [undefined_value(local) for local in local_names]
+
+    # --- Expresiones ---
+    def resolve_expr(self, expr):
+        if not expr:
+            return
+        kind = expr.kind
+
+        if kind == VAR:
+            expr.slot = self.slot(expr.name, expr.line)
+
+        elif kind == ATTR:
+            expr.slot = self.slot(expr.obj, expr.line)
+
+        elif kind in (BINOP, LOGICAL):
+            self.resolve_expr(expr.left)
+            self.resolve_expr(expr.right)
+
+        elif kind == CALL:
+            for arg in expr.args:
+                self.resolve_expr(arg)
+
+        elif kind == METHOD_CALL:
+            for arg in expr.args:
+                self.resolve_expr(arg)
+            expr.slot = self.slot(expr.obj, expr.line)
+
+# ------------------------
+# OPERADORES
+# ------------------------
+def _divide(left_val, right_val):
+    return left_val / right_val if right_val != 0 else "indefinida"
+
+# Operadores binarios compartidos por los backends compilados.
+# 'and' y 'or' evalúan ambos operandos, igual que Executor.eval_expr.
+BINARY_OPERATORS = {
+    '+': operator.add,
+    '-': operator.sub,
+    '*': operator.mul,
+    '/': _divide,
+    '%': operator.mod,
+    '==': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '>': operator.gt,
+    '<=': operator.le,
+    '>=': operator.ge,
+    'and': lambda left_val, right_val: left_val and right_val,
+    'or': lambda left_val, right_val: left_val or right_val,
+}
+
+def select_operator(node):
+    """La función que aplica el operador de un BinOp, elegida con los tipos inferidos."""
+    op = node.op
+    left, right = node.operand_types or (None, None)
+    if op in ('and', 'or') and left == BOOL and right == BOOL:
+        # Entre dos bool, & y | dan lo mismo que and/or sin pasar por una lambda
+        return operator.and_ if op == 'and' else operator.or_
+    if op == '/' and nonzero_constant(node.right):
+        # El divisor nunca es cero: no hace falta comprobarlo en cada división
+        return operator.truediv
+    return BINARY_OPERATORS[op]
 
 # ------------------------
 # EJECUTOR DEL AST MEJORADO
 # ------------------------
 class Executor:
-    def __init__(self, ast, symbols):
+    """Ejecuta el AST resuelto por SemanticAnalyzer.
+
+    Las variables viven en listas: self.globals para el programa y
+    self.frame para la llamada en curso. Un slot >= 0 indexa el frame y un
+    slot negativo indexa ~slot en las globales. Los slots empiezan con el
+    texto "[Variable x no definida]", así que leer no necesita comprobar nada.
+    Cada nodo se despacha por su tipo entero en la tabla self.handlers.
+    """
+
+    def __init__(self, ast, symbols, io=STANDARD_IO):
         self.ast = ast
-        self.symbols = symbols
+        self.symbols = symbols   # Globales iniciales; se actualizan al terminar run()
+        self.io = io             # print/input del programa (entrada_salida)
+        # Los slots dependen de symbols y se resuelven siempre; los tipos de
+        # los BinOp ya suelen venir del análisis de run_front_end
+        analyzer = SemanticAnalyzer([])
+        self.program = analyzer.analyze(ast, predefined=symbols, infer_types=False)
+        self.global_names = analyzer.global_names
+        self.undefined = [undefined_value(name) for name in self.global_names]
+        self.globals = list(self.undefined)
+        for index, name in enumerate(self.global_names):
+            if name in symbols:
+                self.globals[index] = symbols[name].get("value")
+        self.frame = []      # Variables locales de la llamada en curso
         self.functions = {}  # Almacenar definiciones de funciones
-        self.classes = {}    # Almacenar definiciones de clases
+        self.classes = {}    # Clases definidas: nombre -> UserClass
         self.return_value = None  # Para manejar return
+        self.returning = False    # Hay un return pendiente de propagar
+        self.specializer = None   # LoopSpecializer enganchado por _build_tree
+
+        # Tabla de despacho: node.kind -> método
+        handlers = [None] * NODE_KINDS
+        handlers[VAR] = self.eval_var
+        handlers[CONST] = self.eval_const
+        handlers[BINOP] = self.eval_binop
+        handlers[ATTR] = self.eval_attr
+        handlers[CALL] = self.execute_call
+        handlers[METHOD_CALL] = self.execute_method_call
+        handlers[LOGICAL] = self.eval_logical
+        handlers[ASSIGN] = self.execute_assign
+        handlers[ATTR_ASSIGN] = self.execute_attr_assign
+        handlers[IF] = self.execute_if
+        handlers[WHILE] = self.execute_while
+        handlers[FOR] = self.execute_for
+        handlers[RETURN] = self.execute_return
+        handlers[PRINT] = self.execute_print
+        handlers[INPUT] = self.execute_input
+        handlers[FUNC_DEF] = self.execute_func_def
+        handlers[CLASS_DEF] = self.execute_class_def
+        handlers[PASS] = self.execute_pass
+        self.handlers = handlers
+
+        # Una caché en línea por cada punto de llamada a método, la
+        # operación de cada BinOp ya elegida con los tipos inferidos y el
+        # plan de cada for
+        self.method_caches = []
+        binops = []
+        for statement in self.program:
+            if statement is None:
+                continue
+            for node in walk(statement):
+                if node.kind == METHOD_CALL:
+                    node.cache = MethodCache(node.method, node.line)
+                    self.method_caches.append(node.cache)
+                elif node.kind == BINOP:
+                    binops.append(node)
+                elif node.kind == FOR:
+                    iterable = node.iterable
+                    if iterable.kind == CALL and iterable.func == "range" and 1 <= len(iterable.args) <= 3:
+                        node.range_args = iterable.args
+                    node.body_returns = contains_return(node.body)
+        if any(node.operand_types is None for node in binops):
+            # AST sin analizar o reconstruido con from_data: los tipos se infieren
+            # aquí. Solo con los nombres de symbols, como "cualquiera", para que
+            # los tipos valgan también si otro Executor reutiliza el AST
+            TypeInference(analyzer).run(self.program, tuple(symbols))
+        for node in binops:
+            node.operate = select_operator(node)
 
     def run(self):
         try:
-            for node in self.ast:
+            for node in self.program:
                 result = self.execute(node)
-                if self.return_value is not None:
+                if self.returning:
                     val = self.return_value
                     self.return_value = None
+                    self.returning = False
                     return val
+        except RecursionError:
+            self.io.write(f"{RUNTIME_ERROR}: {PYTHON_RECURSION_ERROR}")
         except Exception as e:
-            print(f"Error durante la ejecución: {e}")
+            self.io.write(f"Error durante la ejecución: {e}")
+        finally:
+            self.io.flush()
+            self.export_globals()
+
+    def export_globals(self):
+        # Copia las globales asignadas al diccionario de símbolos
+        for index, name in enumerate(self.global_names):
+            value = self.globals[index]
+            if value is self.undefined[index]:
+                continue
+            entry = self.symbols.get(name)
+            if entry is None:
+                self.symbols[name] = {"value": value}
+            else:
+                entry["value"] = value
 
     def execute(self, node):
         if node is None:
             return
+        return self.handlers[node.kind](node)
 
-        node_type = node[0]
+    def eval_expr(self, expr):
+        if expr is None:
+            return None
+        return self.handlers[expr.kind](expr)
 
-        if node_type == "assign":
-            _, name, value_node, _ = node
-            val = self.eval_expr(value_node)
-            if name not in self.symbols:
-                self.symbols[name] = {"value": val}
-            else:
-                self.symbols[name]["value"] = val
-
-        elif node_type == "attr_assign":
-            # obj.attr = value
-            _, obj_name, attr_name, value_node, _ = node
-            val = self.eval_expr(value_node)
-            
-            if obj_name in self.symbols:
-                obj = self.symbols[obj_name].get("value")
-                if isinstance(obj, dict) and "__class__" in obj:
-                    obj["__dict__"][attr_name] = val
-            elif obj_name == "self" and "self" in self.symbols:
-                obj = self.symbols["self"].get("value")
-                if isinstance(obj, dict) and "__class__" in obj:
-                    obj["__dict__"][attr_name] = val
-
-        elif node_type == "if":
-            condition = node[1]
-            if_body = node[2]
-            elif_cases = node[3] if len(node) > 3 else []
-            else_body = node[4] if len(node) > 4 else []
-            
-            cond = self.eval_expr(condition)
-            if cond:
-                for stmt in if_body:
-                    self.execute(stmt)
-            else:
-                # Probar elif cases
-                executed = False
-                for elif_cond, elif_body in elif_cases:
-                    if self.eval_expr(elif_cond):
-                        for stmt in elif_body:
-                            self.execute(stmt)
-                        executed = True
-                        break
-                
-                if not executed and else_body:
-                    for stmt in else_body:
-                        self.execute(stmt)
-
-        elif node_type == "call":
-            _, func_name, args, line = node
-            
-            # Funciones builtin
-            if func_name == "print":
-                vals = [self.eval_expr(arg) for arg in args]
-                print(*vals)
-                return None
-            elif func_name == "input":
-                prompt = self.eval_expr(args[0]) if args else ""
-                user_input = input(prompt)
-                return user_input
-            elif func_name == "int":
-                val = self.eval_expr(args[0])
-                return int(val) if val else 0
-            elif func_name == "range":
-                if len(args) == 1:
-                    return range(self.eval_expr(args[0]))
-                elif len(args) == 2:
-                    return range(self.eval_expr(args[0]), self.eval_expr(args[1]))
-                elif len(args) == 3:
-                    return range(self.eval_expr(args[0]), self.eval_expr(args[1]), self.eval_expr(args[2]))
-            
-            # Funciones definidas por el usuario
-            elif func_name in self.functions:
-                func_def = self.functions[func_name]
-                params = func_def['params']
-                body = func_def['body']
-                
-                # Crear nuevo scope para la función
-                old_symbols = self.symbols.copy()
-                
-                # Asignar argumentos a parámetros
-                for i, param in enumerate(params):
-                    if i < len(args):
-                        self.symbols[param] = {"value": self.eval_expr(args[i])}
-                
-                # Ejecutar cuerpo de la función
-                result = None
-                for stmt in body:
-                    self.execute(stmt)
-                    if self.return_value is not None:
-                        result = self.return_value
-                        self.return_value = None
-                        break
-                
-                # Restaurar scope anterior
-                self.symbols = old_symbols
-                return result
-            
-            # Instanciación de clases
-            elif func_name in self.classes:
-                class_def = self.classes[func_name]
-                instance = {"__class__": func_name, "__dict__": {}}
-                
-                # Buscar y ejecutar __init__ si existe
-                if "__init__" in class_def['methods']:
-                    init_method = class_def['methods']['__init__']
-                    old_symbols = self.symbols.copy()
-                    
-                    # self es la instancia
-                    self.symbols['self'] = {"value": instance}
-                    
-                    # Asignar argumentos (sin contar self)
-                    params = init_method['params'][1:]  # Saltar 'self'
-                    for i, param in enumerate(params):
-                        if i < len(args):
-                            self.symbols[param] = {"value": self.eval_expr(args[i])}
-                    
-                    # Ejecutar __init__
-                    for stmt in init_method['body']:
-                        self.execute(stmt)
-                    
-                    self.symbols = old_symbols
-                
-                return instance
+    def execute_block(self, body):
+        # Ejecuta sentencias hasta terminar o encontrar un return
+        handlers = self.handlers
+        for stmt in body:
+            handlers[stmt.kind](stmt)
+            if self.returning:
+                return
+
+    def take_return(self):
+        result = self.return_value
+        self.return_value = None
+        self.returning = False
+        return result
+
+    def load(self, slot):
+        return self.frame[slot] if slot >= 0 else self.globals[~slot]
+
+    def store(self, slot, value):
+        if slot >= 0:
+            self.frame[slot] = value
+        else:
+            self.globals[~slot] = value
+
+    def call_body(self, function, values):
+        # Ejecuta un cuerpo en un frame nuevo con los argumentos en sus primeros slots
+        frame = function.frame.copy()
+        count = min(len(function.params), len(values))
+        frame[:count] = values[:count]
+        caller = self.frame
+        self.frame = frame
+        self.execute_block(function.body)
+        self.frame = caller
+        return self.take_return()
+
+    # --- Sentencias ---
+    def execute_assign(self, node):
+        val = self.eval_expr(node.value)
+        slot = node.slot
+        if slot >= 0:
+            self.frame[slot] = val
+        else:
+            self.globals[~slot] = val
+
+    def execute_attr_assign(self, node):
+        # obj.attr = value, con caché de la forma vista la última vez
+        val = self.eval_expr(node.value)
+        obj = self.load(node.slot)
+        if type(obj) is not Instance:
+            return
+        shape = obj.shape
+        if shape is node.cache_shape:
+            next_shape = node.cache_next
+            if next_shape is None:
+                obj.values[node.cache_index] = val
             else:
-                return None
-
-        elif node_type == "method_call":
-            # obj.method(args)
-            _, obj_name, method_name, args, _ = node
-            
-            # Obtener el objeto
-            obj = None
-            if obj_name in self.symbols:
-                obj = self.symbols[obj_name].get("value")
-            
-            if obj and isinstance(obj, dict) and "__class__" in obj:
-                class_name = obj["__class__"]
-                if class_name in self.classes:
-                    class_def = self.classes[class_name]
-                    if method_name in class_def['methods']:
-                        method = class_def['methods'][method_name]
-                        
-                        old_symbols = self.symbols.copy()
-                        
-                        # self es el objeto
-                        self.symbols['self'] = {"value": obj}
-                        
-                        # Asignar argumentos (sin contar self)
-                        params = method['params'][1:] if method['params'] else []
-                        for i, param in enumerate(params):
-                            if i < len(args):
-                                self.symbols[param] = {"value": self.eval_expr(args[i])}
-                        
-                        # Ejecutar método
-                        result = None
-                        for stmt in method['body']:
-                            self.execute(stmt)
-                            if self.return_value is not None:
-                                result = self.return_value
-                                self.return_value = None
-                                break
-                        
-                        self.symbols = old_symbols
-                        return result
-            
+                # Transición conocida: el atributo nuevo va al final
+                obj.shape = next_shape
+                obj.values.append(val)
+            return
+        index = shape.index.get(node.attr)
+        if index is None:
+            node.cache_shape, node.cache_index, node.cache_next = shape, len(obj.values), shape.add(node.attr)
+        else:
+            node.cache_shape, node.cache_index, node.cache_next = shape, index, None
+        obj.set(node.attr, val)
+
+    def execute_if(self, node):
+        condition = node.condition
+        if self.handlers[condition.kind](condition):
+            self.execute_block(node.body)
+            return
+        # Probar elif cases
+        for elif_cond, elif_body in node.elifs:
+            if self.eval_expr(elif_cond):
+                self.execute_block(elif_body)
+                return
+        if node.orelse:
+            self.execute_block(node.orelse)
+
+    def execute_call(self, node):
+        func_name = node.func
+        args = node.args
+
+        # Funciones builtin
+        if func_name == "print":
+            vals = [self.eval_expr(arg) for arg in args]
+            self.io.write(*vals)
+            return None
+        elif func_name == "input":
+            prompt = self.eval_expr(args[0]) if args else ""
+            user_input = self.io.read(prompt)
+            return user_input
+        elif func_name == "int":
+            val = self.eval_expr(args[0])
+            return int(val) if val else 0
+        elif func_name == "range":
+            if 1 <= len(args) <= 3:
+                return range(*[self.eval_expr(arg) for arg in args])
             return None
 
-        elif node_type == "func_def":
-            # Guardar la definición de función
-            _, name, params, body = node
-            self.functions[name] = {
-                'params': params,
-                'body': body
-            }
-            # También agregar a symbols para el análisis semántico
-            if name not in self.symbols:
-                self.symbols[name] = {"kind": "function", "value": None}
-
-        elif node_type == "class_def":
-            # Guardar la definición de clase
-            _, name, methods = node
-            class_methods = {}
-            
-            # Procesar cada método
-            for method in methods:
-                if method[0] == "func_def":
-                    method_name = method[1]
-                    method_params = method[2]
-                    method_body = method[3]
-                    class_methods[method_name] = {
-                        'params': method_params,
-                        'body': method_body
-                    }
-            
-            self.classes[name] = {
-                'methods': class_methods
-            }
-            # También agregar a symbols
-            if name not in self.symbols:
-                self.symbols[name] = {"kind": "class", "value": None}
-
-        elif node_type == "for":
-            _, var, iterable, body = node
-            iter_val = self.eval_expr(iterable)
-            
-            # Iterar sobre el iterable
-            for item in iter_val:
-                self.symbols[var] = {"value": item}
-                for stmt in body:
-                    self.execute(stmt)
-                    if self.return_value is not None:
-                        return
+        # Funciones definidas por el usuario
+        function = self.functions.get(func_name)
+        if function is not None:
+            # Evaluar argumentos en el frame de quien llama
+            handlers = self.handlers
+            values = [handlers[arg.kind](arg) for arg in args]
+            return self.call_body(function, values)
+
+        # Instanciación de clases
+        cls = self.classes.get(func_name)
+        if cls is not None:
+            instance = Instance(cls.shape)
+
+            # Buscar y ejecutar __init__ si existe (puede ser heredado)
+            values = [self.eval_expr(arg) for arg in args]
+            init_method = cls.methods.get("__init__")
+            if init_method is not None:
+                # self es la instancia; un return no sale del constructor
+                self.call_body(init_method, [instance] + values)
+            return instance
+
+        # Función desconocida: se evalúan los argumentos y devuelve None
+        for arg in args:
+            self.eval_expr(arg)
+        return None
 
-        elif node_type == "while":
-            _, condition, body = node
-            while self.eval_expr(condition):
+    def execute_method_call(self, node):
+        # obj.method(args), resuelto con la caché en línea del punto de llamada
+        slot = node.slot
+        obj = self.frame[slot] if slot >= 0 else self.globals[~slot]
+
+        if type(obj) is Instance:
+            cls = obj.shape.cls
+            cache = node.cache
+            if cls is cache.cls:
+                cache.hits += 1
+                method = cache.method
+            else:
+                method = cache.lookup(cls)
+            if method is not None:
+                # self es el objeto
+                handlers = self.handlers
+                values = [obj]
+                values += [handlers[arg.kind](arg) for arg in node.args]
+                return self.call_body(method, values)
+
+        for arg in node.args:
+            self.eval_expr(arg)
+        return None
+
+    def execute_func_def(self, node):
+        # Guardar la definición de función
+        self.functions[node.name] = node
+        # Leer el nombre de una función da None, como en symbols
+        slot = ~node.slot
+        if self.globals[slot] is self.undefined[slot]:
+            self.globals[slot] = None
+
+    def execute_class_def(self, node):
+        # Guardar la clase: nombre del método -> FunctionDef, con los heredados
+        base = None
+        if node.base is not None:
+            base = self.classes.get(node.base)
+            if base is None:
+                raise RuntimeError(f"Clase base '{node.base}' no definida")
+        self.classes[node.name] = UserClass(node.name, {method.name: method for method in node.methods}, base)
+        slot = ~node.slot
+        if self.globals[slot] is self.undefined[slot]:
+            self.globals[slot] = None
+
+    def execute_for(self, node):
+        handlers = self.handlers
+        range_args = node.range_args
+        if range_args is not None:
+            # for x in range(...): los límites directamente, sin pasar por execute_call
+            iter_val = range(*[handlers[arg.kind](arg) for arg in range_args])
+        else:
+            iter_val = self.eval_expr(node.iterable)
+
+        # La variable se escribe en su lista (frame o globales), que no cambia
+        # durante el bucle: call_body siempre devuelve el frame de quien llama
+        slot = node.slot
+        variables = self.frame if slot >= 0 else self.globals
+        index = slot if slot >= 0 else ~slot
+        body = node.body
+
+        if not node.body_returns:
+            # Sin return en el cuerpo nadie activa returning: no hace falta mirarlo
+            for variables[index] in iter_val:
                 for stmt in body:
-                    self.execute(stmt)
-                    if self.return_value is not None:
-                        return
+                    handlers[stmt.kind](stmt)
+            return
+        for variables[index] in iter_val:
+            for stmt in body:
+                handlers[stmt.kind](stmt)
+                if self.returning:
+                    return
 
-        elif node_type == "return":
-            _, expr, line = node
-            self.return_value = self.eval_expr(expr)
-            return self.return_value
+    def execute_while(self, node):
+        condition = node.condition
+        body = node.body
+        while self.eval_expr(condition):
+            self.execute_block(body)
+            if self.returning:
+                return
 
-        elif node_type == "print":
-            _, args, line = node
-            vals = [self.eval_expr(arg) for arg in args]
-            print(*vals)
+    def execute_return(self, node):
+        self.return_value = self.eval_expr(node.value)
+        self.returning = True
+        return self.return_value
 
-        elif node_type == "input":
-            _, args, line = node
-            prompt = self.eval_expr(args[0]) if args else ""
-            user_input = input(prompt)
-            return user_input
+    def execute_print(self, node):
+        vals = [self.eval_expr(arg) for arg in node.args]
+        self.io.write(*vals)
 
-    def eval_expr(self, expr):
-        if expr is None:
+    def execute_input(self, node):
+        args = node.args
+        prompt = self.eval_expr(args[0]) if args else ""
+        user_input = self.io.read(prompt)
+        return user_input
+
+    def execute_pass(self, node):
+        return None
+
+    # --- Expresiones ---
+    def eval_var(self, expr):
+        slot = expr.slot
+        return self.frame[slot] if slot >= 0 else self.globals[~slot]
+
+    def eval_const(self, expr):
+        # El literal ya viene decodificado del parser
+        return expr.value
+
+    def eval_attr(self, expr):
+        # obj.attr, con caché de la forma vista la última vez
+        slot = expr.slot
+        obj = self.frame[slot] if slot >= 0 else self.globals[~slot]
+        if type(obj) is not Instance:
             return None
-            
-        etype = expr[0]
-        
-        if etype == "number":
-            val = expr[1]
-            if '.' in val:
-                return float(val)
-            else:
-                return int(val)
-                
-        elif etype == "string":
-            val = expr[1]
-            return val.strip('"\'')
-            
-        elif etype == "bool":
-            val = expr[1]
-            return val == "True"
-            
-        elif etype == "var":
-            name = expr[1]
-            if name in self.symbols:
-                return self.symbols[name].get("value", None)
-            else:
-                return f"[Variable {name} no definida]"
-        
-        elif etype == "attr_access":
-            # obj.attr
-            _, obj_name, attr_name, _ = expr
-            
-            if obj_name in self.symbols:
-                obj = self.symbols[obj_name].get("value")
-                if isinstance(obj, dict) and "__class__" in obj:
-                    return obj["__dict__"].get(attr_name, None)
-            elif obj_name == "self" and "self" in self.symbols:
-                obj = self.symbols["self"].get("value")
-                if isinstance(obj, dict) and "__class__" in obj:
-                    return obj["__dict__"].get(attr_name, None)
-            
+        shape = obj.shape
+        if shape is expr.cache_shape:
+            return obj.values[expr.cache_index]
+        index = shape.index.get(expr.attr)
+        if index is None:
             return None
-        
-        elif etype == "method_call":
-            return self.execute(expr)
-                
-        elif etype == "call":
-            return self.execute(expr)
-            
-        elif etype == "binop":
-            _, op, left, right, _ = expr
-            left_val = self.eval_expr(left)
-            right_val = self.eval_expr(right)
-            
-            if op == '+':
-                return left_val + right_val
-            elif op == '-':
-                return left_val - right_val
-            elif op == '*':
-                return left_val * right_val
-            elif op == '/':
-                return left_val / right_val if right_val != 0 else "indefinida"
-            elif op == '%':
-                return left_val % right_val
-            elif op == '==':
-                return left_val == right_val
-            elif op == '!=':
-                return left_val != right_val
-            elif op == '<':
-                return left_val < right_val
-            elif op == '>':
-                return left_val > right_val
-            elif op == '<=':
-                return left_val <= right_val
-            elif op == '>=':
-                return left_val >= right_val
-            elif op == 'and':
-                return left_val and right_val
-            elif op == 'or':
-                return left_val or right_val
-                
-        return None
+        expr.cache_shape, expr.cache_index = shape, index
+        return obj.values[index]
+
+    def eval_binop(self, expr):
+        # Los operandos nunca son None: despacho directo por la tabla
+        handlers = self.handlers
+        left, right = expr.left, expr.right
+        left_val = handlers[left.kind](left)
+        right_val = handlers[right.kind](right)
+        return expr.operate(left_val, right_val)
+
+    def eval_logical(self, expr):
+        # and/or con cortocircuito (los genera el optimizador)
+        left_val = self.eval_expr(expr.left)
+        if expr.op == 'and':
+            return left_val and self.eval_expr(expr.right)
+        return left_val or self.eval_expr(expr.right)
+
+# ------------------------
+# PIPELINE
+# ------------------------
+def run_front_end(code: str):
+    """Léxico, sintáctico y semántico. Devuelve (tokens, ast, analizador)."""
+    lexer = Lexer(code)
+    ast = Parser(lexer.tokens).parse()
+    analyzer = SemanticAnalyzer(lexer.tokens)
+    analyzer.analyze(ast.body)
+    return lexer.tokens, ast, analyzer
+
+def _build_tree(statements, symbols, io):
+    from especializador import LoopSpecializer
+    executor = Executor(statements, symbols, io)
+    executor.specializer = LoopSpecializer(executor, BINARY_OPERATORS)
+    return executor
+
+def _build_vm(statements, symbols, io):
+    from maquina_virtual import BytecodeCompiler, VirtualMachine
+    return VirtualMachine(BytecodeCompiler().compile_program(statements, symbols), symbols, io=io)
+
+def _build_closures(statements, symbols, io):
+    from cierres import ClosureExecutor
+    return ClosureExecutor(statements, symbols, io)
+
+def _build_native(statements, symbols, io):
+    from nativo import NativeExecutor
+    return NativeExecutor(statements, symbols, io=io)
+
+# Modos de ejecución: nombre -> fábrica(statements, symbols, io) con método run()
+EXECUTION_MODES = {
+    "tree": _build_tree,
+    "vm": _build_vm,
+    "closures": _build_closures,
+    "native": _build_native,
+}
+
+def create_executor(statements, symbols=None, mode="native", io=STANDARD_IO):
+    if mode not in EXECUTION_MODES:
+        raise ValueError(f"Modo de ejecución desconocido: {mode}")
+    return EXECUTION_MODES[mode](statements, {} if symbols is None else symbols, io)
+
+def run_outside_grammar(code: str, path: str, io, error: SyntaxError) -> bool:
+    """Ejecuta con CPython un fuente que el front end rechazó; False si tampoco es Python."""
+    from nativo import SourceExecutor
+    try:
+        executor = SourceExecutor(code, path, io)
+    except (SyntaxError, ValueError):
+        return False
+    print(f"{error}\n⚠️ El programa es Python válido pero queda fuera de la gramática del compilador: "
+          f"se ejecuta con CPython sin el front end", file=sys.stderr)
+    executor.run()
+    return True
 
 # ------------------------
 # MAIN SIMPLIFICADO
 # ------------------------
 def main():
+    import argparse
     import os
+    import time
+
+    arg_parser = argparse.ArgumentParser(description="Compilador y ejecutor de programas .py")
+    arg_parser.add_argument("archivo", nargs="?", help="ruta del archivo .py a compilar")
+    arg_parser.add_argument("--modo", choices=sorted(EXECUTION_MODES), default="native",
+                            help="backend de ejecución (por defecto: native)")
+    arg_parser.add_argument("--tiempos", action="store_true",
+                            help="mostrar en stderr el tiempo de cada fase")
+    arg_parser.add_argument("--sin-optimizar", action="store_true",
+                            help="ejecutar el AST tal como sale del parser")
+    arg_parser.add_argument("--optimizaciones", action="store_true",
+                            help="mostrar en stderr cuántas reescrituras hizo el optimizador")
+    arg_parser.add_argument("--caches", action="store_true",
+                            help="mostrar en stderr aciertos y fallos de las cachés de métodos "
+                                 "y de funciones memoizadas")
+    arg_parser.add_argument("--sin-cache", action="store_true",
+                            help="no leer ni escribir la caché de compilación en disco")
+    arg_parser.add_argument("--dir-cache", metavar="DIR",
+                            help="directorio de la caché (por defecto: ~/.cache/compilador)")
+    arg_parser.add_argument("--cache-max-mb", type=int, default=64, metavar="MB",
+                            help="tamaño máximo de la caché; se desalojan las entradas menos usadas")
+    arg_parser.add_argument("--perfil", action="store_true",
+                            help="mostrar en stderr el tiempo por tipo de nodo, línea y función (modo tree)")
+    arg_parser.add_argument("--perfil-pilas", metavar="ARCHIVO",
+                            help="guardar las pilas colapsadas del perfil para un flame graph (modo tree)")
+    arg_parser.add_argument("--bucles", action="store_true",
+                            help="mostrar en stderr los bucles especializados y su aceleración (modo tree)")
+    arg_parser.add_argument("--sin-especializar", action="store_true",
+                            help="interpretar siempre los bucles, aunque estén calientes (modo tree)")
+    arg_parser.add_argument("--memoizar", action="store_true",
+                            help="guardar los resultados de las funciones puras (modo tree)")
+    arg_parser.add_argument("--memo-max", type=int, default=1024, metavar="N",
+                            help="resultados que recuerda cada función memoizada (por defecto: 1024)")
+    arg_parser.add_argument("--recursion-max", type=int, metavar="N",
+                            help="llamadas anidadas permitidas (modo vm, por defecto: 1000000)")
+    arg_parser.add_argument("--entrada", metavar="ARCHIVO",
+                            help="leer los input() del programa de las líneas de ARCHIVO")
+    arg_parser.add_argument("--buffer-salida", choices=FLUSH_POLICIES,
+                            help="acumular la salida y escribirla al llenarse el buffer, en cada línea "
+                                 "o al terminar (por defecto: tamano si hay --entrada)")
+    arg_parser.add_argument("--buffer-kb", type=int, default=DEFAULT_BUFFER_SIZE // 1024, metavar="KB",
+                            help=f"tamaño del buffer de salida (por defecto: {DEFAULT_BUFFER_SIZE // 1024})")
+    args = arg_parser.parse_args()
+    profiling = args.perfil or args.perfil_pilas
+    if profiling and args.modo != "tree":
+        arg_parser.error("el perfilador solo está disponible con --modo tree")
+    if (args.bucles or args.sin_especializar) and args.modo != "tree":
+        arg_parser.error("la especialización de bucles solo está disponible con --modo tree")
+    if args.bucles and (profiling or args.sin_especializar):
+        arg_parser.error("--bucles no se puede combinar con el perfilador ni con --sin-especializar")
+    if args.memoizar and args.modo != "tree":
+        arg_parser.error("la memoización solo está disponible con --modo tree")
+    if args.memo_max < 1:
+        arg_parser.error("--memo-max debe ser al menos 1")
+    if args.recursion_max is not None:
+        if args.modo != "vm":
+            arg_parser.error("--recursion-max solo está disponible con --modo vm")
+        if args.recursion_max < 1:
+            arg_parser.error("--recursion-max debe ser al menos 1")
+    if args.buffer_kb < 1:
+        arg_parser.error("--buffer-kb debe ser al menos 1")
 
-    path = input("Ingresa la ruta del archivo .py a compilar: ").strip()
+    path = args.archivo or input("Ingresa la ruta del archivo .py a compilar: ").strip()
 
     if not os.path.exists(path):
         print("❌ El archivo no existe.")
@@ -873,11 +1560,109 @@ def main():
     with open(path, "r", encoding="utf-8") as file:
         code = file.read()
 
+    io = STANDARD_IO
+    if args.entrada or args.buffer_salida:
+        options = {"policy": args.buffer_salida or FLUSH_SIZE, "buffer_size": args.buffer_kb * 1024}
+        try:
+            io = ProgramIO.from_file(args.entrada, **options) if args.entrada else ProgramIO(**options)
+        except OSError as e:
+            print(f"❌ No se pudo leer la entrada: {e}")
+            return
+
+    cache = None
+    if not args.sin_cache:
+        from cache_compilacion import CompilationCache
+        cache = CompilationCache(args.dir_cache, args.cache_max_mb * 2**20)
+
+    # Con un acierto de la caché el AST ya está analizado y sin errores
+    start = time.perf_counter()
+    ast = cache.load(code) if cache is not None else None
+    cached = ast is not None
+    if not cached:
+        try:
+            tokens, ast, analyzer = run_front_end(code)
+        except SyntaxError as e:
+            # native puede ejecutar con CPython el Python válido que la gramática
+            # no representa, como hacía el antiguo exec(); los demás modos no
+            if args.modo == "native" and run_outside_grammar(code, path, io, e):
+                return
+            print(e)
+            return
+
+        if analyzer.errors:
+            for error in analyzer.errors:
+                print(f"❌ Error semántico: {error}")
+            return
+
+        if cache is not None:
+            cache.store(code, ast)
+    front_end_time = time.perf_counter() - start
+
+    statements = ast.body
+    optimize_time = 0.0
+    if not args.sin_optimizar:
+        from optimizador import optimize, format_stats
+        start = time.perf_counter()
+        statements, stats = optimize(statements)
+        optimize_time = time.perf_counter() - start
+        if args.optimizaciones:
+            print(f"Optimizaciones: {format_stats(stats)}", file=sys.stderr)
+
     try:
-        exec(code, {})
-        
-    except Exception as e:
-        print(f"❌ Error durante la ejecución: {e}")
+        start = time.perf_counter()
+        executor = create_executor(statements, mode=args.modo, io=io)
+        compile_time = time.perf_counter() - start
+    except SyntaxError as e:
+        print(f"❌ Error de compilación: {e}")
+        return
+
+    # El perfilador mide el intérprete: con bucles especializados no vería sus nodos
+    if args.modo == "tree" and (profiling or args.sin_especializar):
+        executor.specializer.detach()
+
+    if args.recursion_max is not None:
+        executor.max_depth = args.recursion_max
+
+    memoizer = None
+    if args.memoizar:
+        from memoizacion import Memoizer
+        memoizer = Memoizer(executor, args.memo_max)
+
+    profiler = None
+    if profiling:
+        from perfilador import Profiler
+        profiler = Profiler(executor)
+
+    start = time.perf_counter()
+    if profiler is not None:
+        profiler.run()
+    else:
+        executor.run()
+    run_time = time.perf_counter() - start
+
+    if args.tiempos:
+        print(f"[{args.modo}] front end{' (caché)' if cached else ''}: {front_end_time * 1000:.2f} ms, "
+              f"optimización: {optimize_time * 1000:.2f} ms, "
+              f"compilación: {compile_time * 1000:.2f} ms, "
+              f"ejecución: {run_time * 1000:.2f} ms", file=sys.stderr)
+
+    if args.caches:
+        from instancias import format_method_caches
+        if hasattr(executor, "method_caches"):
+            print(f"Cachés de métodos:\n{format_method_caches(executor.method_caches)}", file=sys.stderr)
+        else:
+            print(f"El modo {args.modo} no usa cachés de métodos", file=sys.stderr)
+        if memoizer is not None:
+            print(memoizer.format_report(), file=sys.stderr)
+
+    if args.bucles:
+        print(f"Bucles:\n{executor.specializer.format_report(code)}", file=sys.stderr)
+
+    if args.perfil:
+        print(f"Perfil:\n{profiler.format_report(code)}", file=sys.stderr)
+    if args.perfil_pilas:
+        with open(args.perfil_pilas, "w", encoding="utf-8") as file:
+            file.write(profiler.collapsed_stacks())
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
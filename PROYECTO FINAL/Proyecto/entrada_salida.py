@@ -0,0 +1,115 @@
+# entrada_salida.py
+# Entrada y salida de los programas ejecutados. Todos los modos escriben
+# con io.write(*valores), que equivale a print(*valores), y leen con
+# io.read(prompt), que equivale a input(prompt). STANDARD_IO usa print e
+# input tal cual; ProgramIO acumula la salida en un buffer y puede leer
+# la entrada de una lista de líneas o de un archivo en lugar del terminal.
+import sys
+
+# Políticas de vaciado del buffer de salida
+FLUSH_SIZE = "tamano"  # al llegar a buffer_size caracteres
+FLUSH_LINE = "linea"   # en cada línea, como un terminal
+FLUSH_END = "fin"      # solo al terminar la ejecución (o al pedir entrada del terminal)
+FLUSH_POLICIES = (FLUSH_SIZE, FLUSH_LINE, FLUSH_END)
+
+RUNTIME_ERROR = "Error durante la ejecución"  # Prefijo con el que los ejecutores informan de un error
+# Error de los modos que recursan sobre la pila de Python (tree, closures y
+# native) en lugar del RecursionError de Python; la VM tiene su propio límite
+PYTHON_RECURSION_ERROR = "recursión demasiado profunda (límite de la pila de Python; --modo vm admite más)"
+
+DEFAULT_BUFFER_SIZE = 64 * 1024  # Caracteres pendientes antes de escribir con FLUSH_SIZE
+
+# Línea de print(*valores) para cada número de valores: "%s" usa str() como
+# print, y formatear la tupla de una vez cuesta la mitad que str() + join
+LINE_FORMATS = ["\n"] + [" ".join(["%s"] * count) + "\n" for count in range(1, 9)]
+
+def format_line(values) -> str:
+    if len(values) < len(LINE_FORMATS):
+        return LINE_FORMATS[len(values)] % values
+    return " ".join(map(str, values)) + "\n"
+
+class StandardIO:
+    """print e input de Python, sin buffer propio."""
+
+    write = staticmethod(print)
+    read = staticmethod(input)
+
+    def flush(self):
+        pass
+
+STANDARD_IO = StandardIO()
+
+class ProgramIO:
+    """Salida con buffer y entrada opcionalmente guionizada.
+
+    La salida se acumula en una lista de cadenas y se escribe de una vez
+    según la política. stream None es el sys.stdout del momento de vaciar,
+    para que contextlib.redirect_stdout siga funcionando. Con lines, cada
+    read devuelve la siguiente línea (sin el salto) y escribe el prompt en
+    la salida, igual que input; sin líneas restantes lanza EOFError. Sin
+    lines se lee del terminal, vaciando antes la salida pendiente.
+    """
+
+    def __init__(self, stream=None, policy: str = FLUSH_SIZE, buffer_size: int = DEFAULT_BUFFER_SIZE,
+                 lines=None):
+        if policy not in FLUSH_POLICIES:
+            raise ValueError(f"Política de vaciado desconocida: {policy}")
+        self.stream = stream
+        self.policy = policy
+        self.buffer_size = buffer_size
+        self.parts = []
+        self.pending = 0    # caracteres en parts (solo FLUSH_SIZE)
+        self.lines = iter(lines) if lines is not None else None
+        self.lines_read = 0
+        self.flushes = 0
+        # La política se elige una vez: write es directamente la variante
+        self.write = {FLUSH_SIZE: self.write_sized,
+                      FLUSH_LINE: self.write_line,
+                      FLUSH_END: self.write_buffered}[policy]
+
+    @classmethod
+    def from_file(cls, path: str, **options):
+        """ProgramIO que lee la entrada de las líneas del archivo path."""
+        with open(path, encoding="utf-8") as f:
+            return cls(lines=f.read().splitlines(), **options)
+
+    # --- Salida ---
+    def write_sized(self, *values):
+        line = format_line(values)
+        self.parts.append(line)
+        self.pending += len(line)
+        if self.pending >= self.buffer_size:
+            self.flush()
+
+    def write_line(self, *values):
+        self.parts.append(format_line(values))
+        self.flush()
+
+    def write_buffered(self, *values):
+        self.parts.append(format_line(values))
+
+    def flush(self):
+        if not self.parts:
+            return
+        stream = self.stream if self.stream is not None else sys.stdout
+        stream.write("".join(self.parts))
+        stream.flush()
+        self.parts.clear()
+        self.pending = 0
+        self.flushes += 1
+
+    # --- Entrada ---
+    def read(self, prompt=""):
+        if self.lines is None:
+            self.flush()
+            return input(prompt)
+        if prompt != "":
+            text = str(prompt)
+            self.parts.append(text)
+            self.pending += len(text)
+        try:
+            line = next(self.lines)
+        except StopIteration:
+            raise EOFError("no quedan líneas de entrada") from None
+        self.lines_read += 1
+        return line
@@ -0,0 +1,573 @@
+# especializador.py
+# Especialización de bucles calientes del modo tree. Se engancha a las
+# entradas WHILE y FOR de la tabla handlers de un Executor y cuenta las
+# iteraciones de cada bucle; cuando uno pasa del umbral, su código se
+# traduce a una función de Python con las variables del programa copiadas
+# en variables locales, especializada para los tipos que tienen en ese
+# momento. Unas guardas al entrar comprueban esos tipos: si han cambiado,
+# el bucle vuelve a interpretarse y se especializa otra vez para los tipos
+# nuevos. El cambio se hace entre dos iteraciones, así que un bucle que se
+# ejecuta una sola vez también pasa a la versión especializada.
+import math
+import time
+
+from instancias import Instance
+from nodos import (VAR, CONST, BINOP, ATTR, CALL, METHOD_CALL, LOGICAL, ASSIGN, ATTR_ASSIGN, IF, WHILE,
+                   FOR, RETURN, PRINT, INPUT, FUNC_DEF, CLASS_DEF, PASS, walk)
+from tipos import (NUMBERS, FLOAT, STR, NONE, join as _join, binop_type as _binop_type,
+                   binop_may_raise as _binop_may_raise, element_type as _element_type)
+
+HOT_THRESHOLD = 200  # Iteraciones interpretadas antes de especializar un bucle
+MAX_VERSIONS = 4     # Versiones con guardas por bucle; después, una genérica sin guardas
+
+# ------------------------
+# TIPOS
+# ------------------------
+# Los tipos son los de tipos.py: un frozenset con los tipos de Python que
+# puede tener una expresión, o None si puede ser cualquiera. Las guardas
+# solo fijan los tipos de GUARDED_TYPES; una variable con otro valor (una
+# instancia, un rango...) entra como None y el código generado para ella
+# es el genérico.
+GUARDED_TYPES = (int, float, bool, str)
+
+def _join_env(left, right):
+    # Entorno slot -> tipo; None es un camino que no llega (terminó en return)
+    if left is None:
+        return right
+    if right is None:
+        return left
+    return {slot: _join(left[slot], right[slot]) for slot in left}
+
+def _observed_type(value):
+    value_type = type(value)
+    return frozenset((value_type,)) if value_type in GUARDED_TYPES else None
+
+# ------------------------
+# AYUDANTES DEL CÓDIGO GENERADO
+# ------------------------
+# Los mismos pasos que Executor.eval_attr y Executor.execute_attr_assign,
+# con el objeto ya cargado de la variable local de la función generada.
+def _load_attr(expr, obj):
+    if type(obj) is not Instance:
+        return None
+    shape = obj.shape
+    if shape is expr.cache_shape:
+        return obj.values[expr.cache_index]
+    index = shape.index.get(expr.attr)
+    if index is None:
+        return None
+    expr.cache_shape, expr.cache_index = shape, index
+    return obj.values[index]
+
+def _store_attr(node, val, obj):
+    if type(obj) is not Instance:
+        return
+    shape = obj.shape
+    if shape is node.cache_shape:
+        next_shape = node.cache_next
+        if next_shape is None:
+            obj.values[node.cache_index] = val
+        else:
+            obj.shape = next_shape
+            obj.values.append(val)
+        return
+    index = shape.index.get(node.attr)
+    if index is None:
+        node.cache_shape, node.cache_index, node.cache_next = shape, len(obj.values), shape.add(node.attr)
+    else:
+        node.cache_shape, node.cache_index, node.cache_next = shape, index, None
+    obj.set(node.attr, val)
+
+def _int(val):
+    # int() de Executor.execute_call
+    return int(val) if val else 0
+
+# Llamadas que Executor resuelve sin mirar las funciones del programa
+BUILTIN_CALLS = ("print", "input", "int", "range")
+
+# ------------------------
+# TRADUCCIÓN DE UN BUCLE
+# ------------------------
+class Unsupported(Exception):
+    """El bucle contiene algo que la función generada no puede ejecutar."""
+
+class LoopCompiler:
+    """Traduce un while o for y su cuerpo a una función de Python.
+
+    Solo se traducen bucles sin llamadas a funciones ni métodos del
+    programa ni definiciones: el cuerpo de una llamada lee y escribe las
+    variables a través del Executor, que no vería las copias locales de la
+    función generada. La función recibe (executor, frame, globales,
+    iterador), carga las variables del bucle, comprueba las guardas de
+    tipo y devuelve None si fallan, o el número de iteraciones hechas.
+    Las variables asignadas se devuelven a su slot en un finally, también
+    cuando el bucle termina con return o con un error.
+    """
+
+    def __init__(self, loop, operators, io):
+        self.loop = loop
+        self.divide = operators['/']
+        self.io = io  # print e input del programa
+        self.referenced = set()  # slots leídos o escritos en el bucle
+        self.assigned = set()    # slots escritos en el bucle
+        for node in walk(loop):
+            kind = node.kind
+            if kind == VAR or kind == ATTR or kind == ATTR_ASSIGN:
+                self.referenced.add(node.slot)
+            elif kind == ASSIGN or kind == FOR:
+                self.referenced.add(node.slot)
+                self.assigned.add(node.slot)
+            elif kind == CALL:
+                if node.func not in BUILTIN_CALLS:
+                    raise Unsupported(f"llamada a '{node.func}' en la línea {node.line}")
+                if node.func == "int" and not node.args:
+                    raise Unsupported(f"int() sin argumentos en la línea {node.line}")
+            elif kind == METHOD_CALL:
+                raise Unsupported(f"llamada a '.{node.method}()' en la línea {node.line}")
+            elif kind == FUNC_DEF or kind == CLASS_DEF:
+                raise Unsupported(f"definición de '{node.name}' en la línea {node.line}")
+        self.constants = {}
+        self.temps = 0
+
+    def observe(self, frame, globals_):
+        """Tipos de entrada para los valores actuales de las variables del bucle."""
+        types = {}
+        for slot in self.referenced:
+            types[slot] = _observed_type(frame[slot] if slot >= 0 else globals_[~slot])
+        # Las variables que el cuerpo asigna antes de leerlas no necesitan guarda
+        for slot in self.written_first():
+            types[slot] = None
+        return types
+
+    def written_first(self):
+        """Slots que cada iteración asigna antes de cualquier lectura."""
+        loop = self.loop
+        if loop.kind == FOR:
+            read = {node.slot for node in walk(loop.iterable) if node.kind in (VAR, ATTR)}
+            first = {loop.slot}
+        else:
+            read = {node.slot for node in walk(loop.condition) if node.kind in (VAR, ATTR)}
+            first = set()
+        for stmt in loop.body:
+            if stmt.kind == ASSIGN:
+                read |= {node.slot for node in walk(stmt.value) if node.kind in (VAR, ATTR)}
+                if stmt.slot not in read:
+                    first.add(stmt.slot)
+            else:
+                # Dentro de un if o un bucle la asignación puede no ejecutarse
+                read |= {node.slot for node in walk(stmt)
+                         if node.kind in (VAR, ATTR, ATTR_ASSIGN, ASSIGN, FOR)}
+        return first
+
+    def generate(self, types=None) -> str:
+        """Fuente de la función para los tipos de entrada (slot -> tipo); None es la versión genérica."""
+        if types is None:
+            types = dict.fromkeys(self.referenced)
+        self.constants = {"_load_attr": _load_attr, "_store_attr": _store_attr,
+                          "_div": self.divide, "_int": _int, "_write": self.io.write, "_read": self.io.read}
+        self.temps = 0
+        loop = self.loop
+        lines = [f"def bucle_linea_{loop.line}(_ex, _frame, _globals, _it):"]
+        for slot in sorted(self.referenced):
+            lines.append(f"    {self.var(slot)} = {'_frame' if slot >= 0 else '_globals'}[{self.index(slot)}]")
+        guards = [f"type({self.var(slot)}) is not {next(iter(types[slot])).__name__}"
+                  for slot in sorted(self.referenced) if types[slot] is not None]
+        if guards:
+            lines.append(f"    if {' or '.join(guards)}:")
+            lines.append("        return None")
+        lines.append("    _n = 0")
+        depth = 1
+        if self.assigned:
+            lines.append("    try:")
+            depth = 2
+        self.stmt_loop(loop, dict(types), lines, depth, outermost=True)
+        if self.assigned:
+            lines.append("    finally:")
+            for slot in sorted(self.assigned):
+                lines.append(f"        {'_frame' if slot >= 0 else '_globals'}[{self.index(slot)}] = {self.var(slot)}")
+        lines.append("    return _n")
+        return "\n".join(lines) + "\n"
+
+    def compile(self, types=None):
+        source = self.generate(types)
+        namespace = dict(self.constants)
+        exec(compile(source, f"<bucle línea {self.loop.line}>", "exec"), namespace)
+        return namespace[f"bucle_linea_{self.loop.line}"], source
+
+    # --- Utilidades ---
+    @staticmethod
+    def var(slot):
+        return f"l{slot}" if slot >= 0 else f"g{~slot}"
+
+    @staticmethod
+    def index(slot):
+        return slot if slot >= 0 else ~slot
+
+    def constant(self, value):
+        name = f"_k{len(self.constants)}"
+        self.constants[name] = value
+        return name
+
+    def temp(self):
+        self.temps += 1
+        return f"_t{self.temps}"
+
+    @staticmethod
+    def emit(out, depth, text):
+        if out is not None:
+            out.append("    " * depth + text)
+
+    # --- Sentencias ---
+    # Cada método recibe el entorno de tipos antes de la sentencia y devuelve
+    # el de después. Con out=None solo se calculan tipos (para los puntos
+    # fijos de los bucles) y no se emite nada.
+    def block(self, body, env, out, depth):
+        if not body:
+            self.emit(out, depth, "pass")
+        for stmt in body:
+            env = self.stmt(stmt, env, out, depth)
+            if env is None:
+                # Tras un return el resto del bloque no se ejecuta
+                break
+        return env
+
+    def stmt(self, node, env, out, depth):
+        kind = node.kind
+        if kind == ASSIGN:
+            code, value_type, _ = self.expr(node.value, env)
+            self.emit(out, depth, f"{self.var(node.slot)} = {code}")
+            env = dict(env)
+            env[node.slot] = value_type
+            return env
+        if kind == ATTR_ASSIGN:
+            code, _, _ = self.expr(node.value, env)
+            self.emit(out, depth, f"_store_attr({self.constant(node)}, {code}, {self.var(node.slot)})")
+            return env
+        if kind == IF:
+            return self.stmt_if(node, env, out, depth)
+        if kind == WHILE or kind == FOR:
+            return self.stmt_loop(node, env, out, depth)
+        if kind == RETURN:
+            code = self.expr(node.value, env)[0] if node.value is not None else "None"
+            self.emit(out, depth, f"_ex.return_value = {code}")
+            self.emit(out, depth, "_ex.returning = True")
+            self.emit(out, depth, "return _n")
+            return None
+        if kind == PRINT:
+            self.emit(out, depth, f"_write({', '.join(self.expr(arg, env)[0] for arg in node.args)})")
+            return env
+        if kind == PASS:
+            self.emit(out, depth, "pass")
+            return env
+        # Expresión usada como sentencia
+        self.emit(out, depth, self.expr(node, env)[0])
+        return env
+
+    def stmt_if(self, node, env, out, depth):
+        code = self.expr(node.condition, env)[0]
+        self.emit(out, depth, f"if {code}:")
+        result = self.block(node.body, env, out, depth + 1)
+        for condition, body in node.elifs:
+            self.emit(out, depth, f"elif {self.expr(condition, env)[0]}:")
+            result = _join_env(result, self.block(body, env, out, depth + 1))
+        if node.orelse:
+            self.emit(out, depth, "else:")
+            return _join_env(result, self.block(node.orelse, env, out, depth + 1))
+        return _join_env(result, env)
+
+    def stmt_loop(self, node, env, out, depth, outermost=False):
+        # Punto fijo: tipos a la entrada de cada iteración
+        head = env
+        while True:
+            after = self.block(node.body, self.iteration_env(node, head, env), None, depth + 1)
+            joined = _join_env(env, after)
+            if joined == head:
+                break
+            head = joined
+
+        if out is not None:
+            if node.kind == WHILE:
+                self.emit(out, depth, f"while {self.expr(node.condition, head)[0]}:")
+            else:
+                iterable = "_it" if outermost else self.expr(node.iterable, env)[0]
+                self.emit(out, depth, f"for {self.var(node.slot)} in {iterable}:")
+            if outermost:
+                self.emit(out, depth + 1, "_n += 1")
+            self.block(node.body, self.iteration_env(node, head, env), out, depth + 1)
+        return head
+
+    def iteration_env(self, node, head, env):
+        if node.kind == WHILE:
+            return head
+        inner = dict(head)
+        iterable = node.iterable
+        if node is self.loop and not (iterable.kind == CALL and iterable.func == "range"):
+            # El iterador del bucle exterior se creó antes de entrar: sus variables
+            # pueden tener ya otro tipo, y solo range() garantiza el de los elementos
+            inner[node.slot] = None
+        else:
+            inner[node.slot] = _element_type(self.expr(iterable, env)[1])
+        return inner
+
+    # --- Expresiones ---
+    # Cada método devuelve (código, tipo, efectos): efectos indica si la
+    # expresión puede lanzar una excepción o tener efectos visibles, y
+    # decide si se puede reordenar o evaluar solo en parte.
+    def expr(self, node, env):
+        kind = node.kind
+        if kind == VAR:
+            return self.var(node.slot), env[node.slot], False
+        if kind == CONST:
+            value = node.value
+            if type(value) in (int, bool, str) or (type(value) is float and math.isfinite(value)):
+                return repr(value), frozenset((type(value),)), False
+            return self.constant(value), _observed_type(value), False
+        if kind == BINOP:
+            return self.expr_binop(node, env)
+        if kind == LOGICAL:
+            left, left_type, left_effects = self.expr(node.left, env)
+            right, right_type, right_effects = self.expr(node.right, env)
+            return f"({left} {node.op} {right})", _join(left_type, right_type), left_effects or right_effects
+        if kind == ATTR:
+            return f"_load_attr({self.constant(node)}, {self.var(node.slot)})", None, False
+        if kind == INPUT:
+            return self.expr_input(node.args, env)
+        if kind == CALL:
+            return self.expr_call(node, env)
+        raise Unsupported(f"expresión '{node.kind}' en la línea {node.line}")
+
+    def expr_binop(self, node, env):
+        op = node.op
+        left, left_type, left_effects = self.expr(node.left, env)
+        right, right_type, right_effects = self.expr(node.right, env)
+        value_type = _binop_type(op, left_type, right_type)
+        effects = left_effects or right_effects or _binop_may_raise(op, left_type, right_type, node.right)
+        divisor = node.right
+        if op == '/':
+            if divisor.kind == CONST and type(divisor.value) in NUMBERS and divisor.value != 0:
+                # Divisor constante distinto de cero: nunca da "indefinida"
+                code = f"({left} / {right})"
+                if left_type is not None and left_type <= NUMBERS:
+                    value_type = FLOAT
+            elif divisor.kind == VAR and not left_effects:
+                code = f"({left} / {right} if {right} != 0 else 'indefinida')"
+            else:
+                code = f"_div({left}, {right})"
+        elif op == 'and' or op == 'or':
+            if not right_effects:
+                code = f"({left} {op} {right})"
+            else:
+                # Executor evalúa los dos operandos aunque el izquierdo decida
+                first, second = self.temp(), self.temp()
+                code = f"(({first} := {left}), ({second} := {right}), {first} {op} {second})[2]"
+        else:
+            code = f"({left} {op} {right})"
+        return code, value_type, effects
+
+    def expr_input(self, args, env):
+        prompt = self.expr(args[0], env)[0] if args else "''"
+        return f"_read({prompt})", STR, True
+
+    def expr_call(self, node, env):
+        func, args = node.func, node.args
+        if func == "print":
+            return f"_write({', '.join(self.expr(arg, env)[0] for arg in args)})", NONE, True
+        if func == "input":
+            return self.expr_input(args, env)
+        if func == "int":
+            code, value_type, effects = self.expr(args[0], env)
+            if value_type is not None and value_type <= frozenset((int,)):
+                return code, value_type, effects
+            return f"_int({code})", frozenset((int,)), True
+        # range
+        if 1 <= len(args) <= 3:
+            return f"range({', '.join(self.expr(arg, env)[0] for arg in args)})", frozenset((range,)), True
+        return "None", NONE, False
+
+# ------------------------
+# ESPECIALIZADOR
+# ------------------------
+class LoopState:
+    """Contadores y versiones especializadas de un bucle del programa."""
+
+    def __init__(self, node):
+        self.node = node
+        self.compiler = None
+        self.versions = []       # funciones generadas, en orden de creación
+        self.sources = []        # su código fuente, para depurar
+        self.failure = None      # motivo por el que no se puede especializar
+        self.iterations = 0      # iteraciones interpretadas
+        self.interpreted_time = 0.0
+        self.specialized_iterations = 0
+        self.specialized_time = 0.0
+        self.compile_time = 0.0
+        self.entries = 0         # ejecuciones en una versión especializada
+        self.deopts = 0          # entradas cuyas guardas fallaron en todas las versiones
+
+class LoopSpecializer:
+    """Especializa los bucles calientes de un Executor.
+
+    operators es BINARY_OPERATORS de compilador; se recibe en lugar de
+    importarlo porque compilador suele ser __main__ y otra importación lo
+    volvería a ejecutar entero. Con failure puesto, el bucle se ejecuta con
+    el handler original del Executor y no paga nada por el contador.
+    """
+
+    def __init__(self, executor, operators, threshold: int = HOT_THRESHOLD):
+        self.executor = executor
+        self.operators = operators
+        self.threshold = threshold
+        self.loops = {}  # id(nodo) -> LoopState
+        for statement in executor.program:
+            if statement is None:
+                continue
+            for node in walk(statement):
+                if node.kind == WHILE or node.kind == FOR:
+                    self.loops[id(node)] = LoopState(node)
+
+        handlers = executor.handlers
+        self.plain_while, self.plain_for = handlers[WHILE], handlers[FOR]
+        handlers[WHILE] = self.execute_while
+        handlers[FOR] = self.execute_for
+
+    def detach(self):
+        """Devuelve al Executor sus handlers originales."""
+        self.executor.handlers[WHILE] = self.plain_while
+        self.executor.handlers[FOR] = self.plain_for
+
+    # --- Ejecución ---
+    def execute_while(self, node):
+        state = self.loops[id(node)]
+        if state.failure is not None:
+            return self.plain_while(node)
+        if state.versions and self.enter(state, None):
+            return
+        executor = self.executor
+        condition, body = node.condition, node.body
+        eval_expr, execute_block = executor.eval_expr, executor.execute_block
+        budget = max(self.threshold - state.iterations, 1)
+        count = 0
+        start = time.perf_counter()
+        try:
+            while eval_expr(condition):
+                execute_block(body)
+                count += 1
+                if executor.returning or count == budget:
+                    break
+            else:
+                return
+        finally:
+            state.iterations += count
+            state.interpreted_time += time.perf_counter() - start
+        if executor.returning:
+            return
+        # Bucle caliente: las siguientes iteraciones van a la versión especializada
+        if not (self.specialize(state) and self.enter(state, None)):
+            self.plain_while(node)
+
+    def execute_for(self, node):
+        state = self.loops[id(node)]
+        if state.failure is not None:
+            return self.plain_for(node)
+        executor = self.executor
+        iterator = iter(executor.eval_expr(node.iterable))
+        if state.versions and self.enter(state, iterator):
+            return
+        slot, body = node.slot, node.body
+        store, execute_block = executor.store, executor.execute_block
+        budget = max(self.threshold - state.iterations, 1)
+        count = 0
+        start = time.perf_counter()
+        try:
+            for item in iterator:
+                store(slot, item)
+                execute_block(body)
+                count += 1
+                if executor.returning or count == budget:
+                    break
+            else:
+                return
+        finally:
+            state.iterations += count
+            state.interpreted_time += time.perf_counter() - start
+        if executor.returning:
+            return
+        # La versión especializada sigue con el mismo iterador
+        if not (self.specialize(state) and self.enter(state, iterator)):
+            for item in iterator:
+                store(slot, item)
+                execute_block(body)
+                if executor.returning:
+                    return
+
+    def enter(self, state, iterator):
+        """Ejecuta el resto del bucle en la primera versión cuyas guardas pasen."""
+        executor = self.executor
+        start = time.perf_counter()
+        for version in state.versions:
+            count = version(executor, executor.frame, executor.globals, iterator)
+            if count is not None:
+                state.entries += 1
+                state.specialized_iterations += count
+                state.specialized_time += time.perf_counter() - start
+                return True
+        state.deopts += 1
+        return False
+
+    def specialize(self, state):
+        """Añade una versión para los tipos actuales; False si el bucle no se puede especializar."""
+        start = time.perf_counter()
+        try:
+            if state.compiler is None:
+                state.compiler = LoopCompiler(state.node, self.operators, self.executor.io)
+            executor = self.executor
+            # Con demasiadas versiones, una genérica sin guardas que ya no falla
+            types = None
+            if len(state.versions) < MAX_VERSIONS:
+                types = state.compiler.observe(executor.frame, executor.globals)
+            version, source = state.compiler.compile(types)
+        except Unsupported as e:
+            state.failure = str(e)
+            return False
+        except (SyntaxError, RecursionError):
+            # Expresiones demasiado anidadas para el compilador de Python
+            state.failure = "cuerpo demasiado anidado"
+            return False
+        finally:
+            state.compile_time += time.perf_counter() - start
+        state.versions.append(version)
+        state.sources.append(source)
+        return True
+
+    # --- Informe ---
+    def format_report(self, code: str = None) -> str:
+        source = code.splitlines() if code is not None else []
+        lines = [f"Umbral: {self.threshold} iteraciones",
+                 f"{'línea':>6} {'bucle':<6} {'iter. interp.':>13} {'iter. espec.':>13} {'versiones':>9} "
+                 f"{'desopt.':>7} {'µs/iter interp.':>15} {'µs/iter espec.':>14} {'aceleración':>11}"]
+        notes = []
+        states = sorted(self.loops.values(), key=lambda state: (state.node.line, state.node.col))
+        for state in states:
+            if not state.iterations and not state.specialized_iterations:
+                continue
+            node = state.node
+            kind = "while" if node.kind == WHILE else "for"
+            if state.failure is not None:
+                text = source[node.line - 1].strip() if 0 < node.line <= len(source) else ""
+                notes.append(f"  Ln {node.line} {kind}: no especializado, {state.failure}"
+                             + (f"  ({text})" if text else ""))
+                continue
+            interpreted = state.interpreted_time / state.iterations * 1e6 if state.iterations else 0.0
+            specialized = (state.specialized_time / state.specialized_iterations * 1e6
+                           if state.specialized_iterations else 0.0)
+            speedup = f"{interpreted / specialized:.1f}x" if interpreted and specialized else "-"
+            lines.append(f"{node.line:>6} {kind:<6} {state.iterations:>13,} {state.specialized_iterations:>13,} "
+                         f"{len(state.versions):>9} {state.deopts:>7} {interpreted:>15.2f} "
+                         f"{specialized:>14.2f} {speedup:>11}")
+        specialized_loops = sum(1 for state in self.loops.values() if state.versions)
+        compile_time = sum(state.compile_time for state in self.loops.values())
+        lines.append(f"Bucles especializados: {specialized_loops}, "
+                     f"tiempo de compilación: {compile_time * 1000:.2f} ms")
+        if notes:
+            lines += ["No especializables:"] + notes
+        return "\n".join(lines)
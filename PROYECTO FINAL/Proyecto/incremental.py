@@ -0,0 +1,260 @@
+# incremental.py
+# Re-análisis incremental para ediciones de texto: solo se re-tokenizan las
+# líneas editadas y solo se re-parsean las sentencias de nivel superior
+# afectadas; el resto de tokens y subárboles se reutiliza.
+import re
+from typing import List, Dict, Any
+
+from compilador import T_EOF, T_NEWLINE, Lexer, Parser
+from nodos import Program, shift_lines
+
+_LINE = re.compile(r"[^\n]*\n|[^\n]+$")
+
+def _split_lines(text: str) -> List[str]:
+    # Líneas con su salto de línea; la última puede no tenerlo
+    return _LINE.findall(text)
+
+def _owner_line(tok) -> int:
+    # El token NEWLINE se registra con el número de la línea siguiente
+    return tok[2] - 1 if tok[0] == "NEWLINE" else tok[2]
+
+def shift_tokens(tokens, delta):
+    return [(kind, value, line + delta, column) for kind, value, line, column in tokens]
+
+def _bisect(lo, hi, x, key, right=False):
+    # Búsqueda binaria sobre índices con una función clave(índice)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        value = key(mid)
+        if value < x or (right and value == x):
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+# ------------------------
+# DOCUMENTO INCREMENTAL
+# ------------------------
+class IncrementalDocument:
+    """Fuente, tokens y AST de un archivo que se edita por rangos de líneas.
+
+    Cada sentencia de nivel superior recuerda su rango de tokens [inicio, fin).
+    Una sentencia solo depende de sus tokens y del token en `fin` (el que
+    miró para terminar), así que basta con re-parsear desde la primera
+    sentencia que llega a la zona editada hasta volver a coincidir con el
+    inicio de una sentencia antigua posterior a la edición.
+
+    Los desplazamientos de línea e índice que una edición provoca en lo que
+    viene detrás quedan pendientes (desde un índice, con un delta) y se
+    aplican solo al tramo que la siguiente edición o el parser necesitan,
+    o completos al leer `tokens` o `ast`.
+    """
+
+    PARSE_WINDOW = 256  # tokens corregidos por adelantado antes de parsear
+
+    def __init__(self, code: str):
+        self.reset(code)
+
+    def reset(self, code: str):
+        self.lines = _split_lines(code)
+        self.valid = False
+        # Lista de tuplas y no TokenStream: se modifica en el sitio en cada edición
+        self._tokens = list(Lexer(code).tokens)
+        # Tokens desde _token_from: línea real = guardada + _token_lines
+        self._token_from, self._token_lines = len(self._tokens), 0
+        self._statements: List[Any] = []
+        self._starts: List[int] = []
+        self._ends: List[int] = []
+        # Sentencias desde _chunk_from: líneas + _chunk_lines, índices + _chunk_tokens
+        self._chunk_from, self._chunk_lines, self._chunk_tokens = 0, 0, 0
+        statements, starts, ends, _ = self._parse_from(0, None)
+        self._statements, self._starts, self._ends = statements, starts, ends
+        self._chunk_from = len(statements)
+        self.valid = True
+
+    @property
+    def code(self) -> str:
+        return "".join(self.lines)
+
+    @property
+    def tokens(self):
+        self._flush_tokens(len(self._tokens))
+        return self._tokens
+
+    @property
+    def statements(self):
+        self._flush_chunks(len(self._statements))
+        return self._statements
+
+    @property
+    def ast(self):
+        return Program(self.statements)
+
+    # --- Desplazamientos pendientes ---
+    def _flush_tokens(self, upto):
+        upto = min(upto, len(self._tokens))
+        start = self._token_from
+        if start < upto:
+            if self._token_lines:
+                self._tokens[start:upto] = shift_tokens(self._tokens[start:upto], self._token_lines)
+            self._token_from = upto
+
+    def _flush_chunks(self, upto):
+        upto = min(upto, len(self._statements))
+        start = self._chunk_from
+        if start < upto:
+            self._shift_chunks(start, upto, self._chunk_lines, self._chunk_tokens)
+            self._chunk_from = upto
+
+    def _shift_chunks(self, start, end, line_delta, token_delta):
+        if line_delta:
+            # Los nodos son del documento: se corrigen en el sitio
+            for stmt in self._statements[start:end]:
+                if stmt is not None:
+                    shift_lines(stmt, line_delta)
+        if token_delta:
+            self._starts[start:end] = [s + token_delta for s in self._starts[start:end]]
+            self._ends[start:end] = [e + token_delta for e in self._ends[start:end]]
+
+    def _token_owner(self, i):
+        line = _owner_line(self._tokens[i])
+        return line + self._token_lines if i >= self._token_from else line
+
+    def _chunk_start(self, i):
+        return self._starts[i] + (self._chunk_tokens if i >= self._chunk_from else 0)
+
+    def _chunk_end(self, i):
+        return self._ends[i] + (self._chunk_tokens if i >= self._chunk_from else 0)
+
+    # --- Edición ---
+    def edit(self, first_line: int, last_line: int, text: str) -> Dict[str, int]:
+        """Reemplaza las líneas first_line..last_line (base 1, inclusivas) por text.
+
+        Para insertar sin borrar se usa last_line = first_line - 1. El texto
+        debe terminar en salto de línea salvo que sea el final del archivo.
+        """
+        lines = self.lines
+        if not (1 <= first_line <= len(lines) + 1 and first_line - 1 <= last_line <= len(lines)):
+            raise ValueError(f"Rango de líneas inválido: {first_line}-{last_line}")
+
+        first, last = first_line, last_line
+        # Mantener el segmento alineado a líneas completas
+        if first > 1 and not lines[first - 2].endswith("\n"):
+            first -= 1
+            text = lines[first - 1] + text
+        if text and not text.endswith("\n") and last < len(lines):
+            last += 1
+            text += lines[last - 1]
+
+        new_lines = _split_lines(text)
+        lines[first - 1:last] = new_lines
+
+        if not self.valid:
+            self.reset("".join(lines))
+            return {"tokens_relexados": len(self._tokens), "sentencias_reparseadas": len(self._statements),
+                    "sentencias_reutilizadas": 0}
+
+        self.valid = False
+        line_delta = len(new_lines) - (last - first + 1)
+
+        # --- Léxico: solo las líneas del segmento ---
+        segment_tokens = list(Lexer(text).tokens)
+        if first > 1:
+            segment_tokens = shift_tokens(segment_tokens, first - 1)
+
+        tokens = self._tokens
+        lo = _bisect(0, len(tokens), first, self._token_owner)
+        hi = _bisect(lo, len(tokens), last, self._token_owner, right=True)
+        token_delta = len(segment_tokens) - (hi - lo)
+        new_hi = lo + len(segment_tokens)
+
+        # Fusionar el desplazamiento pendiente con el de esta edición
+        if not self._token_lines:
+            self._token_from = lo
+        self._flush_tokens(lo)
+        pending_from = self._token_from
+        if pending_from > hi and line_delta:
+            tokens[hi:pending_from] = shift_tokens(tokens[hi:pending_from], line_delta)
+        tokens[lo:hi] = segment_tokens
+        self._token_from = max(new_hi, pending_from + token_delta)
+        self._token_lines += line_delta
+
+        # --- Sintáctico: desde la primera sentencia que mira la zona editada ---
+        chunk_count = len(self._statements)
+        first_affected = _bisect(0, chunk_count, lo, self._chunk_end)
+        if first_affected < chunk_count:
+            # La edición puede caer en los saltos de línea previos a la sentencia
+            start = min(self._chunk_start(first_affected), lo)
+        else:
+            start = self._chunk_end(chunk_count - 1) if chunk_count else 0
+
+        statements, starts, ends, resync = self._parse_from(
+            start, (first_affected, hi, new_hi, token_delta))
+
+        # Reemplazar las sentencias [first_affected, resync) por las nuevas
+        if not (self._chunk_lines or self._chunk_tokens):
+            self._chunk_from = first_affected
+        self._flush_chunks(first_affected)
+        pending_from = self._chunk_from
+        if pending_from > resync:
+            self._shift_chunks(resync, pending_from, line_delta, token_delta)
+        self._statements[first_affected:resync] = statements
+        self._starts[first_affected:resync] = starts
+        self._ends[first_affected:resync] = ends
+        chunk_delta = len(statements) - (resync - first_affected)
+        self._chunk_from = max(first_affected + len(statements), pending_from + chunk_delta)
+        self._chunk_lines += line_delta
+        self._chunk_tokens += token_delta
+
+        self.valid = True
+        return {"tokens_relexados": len(segment_tokens), "sentencias_reparseadas": len(statements),
+                "sentencias_reutilizadas": len(self._statements) - len(statements)}
+
+    def _parse_from(self, start: int, edit):
+        """Parsea sentencias desde el token start hasta EOF o hasta resincronizar.
+
+        Devuelve (sentencias, inicios, fines, índice de la primera sentencia
+        antigua reutilizable).
+        """
+        statements, starts, ends = [], [], []
+        old_count = len(self._statements)
+        tokens = self._tokens
+        parser = Parser(tokens)
+        parser.pos = start
+        window = self.PARSE_WINDOW
+        while True:
+            while parser.peek_type(T_NEWLINE):
+                parser.pos += 1
+            if parser.peek_type(T_EOF):
+                return statements, starts, ends, old_count
+
+            pos = parser.pos
+            if edit is not None:
+                first_affected, old_hi, new_hi, token_delta = edit
+                if pos >= new_hi:
+                    # ¿Empieza aquí una sentencia antigua posterior a la edición?
+                    old_pos = pos - token_delta
+                    j = _bisect(first_affected, old_count, old_pos, self._chunk_start)
+                    if j < old_count and old_pos >= old_hi and self._chunk_start(j) == old_pos:
+                        return statements, starts, ends, j
+
+            # Corregir las líneas de los tokens que el parser puede leer; si
+            # llega a tokens con desplazamiento pendiente, ampliar y repetir
+            while True:
+                self._flush_tokens(pos + window)
+                try:
+                    stmt = parser.top_level_statement()
+                    reached = parser.pos
+                except SyntaxError:
+                    stmt, reached = None, parser.pos
+                if reached < self._token_from or self._token_from >= len(tokens):
+                    break
+                window *= 2
+                parser.pos = pos
+            if stmt is None:
+                parser.pos = pos
+                parser.top_level_statement()
+
+            statements.append(stmt)
+            starts.append(pos)
+            ends.append(parser.pos)
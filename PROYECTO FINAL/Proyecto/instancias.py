@@ -0,0 +1,167 @@
+# instancias.py
+# Clases e instancias del programa en los modos interpretados. Las instancias
+# usan formas ocultas: las que reciben los mismos atributos en el mismo orden
+# comparten una Shape (nombre de atributo -> índice) y solo guardan una lista
+# de valores. Las llamadas a métodos usan cachés en línea por punto de llamada.
+
+# Clases distintas que recuerda una caché antes de dejar de añadir entradas
+POLYMORPHIC_LIMIT = 4
+
+# ------------------------
+# CLASES
+# ------------------------
+class UserClass:
+    """Clase del programa en tiempo de ejecución, con herencia simple.
+
+    El MRO se calcula al definir la clase y methods ya incluye los métodos
+    heredados (los de la base, sobrescritos por los propios), así que buscar
+    un método es una sola consulta en un dict, sea cual sea la profundidad
+    de la herencia. Las clases no cambian después de creadas.
+    """
+
+    __slots__ = ("name", "base", "mro", "methods", "shape")
+
+    def __init__(self, name: str, methods, base: "UserClass" = None):
+        self.name = name
+        self.base = base
+        self.mro = (self,) + base.mro if base is not None else (self,)
+        resolved = dict(base.methods) if base is not None else {}
+        resolved.update(methods)
+        self.methods = resolved
+        self.shape = Shape(self)  # forma raíz de sus instancias
+
+    def __repr__(self):
+        return f"<clase {self.name}>"
+
+# ------------------------
+# FORMAS
+# ------------------------
+class Shape:
+    """Disposición de los atributos de una instancia.
+
+    Una Shape no cambia nunca: añadir un atributo sigue la transición a la
+    Shape siguiente, que se crea la primera vez y después se reutiliza. Cada
+    clase tiene su Shape raíz (sin atributos), así que la forma también
+    identifica la clase de la instancia.
+    """
+
+    __slots__ = ("cls", "names", "index", "transitions")
+
+    def __init__(self, cls: UserClass, names=()):
+        self.cls = cls
+        self.names = names
+        self.index = {name: i for i, name in enumerate(names)}
+        self.transitions = {}
+
+    def add(self, name: str) -> "Shape":
+        shape = self.transitions.get(name)
+        if shape is None:
+            shape = self.transitions[name] = Shape(self.cls, self.names + (name,))
+        return shape
+
+    def __repr__(self):
+        return f"<forma {self.cls.name}{list(self.names)}>"
+
+# ------------------------
+# INSTANCIAS
+# ------------------------
+class Instance:
+    """Objeto de una clase del programa: su Shape y los valores por índice.
+
+    Los ejecutores comprueban `type(obj) is Instance` y acceden a
+    shape/values directamente; get() y set() son el camino genérico.
+    """
+
+    __slots__ = ("shape", "values")
+
+    def __init__(self, shape: Shape):
+        self.shape = shape
+        self.values = []
+
+    @property
+    def class_name(self) -> str:
+        return self.shape.cls.name
+
+    def get(self, name: str):
+        # Un atributo que no existe se lee como None
+        index = self.shape.index.get(name)
+        return None if index is None else self.values[index]
+
+    def set(self, name: str, value):
+        index = self.shape.index.get(name)
+        if index is None:
+            self.shape = self.shape.add(name)
+            self.values.append(value)
+        else:
+            self.values[index] = value
+
+    def attributes(self):
+        return dict(zip(self.shape.names, self.values))
+
+    # Se imprimen y comparan como el dict {"__class__", "__dict__"} de antes
+    def __repr__(self):
+        return repr({"__class__": self.class_name, "__dict__": self.attributes()})
+
+    def __eq__(self, other):
+        if type(other) is not Instance:
+            return NotImplemented
+        return self.class_name == other.class_name and self.attributes() == other.attributes()
+
+    __hash__ = None
+
+# ------------------------
+# CACHÉS EN LÍNEA
+# ------------------------
+class MethodCache:
+    """Caché de un punto de llamada obj.metodo(...), indexada por la clase del receptor.
+
+    El camino rápido lo hacen los ejecutores: si la clase es la última vista
+    (cls), el método es method. lookup() es el camino lento: prueba las
+    clases ya vistas en ese punto (hasta POLYMORPHIC_LIMIT) y si no, busca
+    en la clase. hits y misses cuentan ambos caminos para el perfilado.
+    """
+
+    __slots__ = ("method_name", "line", "cls", "method", "seen", "hits", "misses")
+
+    def __init__(self, method_name: str, line: int):
+        self.method_name = method_name
+        self.line = line
+        self.cls = None
+        self.method = None
+        self.seen = {}
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, cls: UserClass):
+        method = self.seen.get(cls, self)
+        if method is self:
+            self.misses += 1
+            method = cls.methods.get(self.method_name)
+            if len(self.seen) < POLYMORPHIC_LIMIT:
+                self.seen[cls] = method
+        else:
+            self.hits += 1
+        self.cls = cls
+        self.method = method
+        return method
+
+    @property
+    def classes(self) -> int:
+        return len(self.seen)
+
+def format_method_caches(caches) -> str:
+    """Informe de las cachés de métodos, una línea por punto de llamada."""
+    lines = []
+    for cache in sorted(caches, key=lambda c: (c.line, c.method_name)):
+        if cache.hits or cache.misses:
+            # Más fallos que clases recordadas: llegaron clases que ya no caben
+            if cache.misses > cache.classes:
+                kind = "megamórfica"
+            else:
+                kind = "monomórfica" if cache.classes == 1 else "polimórfica"
+            lines.append(f"Ln {cache.line} .{cache.method_name}(): {cache.hits} aciertos, "
+                         f"{cache.misses} fallos ({kind})")
+    total_hits = sum(cache.hits for cache in caches)
+    total_misses = sum(cache.misses for cache in caches)
+    lines.append(f"Total: {total_hits} aciertos, {total_misses} fallos")
+    return "\n".join(lines)
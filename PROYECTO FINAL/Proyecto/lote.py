@@ -0,0 +1,207 @@
+# lote.py
+# Compilación por lotes: recorre un directorio y pasa cada archivo .py por
+# Lexer, Parser y SemanticAnalyzer en un pool de procesos. El resultado es
+# un informe JSON Lines con el estado, los errores y el tiempo de cada fase
+# por archivo, como reporte.txt pero para todo el corpus.
+import json
+import os
+import sys
+import time
+from multiprocessing import Pool
+
+from compilador import Lexer, Parser, SemanticAnalyzer
+
+# Estados posibles de un archivo en el informe
+STATUSES = ("correcto", "error_lectura", "error_lexico", "error_sintactico",
+            "error_semantico", "fallo_interno")
+
+# Directorios que no se recorren
+SKIPPED_DIRS = {"__pycache__", ".git"}
+
+def source_files(root: str):
+    """Archivos .py bajo root (o root si es un archivo), en orden estable."""
+    if os.path.isfile(root):
+        yield root
+        return
+    for directory, dirs, files in os.walk(root):
+        dirs[:] = sorted(d for d in dirs if d not in SKIPPED_DIRS and not d.startswith("."))
+        for name in sorted(files):
+            if name.endswith(".py"):
+                yield os.path.join(directory, name)
+
+# ------------------------
+# UN ARCHIVO
+# ------------------------
+def _ms(start: float) -> float:
+    return round((time.perf_counter() - start) * 1000, 3)
+
+def check_file(path: str):
+    """Front end completo de un archivo; devuelve su entrada del informe.
+
+    Se ejecuta en los procesos del pool: lee el archivo allí mismo y solo
+    devuelve un dict pequeño, nunca tokens ni AST, para que el coste de
+    comunicación no dependa del tamaño del fuente.
+    """
+    result = {"archivo": path, "estado": "correcto", "errores": [], "lineas": 0, "tokens": 0,
+              "tiempos_ms": {"lexico": 0.0, "sintactico": 0.0, "semantico": 0.0}}
+    timings = result["tiempos_ms"]
+    phase = "error_lectura"
+    try:
+        with open(path, "r", encoding="utf-8") as file:
+            code = file.read()
+        result["lineas"] = len(code.splitlines())
+
+        phase = "error_lexico"
+        start = time.perf_counter()
+        tokens = Lexer(code).tokens
+        timings["lexico"] = _ms(start)
+        result["tokens"] = len(tokens)
+
+        phase = "error_sintactico"
+        start = time.perf_counter()
+        ast = Parser(tokens).parse()
+        timings["sintactico"] = _ms(start)
+
+        phase = "error_semantico"
+        start = time.perf_counter()
+        analyzer = SemanticAnalyzer(tokens)
+        analyzer.analyze(ast.body)
+        timings["semantico"] = _ms(start)
+    except (OSError, UnicodeDecodeError) as e:
+        result["estado"] = "error_lectura"
+        result["errores"].append(str(e))
+        return result
+    except SyntaxError as e:
+        # El Lexer y el Parser señalan sus errores con SyntaxError
+        result["estado"] = phase
+        result["errores"].append(str(e))
+        return result
+    except Exception as e:
+        # Un fallo del compilador con un archivo no debe parar el lote
+        result["estado"] = "fallo_interno"
+        result["errores"].append(f"{type(e).__name__}: {e}")
+        return result
+
+    if analyzer.errors:
+        result["estado"] = "error_semantico"
+        result["errores"] = analyzer.errors
+    return result
+
+# ------------------------
+# LOTE
+# ------------------------
+def check_files(paths, processes: int = None):
+    """Resultados de check_file para cada ruta, en el orden en que terminan."""
+    paths = list(paths)
+    processes = processes or os.cpu_count() or 1
+    if processes == 1 or len(paths) < 2:
+        yield from map(check_file, paths)
+        return
+    # Bloques grandes para no pagar una ida y vuelta por archivo, pero
+    # suficientes por proceso para repartir bien la carga al final
+    chunksize = max(1, len(paths) // (processes * 8))
+    with Pool(processes) as pool:
+        yield from pool.imap_unordered(check_file, paths, chunksize)
+
+class BatchReport:
+    """Informe JSON Lines: una línea de resumen y después una por archivo.
+
+    Cada resultado se serializa al llegar, mientras los procesos siguen
+    trabajando, así que al terminar el lote solo queda ordenar las líneas
+    por ruta y escribirlas.
+    """
+
+    PHASES = ("lexico", "sintactico", "semantico")
+
+    def __init__(self, root: str, processes: int):
+        self.root = root
+        self.processes = processes
+        # Las rutas vienen de os.path.join(root, ...): basta quitar el prefijo
+        self.prefix = os.path.join(root, "") if os.path.isdir(root) else ""
+        self.counts = dict.fromkeys(STATUSES, 0)
+        self.totals = dict.fromkeys(self.PHASES, 0.0)
+        self.files = 0
+        self.lines = 0
+        self.elapsed = 0.0
+        self.entries = []
+
+    def add(self, result):
+        self.files += 1
+        self.lines += result["lineas"]
+        self.counts[result["estado"]] += 1
+        for phase, value in result["tiempos_ms"].items():
+            self.totals[phase] += value
+        if self.prefix and result["archivo"].startswith(self.prefix):
+            result["archivo"] = result["archivo"][len(self.prefix):]
+        self.entries.append((result["archivo"], json.dumps(result, ensure_ascii=False)))
+
+    @property
+    def ok(self) -> bool:
+        return self.counts["correcto"] == self.files
+
+    def summary(self):
+        return {
+            "raiz": self.root,
+            "archivos": self.files,
+            "estados": self.counts,
+            "procesos": self.processes,
+            "segundos": round(self.elapsed, 3),
+            "archivos_por_segundo": round(self.files / self.elapsed, 1) if self.elapsed else None,
+            "lineas": self.lines,
+            "tiempos_ms": {phase: round(value, 1) for phase, value in self.totals.items()},
+        }
+
+    def write(self, file):
+        file.write(json.dumps({"resumen": self.summary()}, ensure_ascii=False) + "\n")
+        self.entries.sort()
+        file.writelines(line + "\n" for _, line in self.entries)
+
+    def format_summary(self) -> str:
+        summary = self.summary()
+        states = ", ".join(f"{state.replace('_', ' ')}: {count}"
+                           for state, count in self.counts.items() if count)
+        phases = ", ".join(f"{phase}: {value:.0f} ms" for phase, value in summary["tiempos_ms"].items())
+        return (f"{self.files} archivos ({self.lines:,} líneas) en {self.elapsed:.2f} s "
+                f"con {self.processes} procesos ({summary['archivos_por_segundo'] or 0:.0f} archivos/s)\n"
+                f"Estados: {states or 'ninguno'}\n"
+                f"Tiempo por fase (suma de todos los procesos): {phases}")
+
+def run_batch(root: str, processes: int = None) -> BatchReport:
+    processes = processes or os.cpu_count() or 1
+    report = BatchReport(root, processes)
+    start = time.perf_counter()
+    for result in check_files(source_files(root), processes):
+        report.add(result)
+    report.elapsed = time.perf_counter() - start
+    return report
+
+def main():
+    import argparse
+
+    arg_parser = argparse.ArgumentParser(description="Compila por lotes todos los .py de un directorio")
+    arg_parser.add_argument("ruta", help="directorio (o archivo) a compilar")
+    arg_parser.add_argument("-j", "--procesos", type=int, default=None,
+                            help="procesos del pool (por defecto: uno por núcleo)")
+    arg_parser.add_argument("-o", "--salida", default="reporte_lote.jsonl",
+                            help="archivo del informe JSON Lines ('-' para stdout)")
+    args = arg_parser.parse_args()
+
+    if not os.path.exists(args.ruta):
+        print("❌ La ruta no existe.")
+        sys.exit(2)
+
+    report = run_batch(args.ruta, args.procesos)
+    if args.salida == "-":
+        report.write(sys.stdout)
+        print(report.format_summary(), file=sys.stderr)
+    else:
+        with open(args.salida, "w", encoding="utf-8") as file:
+            report.write(file)
+        print(report.format_summary())
+        print(f"Informe: {args.salida}")
+
+    # Código de salida distinto de cero si algún archivo tiene errores
+    sys.exit(0 if report.ok else 1)
+
+if __name__ == "__main__":
+    main()
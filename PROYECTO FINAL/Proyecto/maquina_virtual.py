@@ -0,0 +1,668 @@
+# maquina_virtual.py
+# Compilador de AST a bytecode y máquina virtual de pila.
+from array import array
+from typing import List, Dict, Any
+
+from compilador import BINARY_OPERATORS, assigned_names, defined_names
+from entrada_salida import STANDARD_IO
+from instancias import Instance, MethodCache, UserClass
+from nodos import KIND_NAMES, VAR, CONST, BINOP, ATTR, CALL, METHOD_CALL, LOGICAL, FUNC_DEF
+
+# ------------------------
+# OPCODES
+# ------------------------
+# Los más frecuentes van primero: el bucle de despacho los compara en orden.
+LOAD_NAME = 0
+LOAD_CONST = 1
+BINARY_OP_CONST = 2
+BINARY_OP = 3
+STORE_NAME = 4
+POP_JUMP_IF_FALSE = 5
+POP_JUMP_IF_TRUE = 6
+JUMP = 7
+JUMP_IF_FALSE_OR_POP = 8
+JUMP_IF_TRUE_OR_POP = 9
+FOR_ITER = 10
+STORE_LOOP_VAR = 11
+CALL_FUNCTION = 12
+CALL_METHOD = 13
+LOAD_ATTR = 14
+STORE_ATTR = 15
+PRINT = 16
+POP_TOP = 17
+RETURN_VALUE = 18
+GET_ITER = 19
+INPUT = 20
+MAKE_FUNCTION = 21
+MAKE_CLASS = 22
+STORE_GLOBAL = 23
+
+OPNAMES = {value: name for name, value in list(globals().items())
+           if name.isupper() and isinstance(value, int)}
+
+# Tabla de operadores indexada por el argumento de BINARY_OP
+OPERATOR_SYMBOLS = list(BINARY_OPERATORS)
+OPERATOR_FUNCTIONS = [BINARY_OPERATORS[op] for op in OPERATOR_SYMBOLS]
+OPERATOR_INDEX = {op: i for i, op in enumerate(OPERATOR_SYMBOLS)}
+
+BUILTINS = frozenset(("print", "input", "int", "range"))
+MAX_DEPTH = 1_000_000  # Llamadas anidadas del programa antes de "recursión demasiado profunda"
+FRAME_POOL_SIZE = 256  # Frames libres que se guardan para reutilizar
+
+# ------------------------
+# OBJETOS DE CÓDIGO
+# ------------------------
+class CodeObject:
+    """Flujo plano de instrucciones: opcodes y operandos en arrays paralelos."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.ops = array('B')
+        self.args = array('i')
+        self.lines = array('i')
+        self.consts: List[Any] = []
+        self.names: List[str] = []
+        # Caché por instrucción: (forma, índice, forma siguiente) en
+        # LOAD_ATTR/STORE_ATTR y una MethodCache en CALL_METHOD
+        self.caches: List[Any] = []
+        # (ops, args, consts, names, caches) con ops y args como listas: lo
+        # que la VM carga en variables locales al entrar en el código
+        self.runtime = None
+
+    def disassemble(self) -> str:
+        lines = []
+        for pc, (op, arg) in enumerate(zip(self.ops, self.args)):
+            detail = ""
+            if op in (LOAD_NAME, STORE_NAME, STORE_LOOP_VAR, STORE_GLOBAL, LOAD_ATTR, STORE_ATTR):
+                detail = f" ({self.names[arg]})"
+            elif op in (LOAD_CONST, CALL_FUNCTION, CALL_METHOD, PRINT, MAKE_FUNCTION, MAKE_CLASS):
+                detail = f" ({self.consts[arg]!r})"
+            elif op == BINARY_OP:
+                detail = f" ({OPERATOR_SYMBOLS[arg]})"
+            elif op == BINARY_OP_CONST:
+                operator_index, right = self.consts[arg]
+                detail = f" ({OPERATOR_SYMBOLS[operator_index]} {right!r})"
+            lines.append(f"{self.lines[pc]:>4} {pc:>5} {OPNAMES[op]:<18} {arg}{detail}")
+        return "\n".join(lines)
+
+class Function:
+    def __init__(self, name: str, params: List[str], code: CodeObject):
+        self.name = name
+        self.params = params
+        # Como método, el primer parámetro recibe el objeto (se llame self o no)
+        self.receiver = params[0] if params else None
+        self.method_params = params[1:]
+        self.code = code
+
+    def __repr__(self):
+        return f"<función {self.name}>"
+
+class ClassInfo:
+    """Clase tal como se compila; MAKE_CLASS crea con ella la UserClass."""
+
+    def __init__(self, name: str, methods: Dict[str, Function], base: str = None):
+        self.name = name
+        self.methods = methods
+        self.base = base
+
+    def __repr__(self):
+        return f"<clase {self.name}>"
+
+# ------------------------
+# COMPILADOR A BYTECODE
+# ------------------------
+def _const_key(value):
+    # 1, 1.0 y True son iguales como claves de dict: distinguir por tipo
+    if isinstance(value, tuple):
+        return (tuple, tuple(_const_key(item) for item in value))
+    if isinstance(value, (int, float, str, type(None))):
+        return (type(value), value)
+    return (type(value), id(value))
+
+class BytecodeCompiler:
+    def compile_program(self, statements, predefined=()) -> CodeObject:
+        """predefined son globales que ya existen al ejecutar, como en SemanticAnalyzer."""
+        # Mismo ámbito que el Executor: dentro de una función es global todo
+        # nombre que el módulo asigna o define, salvo los parámetros
+        self.module_names = assigned_names(statements) | defined_names(statements) | set(predefined)
+        self.global_names = frozenset()  # en el programa las locales ya son las globales
+        return self.compile_body("<programa>", statements)
+
+    def compile_body(self, name, statements) -> CodeObject:
+        code = CodeObject(name)
+        self.code = code
+        self.line = 0
+        self.const_index: Dict[Any, int] = {}
+        self.name_index: Dict[str, int] = {}
+        for stmt in statements:
+            self.statement(stmt)
+        self.emit(LOAD_CONST, self.const(None))
+        self.emit(RETURN_VALUE)
+        code.caches = [MethodCache(code.consts[arg][0], line) if op == CALL_METHOD else None
+                       for op, arg, line in zip(code.ops, code.args, code.lines)]
+        code.runtime = (code.ops.tolist(), code.args.tolist(), code.consts, code.names, code.caches)
+        return code
+
+    def compile_function(self, name, params, body) -> Function:
+        # Guardar el estado del objeto que se está compilando
+        saved = (self.code, self.line, self.const_index, self.name_index, self.global_names)
+        self.global_names = self.module_names - set(params)
+        code = self.compile_body(name, body)
+        self.code, self.line, self.const_index, self.name_index, self.global_names = saved
+        return Function(name, params, code)
+
+    # --- Emisión ---
+    def emit(self, op, arg=0) -> int:
+        code = self.code
+        code.ops.append(op)
+        code.args.append(arg)
+        code.lines.append(self.line)
+        return len(code.ops) - 1
+
+    def patch(self, pc, target):
+        self.code.args[pc] = target
+
+    def here(self) -> int:
+        return len(self.code.ops)
+
+    def const(self, value) -> int:
+        key = _const_key(value)
+        if key not in self.const_index:
+            self.const_index[key] = len(self.code.consts)
+            self.code.consts.append(value)
+        return self.const_index[key]
+
+    def name(self, name) -> int:
+        if name not in self.name_index:
+            self.name_index[name] = len(self.code.names)
+            self.code.names.append(name)
+        return self.name_index[name]
+
+    # --- Sentencias ---
+    def statement(self, node):
+        if node is None:
+            return
+        handler = getattr(self, "stmt_" + KIND_NAMES[node.kind], None)
+        if handler is not None:
+            handler(node)
+        # var, attr_access y pass como sentencia no hacen nada
+
+    def body(self, statements):
+        for stmt in statements:
+            self.statement(stmt)
+
+    def stmt_assign(self, node):
+        self.line = node.line
+        self.expression(node.value)
+        self.emit(STORE_GLOBAL if node.name in self.global_names else STORE_NAME, self.name(node.name))
+
+    def stmt_attr_assign(self, node):
+        self.line = node.line
+        self.expression(node.value)
+        self.emit(LOAD_NAME, self.name(node.obj))
+        self.emit(STORE_ATTR, self.name(node.attr))
+
+    def stmt_if(self, node):
+        end_jumps = []
+        branches = [(node.condition, node.body)] + list(node.elifs)
+        for cond, branch in branches:
+            self.expression(cond)
+            skip = self.emit(POP_JUMP_IF_FALSE)
+            self.body(branch)
+            end_jumps.append(self.emit(JUMP))
+            self.patch(skip, self.here())
+        self.body(node.orelse)
+        for pc in end_jumps:
+            self.patch(pc, self.here())
+
+    def stmt_while(self, node):
+        # Condición al final: un solo salto por iteración
+        to_condition = self.emit(JUMP)
+        start = self.here()
+        self.body(node.body)
+        self.patch(to_condition, self.here())
+        self.expression(node.condition)
+        self.emit(POP_JUMP_IF_TRUE, start)
+
+    def stmt_for(self, node):
+        self.expression(node.iterable)
+        self.emit(GET_ITER)
+        start = self.emit(FOR_ITER)
+        self.emit(STORE_GLOBAL if node.var in self.global_names else STORE_LOOP_VAR, self.name(node.var))
+        self.body(node.body)
+        self.emit(JUMP, start)
+        self.patch(start, self.here())
+
+    def stmt_return(self, node):
+        self.line = node.line
+        self.expression(node.value)
+        self.emit(RETURN_VALUE)
+
+    def stmt_print(self, node):
+        self.line = node.line
+        for arg in node.args:
+            self.expression(arg)
+        self.emit(PRINT, self.const(len(node.args)))
+
+    def stmt_input(self, node):
+        self.line = node.line
+        self.input_call(node.args)
+        self.emit(POP_TOP)
+
+    def stmt_call(self, node):
+        self.expression(node)
+        self.emit(POP_TOP)
+
+    def stmt_method_call(self, node):
+        self.expression(node)
+        self.emit(POP_TOP)
+
+    def stmt_func_def(self, node):
+        function = self.compile_function(node.name, node.params, node.body)
+        self.emit(MAKE_FUNCTION, self.const(function))
+
+    def stmt_class_def(self, node):
+        class_methods = {}
+        for method in node.methods:
+            if method.kind == FUNC_DEF:
+                class_methods[method.name] = self.compile_function(
+                    f"{node.name}.{method.name}", method.params, method.body)
+        self.emit(MAKE_CLASS, self.const(ClassInfo(node.name, class_methods, node.base)))
+
+    # --- Expresiones ---
+    def expression(self, expr):
+        if expr is None:
+            self.emit(LOAD_CONST, self.const(None))
+            return
+        kind = expr.kind
+        if kind == CONST:
+            self.emit(LOAD_CONST, self.const(expr.value))
+        elif kind == VAR:
+            self.line = expr.line
+            self.emit(LOAD_NAME, self.name(expr.name))
+        elif kind == ATTR:
+            self.emit(LOAD_NAME, self.name(expr.obj))
+            self.emit(LOAD_ATTR, self.name(expr.attr))
+        elif kind == BINOP:
+            self.expression(expr.left)
+            self.line = expr.line
+            right = expr.right
+            if right.kind == CONST:
+                # Superinstrucción: operando derecho constante
+                self.emit(BINARY_OP_CONST, self.const((OPERATOR_INDEX[expr.op], right.value)))
+                return
+            self.expression(right)
+            self.emit(BINARY_OP, OPERATOR_INDEX[expr.op])
+        elif kind == LOGICAL:
+            # Cortocircuito: si el izquierdo decide, queda en la pila y se salta el derecho
+            self.expression(expr.left)
+            self.line = expr.line
+            skip = self.emit(JUMP_IF_FALSE_OR_POP if expr.op == "and" else JUMP_IF_TRUE_OR_POP)
+            self.expression(expr.right)
+            self.patch(skip, self.here())
+        elif kind == CALL:
+            self.line = expr.line
+            if expr.func == "input":
+                self.input_call(expr.args)
+                return
+            for arg in expr.args:
+                self.expression(arg)
+            self.emit(CALL_FUNCTION, self.const((expr.func, len(expr.args))))
+        elif kind == METHOD_CALL:
+            self.line = expr.line
+            self.emit(LOAD_NAME, self.name(expr.obj))
+            for arg in expr.args:
+                self.expression(arg)
+            self.emit(CALL_METHOD, self.const((expr.method, len(expr.args))))
+        else:
+            self.emit(LOAD_CONST, self.const(None))
+
+    def input_call(self, args):
+        # input solo usa el primer argumento como prompt
+        if args:
+            self.expression(args[0])
+        else:
+            self.emit(LOAD_CONST, self.const(""))
+        self.emit(INPUT)
+
+def _method_caches(code: CodeObject):
+    # Cachés de métodos del código y de las funciones y clases que define
+    for cache in code.caches:
+        if isinstance(cache, MethodCache):
+            yield cache
+    for const in code.consts:
+        if isinstance(const, Function):
+            yield from _method_caches(const.code)
+        elif isinstance(const, ClassInfo):
+            for method in const.methods.values():
+                yield from _method_caches(method.code)
+
+# ------------------------
+# MÁQUINA VIRTUAL
+# ------------------------
+class Frame:
+    """Activación de un CodeObject en la pila de frames de la VM.
+
+    Guarda lo que el bucle de ejecución tiene en variables locales mientras
+    el frame no es el activo: pc es la instrucción por la que sigue al
+    volver. instance es la instancia que devuelve una llamada a __init__.
+    """
+
+    __slots__ = ("code", "symbols", "stack", "pc", "instance")
+
+    def __init__(self, code: CodeObject = None, symbols=None):
+        self.code = code
+        self.symbols = {} if symbols is None else symbols
+        self.stack = []
+        self.pc = 0
+        self.instance = None
+
+class VirtualMachine:
+    """Ejecuta bytecode sin usar la pila de Python para las llamadas.
+
+    Cada llamada a una función o método del programa apila un Frame en una
+    lista y el mismo bucle sigue con su código; RETURN_VALUE lo desapila y
+    continúa con el de quien llamó. La profundidad de recursión la limita
+    max_depth, no la de Python. Los frames que terminan vuelven a un pool
+    junto con su pila y su diccionario de variables.
+    """
+
+    def __init__(self, code: CodeObject, symbols, max_depth: int = MAX_DEPTH, io=STANDARD_IO):
+        self.code = code
+        self.symbols = symbols
+        self.io = io
+        self.max_depth = max_depth
+        self.functions: Dict[str, Function] = {}
+        self.classes: Dict[str, UserClass] = {}
+        self.method_caches = list(_method_caches(code))
+        self.frame_pool: List[Frame] = []
+        self.unused_steps = 0  # del último quantum de resumable()
+        self.error = None      # excepción que terminó el programa
+
+    def run(self):
+        # Sin quantum el generador no cede nunca: el primer next() lo ejecuta entero
+        try:
+            next(self.resumable())
+        except StopIteration as stop:
+            return stop.value
+
+    def resumable(self, quantum: int = None):
+        """El programa como generador que cede cada quantum pasos.
+
+        Un paso es una vuelta de bucle (un salto hacia atrás) o una llamada
+        a una función o método del programa: entre dos pasos solo hay código
+        lineal, así que el tiempo hasta ceder está acotado. Tras cada yield,
+        send(n) reanuda con un quantum de n pasos (next() repite el
+        anterior). Al terminar, el valor de
+        StopIteration es el del programa y unused_steps los pasos del último
+        quantum que no se gastaron. Los errores se informan como en run() y
+        quedan en self.error.
+        """
+        try:
+            return (yield from self.execute_code(self.code, self.symbols, quantum))
+        except Exception as e:
+            self.error = e
+            self.io.write(f"Error durante la ejecución: {e}")
+        finally:
+            self.io.flush()
+
+    def execute_code(self, code: CodeObject, symbols, quantum: int = None):
+        # symbols son las variables locales; si falta un nombre se busca en las globales
+        ticks = quantum or -1  # con -1 la cuenta nunca llega a cero
+        frame = Frame(code, symbols)
+        frames = [frame]
+        pool = self.frame_pool
+        max_depth = self.max_depth
+        functions = self.functions
+        classes = self.classes
+        global_symbols = self.symbols
+        operators = OPERATOR_FUNCTIONS
+        write = self.io.write
+        ops, args, consts, names, caches = code.runtime
+        stack = frame.stack
+        push = stack.append
+        pop = stack.pop
+        pc = 0
+
+        while True:
+            op = ops[pc]
+            arg = args[pc]
+            pc += 1
+
+            if op == LOAD_NAME:
+                entry = symbols.get(names[arg])
+                if entry is None:
+                    entry = global_symbols.get(names[arg])
+                if entry is not None:
+                    push(entry.get("value"))
+                else:
+                    push(f"[Variable {names[arg]} no definida]")
+            elif op == LOAD_CONST:
+                push(consts[arg])
+            elif op == BINARY_OP_CONST:
+                operator_index, right = consts[arg]
+                stack[-1] = operators[operator_index](stack[-1], right)
+            elif op == BINARY_OP:
+                right = pop()
+                stack[-1] = operators[arg](stack[-1], right)
+            elif op == STORE_NAME:
+                entry = symbols.get(names[arg])
+                if entry is None:
+                    entry = global_symbols.get(names[arg])
+                if entry is None:
+                    symbols[names[arg]] = {"value": pop()}
+                else:
+                    entry["value"] = pop()
+            elif op == POP_JUMP_IF_FALSE:
+                if not pop():
+                    pc = arg
+            elif op == POP_JUMP_IF_TRUE:
+                if pop():
+                    # Solo lo emite while, para volver al cuerpo: un paso
+                    ticks -= 1
+                    if not ticks:
+                        ticks = (yield) or quantum
+                    pc = arg
+            elif op == JUMP:
+                if arg < pc:
+                    # Vuelta de un for: un paso
+                    ticks -= 1
+                    if not ticks:
+                        ticks = (yield) or quantum
+                pc = arg
+            elif op == JUMP_IF_FALSE_OR_POP:
+                if stack[-1]:
+                    pop()
+                else:
+                    pc = arg
+            elif op == JUMP_IF_TRUE_OR_POP:
+                if stack[-1]:
+                    pc = arg
+                else:
+                    pop()
+            elif op == FOR_ITER:
+                try:
+                    push(next(stack[-1]))
+                except StopIteration:
+                    pop()
+                    pc = arg
+            elif op == STORE_LOOP_VAR:
+                symbols[names[arg]] = {"value": pop()}
+            elif op == CALL_FUNCTION or op == CALL_METHOD:
+                callee_name, argc = consts[arg]
+                if argc:
+                    call_args = stack[-argc:]
+                    del stack[-argc:]
+                else:
+                    call_args = []
+                receiver = instance = None
+                if op == CALL_FUNCTION:
+                    # Las builtins tienen prioridad, igual que en Executor
+                    if callee_name in BUILTINS:
+                        push(self.call_function(callee_name, call_args))
+                        continue
+                    function = functions.get(callee_name)
+                    if function is None:
+                        cls = classes.get(callee_name)
+                        if cls is None:
+                            push(None)
+                            continue
+                        instance = Instance(cls.shape)
+                        function = cls.methods.get("__init__")
+                        if function is None:
+                            push(instance)
+                            continue
+                        # self es la instancia; lo que devuelva __init__ se descarta
+                        receiver = instance
+                        params = function.method_params
+                    else:
+                        params = function.params
+                else:
+                    receiver = pop()
+                    function = None
+                    if type(receiver) is Instance:
+                        cls = receiver.shape.cls
+                        cache = caches[pc - 1]
+                        if cls is cache.cls:
+                            cache.hits += 1
+                            function = cache.method
+                        else:
+                            function = cache.lookup(cls)
+                    if function is None:
+                        push(None)
+                        continue
+                    params = function.method_params
+
+                ticks -= 1
+                if not ticks:
+                    ticks = (yield) or quantum
+                if len(frames) > max_depth:
+                    # frames[0] es el programa: hay len(frames) - 1 llamadas en curso
+                    raise RuntimeError(f"recursión demasiado profunda (más de {max_depth} llamadas anidadas)")
+                # Frame del pool (o nuevo) con solo los parámetros (y el receptor) como variables
+                frame.pc = pc
+                frame = pool.pop() if pool else Frame()
+                symbols = frame.symbols
+                if receiver is not None and function.receiver is not None:
+                    symbols[function.receiver] = {"value": receiver}
+                for param, value in zip(params, call_args):
+                    symbols[param] = {"value": value}
+                code = frame.code = function.code
+                frame.instance = instance
+                frames.append(frame)
+                ops, args, consts, names, caches = code.runtime
+                stack = frame.stack
+                push = stack.append
+                pop = stack.pop
+                pc = 0
+            elif op == LOAD_ATTR:
+                obj = stack[-1]
+                if type(obj) is Instance:
+                    cache = caches[pc - 1]
+                    if cache is not None and cache[0] is obj.shape:
+                        stack[-1] = obj.values[cache[1]]
+                    else:
+                        index = obj.shape.index.get(names[arg])
+                        if index is None:
+                            stack[-1] = None
+                        else:
+                            caches[pc - 1] = (obj.shape, index, None)
+                            stack[-1] = obj.values[index]
+                else:
+                    stack[-1] = None
+            elif op == STORE_ATTR:
+                obj = pop()
+                val = pop()
+                if type(obj) is Instance:
+                    shape = obj.shape
+                    cache = caches[pc - 1]
+                    if cache is None or cache[0] is not shape:
+                        index = shape.index.get(names[arg])
+                        if index is None:
+                            cache = (shape, len(obj.values), shape.add(names[arg]))
+                        else:
+                            cache = (shape, index, None)
+                        caches[pc - 1] = cache
+                    if cache[2] is None:
+                        obj.values[cache[1]] = val
+                    else:
+                        obj.shape = cache[2]
+                        obj.values.append(val)
+            elif op == PRINT:
+                argc = consts[arg]
+                if argc:
+                    vals = stack[-argc:]
+                    del stack[-argc:]
+                else:
+                    vals = []
+                write(*vals)
+            elif op == POP_TOP:
+                pop()
+            elif op == RETURN_VALUE:
+                result = pop()
+                frames.pop()
+                if not frames:
+                    self.unused_steps = max(ticks, 0)
+                    return result
+                if frame.instance is not None:
+                    result = frame.instance
+                    frame.instance = None
+                if len(pool) < FRAME_POOL_SIZE:
+                    symbols.clear()
+                    stack.clear()
+                    pool.append(frame)
+                # Sigue el frame de quien llamó, con el resultado en su pila
+                frame = frames[-1]
+                ops, args, consts, names, caches = frame.code.runtime
+                symbols = frame.symbols
+                stack = frame.stack
+                push = stack.append
+                pop = stack.pop
+                pc = frame.pc
+                push(result)
+            elif op == GET_ITER:
+                stack[-1] = iter(stack[-1])
+            elif op == INPUT:
+                stack[-1] = self.io.read(stack[-1])
+            elif op == MAKE_FUNCTION:
+                function = consts[arg]
+                functions[function.name] = function
+                # Las funciones y clases se registran como globales, también las anidadas
+                if function.name not in global_symbols:
+                    global_symbols[function.name] = {"kind": "function", "value": None}
+            elif op == MAKE_CLASS:
+                class_info = consts[arg]
+                base = None
+                if class_info.base is not None:
+                    base = classes.get(class_info.base)
+                    if base is None:
+                        raise RuntimeError(f"Clase base '{class_info.base}' no definida")
+                classes[class_info.name] = UserClass(class_info.name, class_info.methods, base)
+                if class_info.name not in global_symbols:
+                    global_symbols[class_info.name] = {"kind": "class", "value": None}
+            elif op == STORE_GLOBAL:
+                # Asignación dentro de una función a un nombre global del módulo
+                entry = global_symbols.get(names[arg])
+                if entry is None:
+                    global_symbols[names[arg]] = {"value": pop()}
+                else:
+                    entry["value"] = pop()
+            else:
+                raise RuntimeError(f"Opcode desconocido {op}")
+
+    # --- Llamadas ---
+    def call_function(self, func_name, args):
+        # Builtins; las funciones y clases del programa las llama execute_code
+        if func_name == "print":
+            self.io.write(*args)
+            return None
+        elif func_name == "input":
+            return self.io.read(args[0] if args else "")
+        elif func_name == "int":
+            val = args[0]
+            return int(val) if val else 0
+        elif func_name == "range":
+            if 1 <= len(args) <= 3:
+                return range(*args)
+            return None
+        return None
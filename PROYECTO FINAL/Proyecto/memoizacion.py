@@ -0,0 +1,186 @@
+# memoizacion.py
+# Memoización de funciones puras en el modo tree. mark_pure_functions
+# decide qué funciones del programa dan siempre el mismo resultado para los
+# mismos argumentos y no tienen efectos visibles; Memoizer se engancha a un
+# Executor ya creado sustituyendo su call_body, como el perfilador, y
+# guarda los resultados de esas funciones en una caché LRU por función.
+from collections import OrderedDict
+
+from nodos import (VAR, ATTR, CALL, METHOD_CALL, ASSIGN, ATTR_ASSIGN, PRINT, INPUT, FUNC_DEF, CLASS_DEF,
+                   walk)
+
+DEFAULT_MAXSIZE = 1024  # Resultados que recuerda cada función
+
+# ------------------------
+# ANÁLISIS DE PUREZA
+# ------------------------
+def _impurity(function, class_names):
+    """Motivo por el que el cuerpo no es puro por sí mismo, o None.
+
+    Las llamadas a otras funciones del programa no se miran aquí: se
+    resuelven después, todas a la vez.
+    """
+    for stmt in function.body:
+        for node in walk(stmt):
+            kind = node.kind
+            if kind == PRINT or kind == INPUT:
+                return "hace entrada o salida"
+            if kind == CALL:
+                if node.func in ("print", "input"):
+                    return "hace entrada o salida"
+                if node.func in class_names:
+                    return f"crea instancias de {node.func}"
+            elif kind == VAR and node.slot < 0:
+                # Una global puede cambiar entre dos llamadas con los mismos argumentos
+                return f"lee la global '{node.name}'"
+            elif kind == ASSIGN and node.slot < 0:
+                return f"asigna la global '{node.name}'"
+            elif kind == ATTR or kind == ATTR_ASSIGN or kind == METHOD_CALL:
+                return "usa atributos o métodos de objetos"
+            elif kind == FUNC_DEF or kind == CLASS_DEF:
+                return "define funciones o clases"
+    return None
+
+def _callees(function):
+    return {node.func for stmt in function.body for node in walk(stmt) if node.kind == CALL}
+
+def mark_pure_functions(statements):
+    """Marca function.pure en todas las funciones (no métodos) del programa.
+
+    Una función es pura si no hace entrada ni salida, no lee ni escribe
+    globales, no toca atributos ni llama a métodos, no define nada y solo
+    llama a builtins sin efectos y a otras funciones puras. Las llamadas
+    recursivas no la hacen impura. Devuelve {nombre: motivo} de las que no
+    lo son.
+    """
+    functions, methods, class_names = [], set(), set()
+    for statement in statements:
+        if statement is None:
+            continue
+        for node in walk(statement):
+            if node.kind == FUNC_DEF:
+                functions.append(node)
+            elif node.kind == CLASS_DEF:
+                class_names.add(node.name)
+                methods.update(id(method) for method in node.methods)
+
+    reasons = {}
+    by_name = {}
+    for function in functions:
+        if id(function) in methods:
+            function.pure = False
+            continue
+        by_name.setdefault(function.name, []).append(function)
+        reason = _impurity(function, class_names)
+        function.pure = reason is None
+        if reason is not None:
+            reasons[function.name] = reason
+
+    # Punto fijo: una llamada a un nombre con alguna definición impura contagia
+    changed = True
+    while changed:
+        changed = False
+        for function in functions:
+            if not function.pure:
+                continue
+            for callee in _callees(function):
+                if any(not target.pure for target in by_name.get(callee, ())):
+                    function.pure = False
+                    reasons[function.name] = f"llama a '{callee}', que no es pura"
+                    changed = True
+                    break
+    return reasons
+
+# ------------------------
+# CACHÉ
+# ------------------------
+class FunctionMemo:
+    """Resultados de una función pura: argumentos -> valor, en orden LRU."""
+
+    __slots__ = ("name", "results", "hits", "misses", "evictions", "unhashable")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.results = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.unhashable = 0  # llamadas con argumentos que no pueden ser clave
+
+class Memoizer:
+    """Memoiza las funciones puras de un Executor.
+
+    La clave lleva también el tipo de cada argumento: 1, 1.0 y True son
+    iguales como claves de un dict pero no dan el mismo resultado (f(True)
+    puede devolver True). Una llamada que lanza una excepción no se guarda.
+    Ejecutar un def vacía todas las cachés: una función pura puede llamar a
+    otra que todavía no estaba definida (y entonces devolvía None) o que
+    se ha redefinido.
+    """
+
+    def __init__(self, executor, maxsize: int = DEFAULT_MAXSIZE):
+        self.executor = executor
+        self.maxsize = maxsize
+        self.impure = mark_pure_functions(executor.program)
+        self.memos = {}  # id(FunctionDef) -> FunctionMemo
+        for statement in executor.program:
+            if statement is None:
+                continue
+            for node in walk(statement):
+                if node.kind == FUNC_DEF and node.pure:
+                    self.memos[id(node)] = FunctionMemo(node.name)
+        if self.memos:
+            executor.call_body = self._wrap_call(executor.call_body)
+            executor.handlers[FUNC_DEF] = self._wrap_def(executor.handlers[FUNC_DEF])
+
+    def _wrap_def(self, execute_func_def):
+        def invalidating_def(node):
+            for memo in self.memos.values():
+                memo.results.clear()
+            return execute_func_def(node)
+        return invalidating_def
+
+    def _wrap_call(self, call_body):
+        memos, maxsize = self.memos, self.maxsize
+
+        def memoized_call(function, values):
+            memo = memos.get(id(function))
+            if memo is None:
+                return call_body(function, values)
+            key = (*values, *map(type, values))
+            results = memo.results
+            try:
+                result = results[key]
+            except KeyError:
+                pass
+            except TypeError:
+                memo.unhashable += 1
+                return call_body(function, values)
+            else:
+                memo.hits += 1
+                results.move_to_end(key)
+                return result
+            memo.misses += 1
+            result = results[key] = call_body(function, values)
+            if len(results) > maxsize:
+                results.popitem(last=False)
+                memo.evictions += 1
+            return result
+        return memoized_call
+
+    # --- Informe ---
+    def format_report(self) -> str:
+        lines = [f"Funciones memoizadas (máximo {self.maxsize} resultados por función):"]
+        if not self.memos:
+            lines.append("  ninguna función pura")
+        for memo in sorted(self.memos.values(), key=lambda memo: -(memo.hits + memo.misses)):
+            calls = memo.hits + memo.misses
+            rate = memo.hits / calls if calls else 0.0
+            line = (f"  {memo.name}: {memo.hits} aciertos, {memo.misses} fallos ({rate:.1%}), "
+                    f"{memo.evictions} desalojos, {len(memo.results)} guardados")
+            if memo.unhashable:
+                line += f", {memo.unhashable} sin memoizar (argumentos no hashables)"
+            lines.append(line)
+        for name, reason in sorted(self.impure.items()):
+            lines.append(f"  {name}: no se memoiza ({reason})")
+        return "\n".join(lines)
@@ -0,0 +1,289 @@
+# nativo.py
+# Backend nativo: traduce el AST validado a un ast.Module de Python, lo
+# compila a un objeto de código y lo ejecuta en CPython.
+#
+# A diferencia de los modos interpretados (tree, vm, closures), este modo
+# sigue la semántica de CPython, igual que el antiguo exec() de main():
+# scopes léxicos, excepciones para nombres indefinidos y literales de
+# cadena con escapes y f-strings. Para conservar la escritura sobre
+# variables globales del Executor, las funciones declaran `global` los
+# nombres que también se asignan o definen a nivel de módulo.
+import ast
+import builtins
+
+from compilador import assigned_names, defined_names
+from entrada_salida import PYTHON_RECURSION_ERROR, RUNTIME_ERROR, STANDARD_IO
+from nodos import (VAR, CONST, BINOP, ATTR, CALL, METHOD_CALL, LOGICAL, ASSIGN, ATTR_ASSIGN, IF, WHILE,
+                   FOR, RETURN, PRINT, INPUT, FUNC_DEF, CLASS_DEF, PASS)
+
+# ------------------------
+# TRADUCCIÓN A AST DE PYTHON
+# ------------------------
+ARITHMETIC_OPERATORS = {
+    '+': ast.Add,
+    '-': ast.Sub,
+    '*': ast.Mult,
+    '/': ast.Div,
+    '%': ast.Mod,
+}
+
+COMPARISON_OPERATORS = {
+    '==': ast.Eq,
+    '!=': ast.NotEq,
+    '<': ast.Lt,
+    '>': ast.Gt,
+    '<=': ast.LtE,
+    '>=': ast.GtE,
+}
+
+BOOLEAN_OPERATORS = {
+    'and': ast.And,
+    'or': ast.Or,
+}
+
+PROGRAM_RETURN = "__retorno_programa__"
+
+class ProgramReturn(Exception):
+    """Un return a nivel de programa termina la ejecución con un valor."""
+
+    def __init__(self, value):
+        super().__init__(value)
+        self.value = value
+
+def _set_location(node, line):
+    node.lineno = node.end_lineno = line
+    node.col_offset = node.end_col_offset = 0
+    return node
+
+class PythonTranslator:
+    """Convierte el AST del Parser (módulo nodos) en un ast.Module."""
+
+    def __init__(self):
+        self.line = 1
+        self.module_names = set()
+        self.in_function = False
+
+    def translate(self, statements, predefined=()) -> ast.Module:
+        # Los mismos nombres globales que SemanticAnalyzer.analyze
+        self.module_names = assigned_names(statements) | defined_names(statements) | set(predefined)
+        module = ast.Module(body=self.block(statements), type_ignores=[])
+        return ast.fix_missing_locations(module)
+
+    def compile(self, statements, filename="<programa>", predefined=()):
+        return compile(self.translate(statements, predefined), filename, "exec")
+
+    # --- Utilidades ---
+    def located(self, node, line=None):
+        if line:
+            self.line = line
+        return _set_location(node, self.line)
+
+    def name(self, identifier, store=False):
+        return ast.Name(id=identifier, ctx=ast.Store() if store else ast.Load())
+
+    def block(self, statements):
+        body = []
+        for stmt in statements:
+            translated = self.statement(stmt)
+            if translated is not None:
+                body.append(translated)
+        return body or [self.located(ast.Pass())]
+
+    # --- Sentencias ---
+    def statement(self, node):
+        if node is None:
+            return None
+        kind = node.kind
+
+        if kind == ASSIGN:
+            line = self.line = node.line
+            return self.located(ast.Assign(targets=[self.name(node.name, store=True)],
+                                           value=self.expression(node.value)), line)
+
+        elif kind == ATTR_ASSIGN:
+            line = self.line = node.line
+            target = ast.Attribute(value=self.name(node.obj), attr=node.attr, ctx=ast.Store())
+            return self.located(ast.Assign(targets=[target], value=self.expression(node.value)), line)
+
+        elif kind == IF:
+            return self.if_statement(node.condition, node.body, list(node.elifs), node.orelse)
+
+        elif kind == WHILE:
+            test = self.expression(node.condition)
+            line = self.line
+            return self.located(ast.While(test=test, body=self.block(node.body), orelse=[]), line)
+
+        elif kind == FOR:
+            iter_node = self.expression(node.iterable)
+            line = self.line
+            return self.located(ast.For(target=self.name(node.var, store=True), iter=iter_node,
+                                        body=self.block(node.body), orelse=[]), line)
+
+        elif kind == FUNC_DEF:
+            return self.function(node.name, node.params, node.body)
+
+        elif kind == CLASS_DEF:
+            class_line = self.line
+            body = [self.function(method.name, method.params, method.body)
+                    for method in node.methods if method.kind == FUNC_DEF]
+            bases = [self.name(node.base)] if node.base is not None else []
+            class_node = ast.ClassDef(name=node.name, bases=bases, keywords=[],
+                                      body=body or [self.located(ast.Pass())], decorator_list=[])
+            if "type_params" in ast.ClassDef._fields:
+                class_node.type_params = []
+            return _set_location(class_node, class_line)
+
+        elif kind == RETURN:
+            line = self.line = node.line
+            value = self.expression(node.value)
+            if self.in_function:
+                return self.located(ast.Return(value=value), line)
+            # return a nivel de programa: termina la ejecución
+            exc = ast.Call(func=self.name(PROGRAM_RETURN), args=[value], keywords=[])
+            return self.located(ast.Raise(exc=exc, cause=None), line)
+
+        elif kind == PRINT:
+            line = self.line = node.line
+            return self.located(ast.Expr(value=self.call("print", node.args)), line)
+
+        elif kind == INPUT:
+            line = self.line = node.line
+            return self.located(ast.Expr(value=self.call("input", node.args[:1])), line)
+
+        elif kind == PASS:
+            return self.located(ast.Pass(), node.line)
+
+        elif kind in (CALL, METHOD_CALL, VAR, ATTR):
+            return self.located(ast.Expr(value=self.expression(node)))
+
+        return None
+
+    def if_statement(self, condition, if_body, elif_cases, else_body):
+        test = self.expression(condition)
+        line = self.line
+        body = self.block(if_body)
+        if elif_cases:
+            elif_cond, elif_body = elif_cases[0]
+            orelse = [self.if_statement(elif_cond, elif_body, elif_cases[1:], else_body)]
+        elif else_body:
+            orelse = self.block(else_body)
+        else:
+            orelse = []
+        return self.located(ast.If(test=test, body=body, orelse=orelse), line)
+
+    def function(self, name, params, body):
+        function_line = self.line
+        saved = self.in_function
+        self.in_function = True
+
+        # Escritura sobre globales y funciones anidadas registradas globalmente
+        declared = (assigned_names(body) & self.module_names) | defined_names(body)
+        declared -= set(params)
+        statements = []
+        if declared:
+            statements.append(self.located(ast.Global(names=sorted(declared)), function_line))
+        statements.extend(self.block(body))
+        self.in_function = saved
+
+        arguments = ast.arguments(posonlyargs=[], args=[ast.arg(arg=param) for param in params],
+                                  vararg=None, kwonlyargs=[], kw_defaults=[], kwarg=None, defaults=[])
+        function_node = ast.FunctionDef(name=name, args=arguments, body=statements,
+                                        decorator_list=[], returns=None)
+        if "type_params" in ast.FunctionDef._fields:
+            function_node.type_params = []
+        return _set_location(function_node, function_line)
+
+    # --- Expresiones ---
+    def call(self, func_name, args):
+        return ast.Call(func=self.name(func_name),
+                        args=[self.expression(arg) for arg in args], keywords=[])
+
+    def expression(self, expr):
+        if expr is None:
+            return ast.Constant(value=None)
+        kind = expr.kind
+
+        if kind == CONST:
+            if not isinstance(expr.value, str):
+                return ast.Constant(value=expr.value)
+            # Cadenas y f-strings con las reglas de Python, desde el texto original
+            literal = ast.parse(expr.raw, mode="eval").body
+            for child in ast.walk(literal):
+                if "lineno" in child._attributes:
+                    _set_location(child, self.line)
+            return literal
+
+        elif kind == VAR:
+            return self.name(expr.name)
+
+        elif kind == ATTR:
+            return ast.Attribute(value=self.name(expr.obj), attr=expr.attr, ctx=ast.Load())
+
+        elif kind == BINOP:
+            op = expr.op
+            left_node = self.expression(expr.left)
+            right_node = self.expression(expr.right)
+            self.line = expr.line
+            if op in ARITHMETIC_OPERATORS:
+                return ast.BinOp(left=left_node, op=ARITHMETIC_OPERATORS[op](), right=right_node)
+            if op in COMPARISON_OPERATORS:
+                return ast.Compare(left=left_node, ops=[COMPARISON_OPERATORS[op]()],
+                                   comparators=[right_node])
+            return ast.BoolOp(op=BOOLEAN_OPERATORS[op](), values=[left_node, right_node])
+
+        elif kind == LOGICAL:
+            values = [self.expression(expr.left), self.expression(expr.right)]
+            self.line = expr.line
+            return ast.BoolOp(op=BOOLEAN_OPERATORS[expr.op](), values=values)
+
+        elif kind == CALL:
+            self.line = expr.line
+            args = expr.args[:1] if expr.func == "input" else expr.args
+            return self.call(expr.func, args)
+
+        elif kind == METHOD_CALL:
+            self.line = expr.line
+            method = ast.Attribute(value=self.name(expr.obj), attr=expr.method, ctx=ast.Load())
+            return ast.Call(func=method, args=[self.expression(arg) for arg in expr.args], keywords=[])
+
+        return ast.Constant(value=None)
+
+# ------------------------
+# EJECUTOR NATIVO
+# ------------------------
+class NativeExecutor:
+    def __init__(self, ast_statements, symbols, filename="<programa>", io=STANDARD_IO):
+        self.ast = ast_statements
+        self.symbols = symbols
+        self.io = io
+        self.code = PythonTranslator().compile(ast_statements, filename, symbols)
+
+    def run(self):
+        # print e input del programa son los de self.io: las globales tapan a las builtins
+        namespace = {"__name__": "__main__", "__builtins__": builtins, PROGRAM_RETURN: ProgramReturn,
+                     "print": self.io.write, "input": self.io.read}
+        try:
+            exec(self.code, namespace)
+        except ProgramReturn as ret:
+            return ret.value
+        except RecursionError:
+            self.io.write(f"{RUNTIME_ERROR}: {PYTHON_RECURSION_ERROR}")
+        except Exception as e:
+            self.io.write(f"Error durante la ejecución: {e}")
+        finally:
+            self.io.flush()
+
+class SourceExecutor(NativeExecutor):
+    """Ejecuta el fuente tal cual en CPython, sin pasar por el front end.
+
+    Es el antiguo exec() de main(), para los programas válidos en Python que
+    la gramática del compilador no puede representar (expresiones
+    condicionales, f-strings con expresiones...). compile lanza SyntaxError
+    si tampoco son Python válido.
+    """
+
+    def __init__(self, source: str, filename="<programa>", io=STANDARD_IO):
+        self.ast = None
+        self.symbols = {}
+        self.io = io
+        self.code = compile(source, filename, "exec")
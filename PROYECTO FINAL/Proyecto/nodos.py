@@ -0,0 +1,438 @@
+# nodos.py
+# Nodos del AST: una clase con __slots__ por tipo de nodo. Cada nodo guarda
+# línea y columna; el tipo es un entero de clase (node.kind) para que los
+# ejecutores despachen con una tabla, y los literales se decodifican una
+# sola vez al parsear.
+
+# ------------------------
+# TIPOS DE NODO
+# ------------------------
+# Primero las expresiones más frecuentes; los valores indexan tablas de despacho.
+VAR = 0
+CONST = 1
+BINOP = 2
+ATTR = 3
+CALL = 4
+METHOD_CALL = 5
+LOGICAL = 6
+ASSIGN = 7
+ATTR_ASSIGN = 8
+IF = 9
+WHILE = 10
+FOR = 11
+RETURN = 12
+PRINT = 13
+INPUT = 14
+FUNC_DEF = 15
+CLASS_DEF = 16
+PASS = 17
+PROGRAM = 18
+NODE_KINDS = 19
+
+# Nombre de cada tipo, el mismo que usaba el AST de tuplas
+KIND_NAMES = [
+    "var", "const", "binop", "attr_access", "call", "method_call", "logical",
+    "assign", "attr_assign", "if", "while", "for", "return", "print", "input",
+    "func_def", "class_def", "pass", "program",
+]
+
+def decode_string(raw: str) -> str:
+    # Valor de un literal de cadena para los backends interpretados
+    return raw.strip('"\'')
+
+def decode_number(raw: str):
+    return float(raw) if '.' in raw else int(raw)
+
+class Node:
+    """Base de todos los nodos: posición en el fuente y comparación estructural."""
+
+    __slots__ = ("line", "col")
+    kind = -1
+    _fields = ()
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return (self.line == other.line and self.col == other.col and
+                all(getattr(self, field) == getattr(other, field) for field in self._fields))
+
+    __hash__ = None
+
+    def __repr__(self):
+        fields = ", ".join(f"{field}={getattr(self, field)!r}" for field in self._fields)
+        return f"{type(self).__name__}({fields}, line={self.line})"
+
+# ------------------------
+# EXPRESIONES
+# ------------------------
+class Constant(Node):
+    """Literal: value ya decodificado y raw tal como aparece en el fuente."""
+    __slots__ = ("value", "raw")
+    kind = CONST
+    _fields = ("value", "raw")
+
+    def __init__(self, value, raw, line=0, col=0):
+        self.value = value
+        self.raw = raw
+        self.line = line
+        self.col = col
+
+class Name(Node):
+    __slots__ = ("name", "slot")
+    kind = VAR
+    _fields = ("name",)
+
+    def __init__(self, name, line=0, col=0):
+        self.name = name
+        self.slot = None
+        self.line = line
+        self.col = col
+
+class Attribute(Node):
+    """obj.attr; cache_shape/cache_index guardan la última forma vista al ejecutar."""
+    __slots__ = ("obj", "attr", "slot", "cache_shape", "cache_index")
+    kind = ATTR
+    _fields = ("obj", "attr")
+
+    def __init__(self, obj, attr, line=0, col=0):
+        self.obj = obj
+        self.attr = attr
+        self.slot = None
+        self.cache_shape = None
+        self.cache_index = 0
+        self.line = line
+        self.col = col
+
+class BinOp(Node):
+    """operand_types los pone la inferencia de tipos y operate el Executor."""
+    __slots__ = ("op", "left", "right", "operand_types", "operate")
+    kind = BINOP
+    _fields = ("op", "left", "right")
+
+    def __init__(self, op, left, right, line=0, col=0):
+        self.op = op
+        self.left = left
+        self.right = right
+        self.operand_types = None
+        self.operate = None
+        self.line = line
+        self.col = col
+
+class Logical(BinOp):
+    """and/or con cortocircuito (los genera el optimizador)."""
+    __slots__ = ()
+    kind = LOGICAL
+
+class Call(Node):
+    __slots__ = ("func", "args")
+    kind = CALL
+    _fields = ("func", "args")
+
+    def __init__(self, func, args, line=0, col=0):
+        self.func = func
+        self.args = args
+        self.line = line
+        self.col = col
+
+class MethodCall(Node):
+    """obj.method(args); cache es la MethodCache del punto de llamada al ejecutar."""
+    __slots__ = ("obj", "method", "args", "slot", "cache")
+    kind = METHOD_CALL
+    _fields = ("obj", "method", "args")
+
+    def __init__(self, obj, method, args, line=0, col=0):
+        self.obj = obj
+        self.method = method
+        self.args = args
+        self.slot = None
+        self.cache = None
+        self.line = line
+        self.col = col
+
+# ------------------------
+# SENTENCIAS
+# ------------------------
+class Assign(Node):
+    __slots__ = ("name", "value", "slot")
+    kind = ASSIGN
+    _fields = ("name", "value")
+
+    def __init__(self, name, value, line=0, col=0):
+        self.name = name
+        self.value = value
+        self.slot = None
+        self.line = line
+        self.col = col
+
+class AttrAssign(Node):
+    """obj.attr = value; cache_next es la forma tras añadir attr, o None si ya existía."""
+    __slots__ = ("obj", "attr", "value", "slot", "cache_shape", "cache_index", "cache_next")
+    kind = ATTR_ASSIGN
+    _fields = ("obj", "attr", "value")
+
+    def __init__(self, obj, attr, value, line=0, col=0):
+        self.obj = obj
+        self.attr = attr
+        self.value = value
+        self.slot = None
+        self.cache_shape = None
+        self.cache_index = 0
+        self.cache_next = None
+        self.line = line
+        self.col = col
+
+class If(Node):
+    """if/elif/else: elifs es una lista de pares (condición, cuerpo)."""
+    __slots__ = ("condition", "body", "elifs", "orelse")
+    kind = IF
+    _fields = ("condition", "body", "elifs", "orelse")
+
+    def __init__(self, condition, body, elifs, orelse, line=0, col=0):
+        self.condition = condition
+        self.body = body
+        self.elifs = elifs
+        self.orelse = orelse
+        self.line = line
+        self.col = col
+
+class While(Node):
+    __slots__ = ("condition", "body")
+    kind = WHILE
+    _fields = ("condition", "body")
+
+    def __init__(self, condition, body, line=0, col=0):
+        self.condition = condition
+        self.body = body
+        self.line = line
+        self.col = col
+
+class For(Node):
+    """range_args y body_returns los pone el Executor: ver Executor.execute_for."""
+    __slots__ = ("var", "iterable", "body", "slot", "range_args", "body_returns")
+    kind = FOR
+    _fields = ("var", "iterable", "body")
+
+    def __init__(self, var, iterable, body, line=0, col=0):
+        self.var = var
+        self.iterable = iterable
+        self.body = body
+        self.slot = None
+        self.range_args = None
+        self.body_returns = True
+        self.line = line
+        self.col = col
+
+class Return(Node):
+    __slots__ = ("value",)
+    kind = RETURN
+    _fields = ("value",)
+
+    def __init__(self, value, line=0, col=0):
+        self.value = value
+        self.line = line
+        self.col = col
+
+class Print(Node):
+    __slots__ = ("args",)
+    kind = PRINT
+    _fields = ("args",)
+
+    def __init__(self, args, line=0, col=0):
+        self.args = args
+        self.line = line
+        self.col = col
+
+class Input(Print):
+    __slots__ = ()
+    kind = INPUT
+
+class FunctionDef(Node):
+    """Definición de función o método; frame lo rellena SemanticAnalyzer y
+    pure, memoizacion.mark_pure_functions."""
+    __slots__ = ("name", "params", "body", "frame", "slot", "pure")
+    kind = FUNC_DEF
+    _fields = ("name", "params", "body")
+
+    def __init__(self, name, params, body, line=0, col=0):
+        self.name = name
+        self.params = params
+        self.body = body
+        self.frame = None
+        self.slot = None
+        self.pure = False
+        self.line = line
+        self.col = col
+
+class ClassDef(Node):
+    """class name(base): base es el nombre de la clase base o None."""
+    __slots__ = ("name", "methods", "base", "slot")
+    kind = CLASS_DEF
+    _fields = ("name", "methods", "base")
+
+    def __init__(self, name, methods, line=0, col=0, base=None):
+        self.name = name
+        self.methods = methods
+        self.base = base
+        self.slot = None
+        self.line = line
+        self.col = col
+
+class Pass(Node):
+    __slots__ = ()
+    kind = PASS
+
+    def __init__(self, line=0, col=0):
+        self.line = line
+        self.col = col
+
+class Program(Node):
+    __slots__ = ("body",)
+    kind = PROGRAM
+    _fields = ("body",)
+
+    def __init__(self, body, line=1, col=1):
+        self.body = body
+        self.line = line
+        self.col = col
+
+# ------------------------
+# RECORRIDOS
+# ------------------------
+def children(node):
+    """Nodos hijos directos, en el orden del fuente."""
+    for field in node._fields:
+        value = getattr(node, field)
+        if isinstance(value, Node):
+            yield value
+        elif isinstance(value, list):
+            for item in value:
+                if isinstance(item, Node):
+                    yield item
+                elif isinstance(item, tuple):
+                    # Pares (condición, cuerpo) de los elif
+                    condition, body = item
+                    yield condition
+                    yield from body
+
+def walk(node):
+    """El nodo y todos sus descendientes, en preorden."""
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        yield current
+        stack.extend(reversed(list(children(current))))
+
+def shift_lines(node, delta):
+    """Desplaza en el sitio los números de línea de un subárbol."""
+    if delta:
+        for current in walk(node):
+            current.line += delta
+
+# ------------------------
+# FORMATO DE TUPLAS
+# ------------------------
+def as_tuple(node):
+    """El nodo en el formato de tuplas que producía el Parser anterior."""
+    if node is None:
+        return None
+    kind = node.kind
+    if kind == CONST:
+        if isinstance(node.value, bool):
+            return ("bool", node.raw, node.line)
+        if isinstance(node.value, str):
+            return ("string", node.raw)
+        return ("number", node.raw)
+    if kind == VAR:
+        return ("var", node.name, node.line)
+    if kind == ATTR:
+        return ("attr_access", node.obj, node.attr, node.line)
+    if kind in (BINOP, LOGICAL):
+        return (KIND_NAMES[kind], node.op, as_tuple(node.left), as_tuple(node.right), node.line)
+    if kind == CALL:
+        return ("call", node.func, [as_tuple(arg) for arg in node.args], node.line)
+    if kind == METHOD_CALL:
+        return ("method_call", node.obj, node.method, [as_tuple(arg) for arg in node.args], node.line)
+    if kind == ASSIGN:
+        return ("assign", node.name, as_tuple(node.value), node.line)
+    if kind == ATTR_ASSIGN:
+        return ("attr_assign", node.obj, node.attr, as_tuple(node.value), node.line)
+    if kind == IF:
+        return ("if", as_tuple(node.condition), [as_tuple(stmt) for stmt in node.body],
+                [(as_tuple(cond), [as_tuple(stmt) for stmt in body]) for cond, body in node.elifs],
+                [as_tuple(stmt) for stmt in node.orelse])
+    if kind == WHILE:
+        return ("while", as_tuple(node.condition), [as_tuple(stmt) for stmt in node.body])
+    if kind == FOR:
+        return ("for", node.var, as_tuple(node.iterable), [as_tuple(stmt) for stmt in node.body])
+    if kind == RETURN:
+        return ("return", as_tuple(node.value), node.line)
+    if kind in (PRINT, INPUT):
+        return (KIND_NAMES[kind], [as_tuple(arg) for arg in node.args], node.line)
+    if kind == FUNC_DEF:
+        return ("func_def", node.name, node.params, [as_tuple(stmt) for stmt in node.body])
+    if kind == CLASS_DEF:
+        methods = [as_tuple(method) for method in node.methods]
+        if node.base is not None:
+            # El formato de tuplas no tenía herencia: la base va al final
+            return ("class_def", node.name, methods, node.base)
+        return ("class_def", node.name, methods)
+    if kind == PASS:
+        return ("pass", node.line)
+    return ("program", [as_tuple(stmt) for stmt in node.body])
+
+# ------------------------
+# SERIALIZACIÓN
+# ------------------------
+# Formato compacto para guardar el AST con marshal: cada nodo es una tupla
+# (kind, line, col, *campos) con los campos en el orden de _fields. Los
+# slots que rellena el análisis y las cachés de ejecución no se guardan.
+def _data_value(value):
+    if isinstance(value, Node):
+        return to_data(value)
+    if isinstance(value, list):
+        return [_data_value(item) for item in value]
+    if isinstance(value, tuple):
+        return tuple(_data_value(item) for item in value)
+    return value
+
+def to_data(node):
+    """El nodo como tuplas, listas y literales que marshal puede guardar."""
+    if node is None:
+        return None
+    return (node.kind, node.line, node.col) + tuple(_data_value(getattr(node, field))
+                                                    for field in node._fields)
+
+def _node(data):
+    return None if data is None else _DECODERS[data[0]](data)
+
+def _nodes(items):
+    # Los bloques pueden contener None (sentencias vacías del parser)
+    return [None if data is None else _DECODERS[data[0]](data) for data in items]
+
+# Un constructor por tipo: mucho más rápido que recorrer _fields al cargar
+_DECODERS = [None] * NODE_KINDS
+_DECODERS[VAR] = lambda d: Name(d[3], d[1], d[2])
+_DECODERS[CONST] = lambda d: Constant(d[3], d[4], d[1], d[2])
+_DECODERS[BINOP] = lambda d: BinOp(d[3], _node(d[4]), _node(d[5]), d[1], d[2])
+_DECODERS[ATTR] = lambda d: Attribute(d[3], d[4], d[1], d[2])
+_DECODERS[CALL] = lambda d: Call(d[3], _nodes(d[4]), d[1], d[2])
+_DECODERS[METHOD_CALL] = lambda d: MethodCall(d[3], d[4], _nodes(d[5]), d[1], d[2])
+_DECODERS[LOGICAL] = lambda d: Logical(d[3], _node(d[4]), _node(d[5]), d[1], d[2])
+_DECODERS[ASSIGN] = lambda d: Assign(d[3], _node(d[4]), d[1], d[2])
+_DECODERS[ATTR_ASSIGN] = lambda d: AttrAssign(d[3], d[4], _node(d[5]), d[1], d[2])
+_DECODERS[IF] = lambda d: If(_node(d[3]), _nodes(d[4]),
+                             [(_node(condition), _nodes(body)) for condition, body in d[5]],
+                             _nodes(d[6]), d[1], d[2])
+_DECODERS[WHILE] = lambda d: While(_node(d[3]), _nodes(d[4]), d[1], d[2])
+_DECODERS[FOR] = lambda d: For(d[3], _node(d[4]), _nodes(d[5]), d[1], d[2])
+_DECODERS[RETURN] = lambda d: Return(_node(d[3]), d[1], d[2])
+_DECODERS[PRINT] = lambda d: Print(_nodes(d[3]), d[1], d[2])
+_DECODERS[INPUT] = lambda d: Input(_nodes(d[3]), d[1], d[2])
+_DECODERS[FUNC_DEF] = lambda d: FunctionDef(d[3], d[4], _nodes(d[5]), d[1], d[2])
+_DECODERS[CLASS_DEF] = lambda d: ClassDef(d[3], _nodes(d[4]), d[1], d[2], d[5])
+_DECODERS[PASS] = lambda d: Pass(d[1], d[2])
+_DECODERS[PROGRAM] = lambda d: Program(_nodes(d[3]), d[1], d[2])
+
+def from_data(data):
+    """Reconstruye los nodos a partir de to_data(node)."""
+    return _node(data)
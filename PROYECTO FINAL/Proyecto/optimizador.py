@@ -0,0 +1,239 @@
+# optimizador.py
+# Optimizaciones sobre el AST entre el análisis semántico y la ejecución:
+# plegado de constantes, eliminación de ramas muertas y de código
+# inalcanzable tras un return, y and/or con cortocircuito.
+import math
+import os
+from typing import Any, Dict, List
+
+from compilador import BINARY_OPERATORS, Lexer, Parser
+from nodos import (VAR, CONST, ATTR, BINOP, CALL, METHOD_CALL, ASSIGN, ATTR_ASSIGN, IF, WHILE, FOR,
+                   RETURN, PRINT, INPUT, FUNC_DEF, CLASS_DEF, Constant, Logical)
+
+# Reescrituras que se cuentan en el informe
+REWRITES = (
+    "constantes_plegadas",
+    "ramas_eliminadas",
+    "sentencias_inalcanzables",
+    "cortocircuitos",
+)
+
+MAX_FOLDED_STRING = 4096  # no generar literales enormes al plegar
+
+_NOT_CONSTANT = object()
+
+def _simple_string(raw: str) -> bool:
+    # Cadenas que todos los backends leen igual: sin f, sin escapes y sin
+    # comillas en los extremos del contenido (Executor usa strip)
+    if len(raw) < 2 or raw[0] not in "\"'" or raw[-1] != raw[0] or "\\" in raw:
+        return False
+    content = raw[1:-1]
+    return not content or (content[0] not in "\"'" and content[-1] not in "\"'")
+
+def constant_value(node):
+    """Valor de un literal, o _NOT_CONSTANT si no es un literal plegable."""
+    if not node or node.kind != CONST:
+        return _NOT_CONSTANT
+    if isinstance(node.value, str) and not _simple_string(node.raw):
+        return _NOT_CONSTANT
+    return node.value
+
+def literal_node(value, line, col):
+    """Nodo literal para un valor, o None si no se puede representar."""
+    if isinstance(value, bool):
+        return Constant(value, str(value), line, col)
+    if isinstance(value, int):
+        return Constant(value, str(value), line, col)
+    if isinstance(value, float):
+        text = repr(value)
+        if math.isfinite(value) and '.' in text and 'e' not in text:
+            return Constant(value, text, line, col)
+        return None
+    if isinstance(value, str) and len(value) <= MAX_FOLDED_STRING:
+        quote = '"' if '"' not in value else "'"
+        raw = quote + value + quote
+        if quote not in value and "\n" not in value and _simple_string(raw):
+            return Constant(value, raw, line, col)
+    return None
+
+# ------------------------
+# OPTIMIZADOR
+# ------------------------
+class ASTOptimizer:
+    """Reescribe el AST en el sitio y cuenta cada reescritura.
+
+    Los bloques se devuelven como listas nuevas, porque una sentencia puede
+    desaparecer o sustituirse por el cuerpo de una rama.
+    """
+
+    def __init__(self):
+        self.stats: Dict[str, int] = dict.fromkeys(REWRITES, 0)
+
+    def optimize(self, statements: List[Any]) -> List[Any]:
+        return self.block(statements)
+
+    # --- Sentencias ---
+    def block(self, statements):
+        result = []
+        for index, node in enumerate(statements):
+            if node is None:
+                continue
+            result.extend(self.statement(node))
+            if result and result[-1].kind == RETURN:
+                self.stats["sentencias_inalcanzables"] += sum(
+                    1 for stmt in statements[index + 1:] if stmt is not None)
+                break
+        return result
+
+    def statement(self, node) -> List[Any]:
+        # Una sentencia puede convertirse en varias (if plegado) o en ninguna
+        kind = node.kind
+
+        if kind in (ASSIGN, ATTR_ASSIGN, RETURN):
+            node.value = self.expression(node.value)
+
+        elif kind == IF:
+            return self.if_statement(node)
+
+        elif kind == WHILE:
+            node.condition = self.expression(node.condition)
+            value = constant_value(node.condition)
+            if value is not _NOT_CONSTANT and not value:
+                self.stats["ramas_eliminadas"] += 1
+                return []
+            node.body = self.block(node.body)
+
+        elif kind == FOR:
+            node.iterable = self.expression(node.iterable)
+            node.body = self.block(node.body)
+
+        elif kind == FUNC_DEF:
+            node.body = self.block(node.body)
+
+        elif kind == CLASS_DEF:
+            for method in node.methods:
+                method.body = self.block(method.body)
+
+        elif kind in (PRINT, INPUT):
+            node.args = [self.expression(arg) for arg in node.args]
+
+        elif kind in (CALL, METHOD_CALL, VAR, ATTR):
+            return [self.expression(node)]
+
+        return [node]
+
+    def if_statement(self, node):
+        branches = [(node.condition, node.body)] + list(node.elifs)
+        else_body = node.orelse
+
+        kept = []
+        for condition, body in branches:
+            condition = self.expression(condition)
+            value = constant_value(condition)
+            if value is _NOT_CONSTANT:
+                kept.append((condition, self.block(body)))
+                continue
+            self.stats["ramas_eliminadas"] += 1
+            if value:
+                # Rama siempre cierta: pasa a ser el else y las siguientes sobran
+                else_body = body
+                break
+        else_body = self.block(else_body)
+
+        if not kept:
+            return else_body
+        (node.condition, node.body), node.elifs = kept[0], kept[1:]
+        node.orelse = else_body
+        return [node]
+
+    # --- Expresiones ---
+    def expression(self, expr):
+        if not expr:
+            return expr
+        kind = expr.kind
+
+        if kind == BINOP:
+            left = expr.left = self.expression(expr.left)
+            right = expr.right = self.expression(expr.right)
+            left_value = constant_value(left)
+
+            if expr.op in ("and", "or"):
+                if left_value is not _NOT_CONSTANT:
+                    # El operando izquierdo decide: True and x -> x, False and x -> False
+                    self.stats["constantes_plegadas"] += 1
+                    decides = not left_value if expr.op == "and" else bool(left_value)
+                    return left if decides else right
+                self.stats["cortocircuitos"] += 1
+                return Logical(expr.op, left, right, expr.line, expr.col)
+
+            right_value = constant_value(right)
+            if left_value is not _NOT_CONSTANT and right_value is not _NOT_CONSTANT:
+                folded = self.fold(expr.op, left_value, right_value, expr.line, expr.col)
+                if folded is not None:
+                    self.stats["constantes_plegadas"] += 1
+                    return folded
+
+        elif kind in (CALL, METHOD_CALL):
+            expr.args = [self.expression(arg) for arg in expr.args]
+
+        return expr
+
+    def fold(self, op, left_value, right_value, line, col):
+        # Solo se pliega lo que da el mismo resultado en todos los backends
+        if op in ('/', '%') and right_value == 0:
+            return None
+        if op == '*' and isinstance(left_value, str) != isinstance(right_value, str):
+            text, times = (left_value, right_value) if isinstance(left_value, str) else (right_value, left_value)
+            if not isinstance(times, int) or len(text) * max(times, 0) > MAX_FOLDED_STRING:
+                return None
+        try:
+            value = BINARY_OPERATORS[op](left_value, right_value)
+        except (TypeError, ValueError, ArithmeticError):
+            return None
+        return literal_node(value, line, col)
+
+def optimize(statements):
+    """Devuelve (sentencias optimizadas, contadores de reescrituras)."""
+    optimizer = ASTOptimizer()
+    return optimizer.optimize(statements), optimizer.stats
+
+def format_stats(stats) -> str:
+    return ", ".join(f"{name.replace('_', ' ')}: {count}" for name, count in stats.items())
+
+# ------------------------
+# INFORME SOBRE UN CORPUS
+# ------------------------
+def _source_files(paths):
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                for name in sorted(files):
+                    if name.endswith(".py"):
+                        yield os.path.join(root, name)
+        else:
+            yield path
+
+def main():
+    import argparse
+
+    arg_parser = argparse.ArgumentParser(description="Informe de las optimizaciones sobre un corpus")
+    arg_parser.add_argument("rutas", nargs="+", help="archivos .py o directorios")
+    args = arg_parser.parse_args()
+
+    totals = dict.fromkeys(REWRITES, 0)
+    for path in _source_files(args.rutas):
+        with open(path, "r", encoding="utf-8") as file:
+            code = file.read()
+        try:
+            ast = Parser(Lexer(code).tokens).parse()
+        except SyntaxError as e:
+            print(f"{path}: {e}")
+            continue
+        _, stats = optimize(ast.body)
+        for name, count in stats.items():
+            totals[name] += count
+        print(f"{path}: {format_stats(stats)}")
+    print(f"Total: {format_stats(totals)}")
+
+if __name__ == "__main__":
+    main()
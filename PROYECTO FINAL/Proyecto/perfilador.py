@@ -0,0 +1,161 @@
+# perfilador.py
+# Perfilador del modo tree: cuenta ejecuciones y acumula tiempo por tipo de
+# nodo, por línea del fuente y por función o método del programa. Se
+# engancha a un Executor ya creado sustituyendo sus entradas de la tabla
+# handlers y su call_body, así que un Executor sin perfilador ejecuta
+# exactamente el mismo código que antes.
+import sys
+import time
+from collections import defaultdict
+
+from nodos import CLASS_DEF, KIND_NAMES, NODE_KINDS, walk
+
+PROGRAM_FRAME = "<programa>"
+
+class Profiler:
+    """Perfil de una ejecución de Executor.
+
+    Los tiempos de nodo y de línea son propios: el tiempo de un nodo menos
+    el de los nodos que evalúa dentro, así que la suma de todas las líneas
+    es el tiempo total. Por función se guarda además el tiempo inclusivo
+    (solo la activación más externa en las llamadas recursivas) y el propio
+    de cada pila de llamadas para el formato de pilas colapsadas.
+    """
+
+    def __init__(self, executor):
+        self.executor = executor
+        self.kind_count = [0] * NODE_KINDS
+        self.kind_time = [0.0] * NODE_KINDS
+        self.line_count = defaultdict(int)
+        self.line_time = defaultdict(float)
+        self.function_calls = defaultdict(int)
+        self.function_inclusive = defaultdict(float)
+        self.function_exclusive = defaultdict(float)
+        self.stacks = defaultdict(float)  # "a;b;c" -> tiempo propio de esa pila
+        self.total = 0.0
+
+        # Nombre de cada FunctionDef: los métodos llevan el nombre de su clase
+        self.names = {}
+        for statement in executor.program:
+            if statement is None:
+                continue
+            for node in walk(statement):
+                if node.kind == CLASS_DEF:
+                    for method in node.methods:
+                        self.names[id(method)] = f"{node.name}.{method.name}"
+
+        self._children = [0.0]        # tiempo de los nodos hijos, por nivel
+        self._frames = [0.0]          # tiempo de las llamadas hijas, por llamada
+        self._call_stack = [PROGRAM_FRAME]
+        self._active = defaultdict(int)  # activaciones en curso de cada función
+
+        handlers = executor.handlers
+        for kind, handler in enumerate(handlers):
+            if handler is not None:
+                handlers[kind] = self._wrap_node(kind, handler)
+        executor.call_body = self._wrap_call(executor.call_body)
+
+    def _wrap_node(self, kind, handler):
+        clock = time.perf_counter
+        children = self._children
+        kind_count, kind_time = self.kind_count, self.kind_time
+        line_count, line_time = self.line_count, self.line_time
+
+        def profiled(node):
+            children.append(0.0)
+            start = clock()
+            try:
+                return handler(node)
+            finally:
+                elapsed = clock() - start
+                own = elapsed - children.pop()
+                children[-1] += elapsed
+                kind_count[kind] += 1
+                kind_time[kind] += own
+                line_count[node.line] += 1
+                line_time[node.line] += own
+        return profiled
+
+    def _wrap_call(self, call_body):
+        clock = time.perf_counter
+        frames, call_stack, active = self._frames, self._call_stack, self._active
+
+        def profiled_call(function, values):
+            name = self.names.get(id(function), function.name)
+            call_stack.append(name)
+            frames.append(0.0)
+            active[name] += 1
+            start = clock()
+            try:
+                return call_body(function, values)
+            finally:
+                elapsed = clock() - start
+                own = elapsed - frames.pop()
+                frames[-1] += elapsed
+                active[name] -= 1
+                self.function_calls[name] += 1
+                self.function_exclusive[name] += own
+                if not active[name]:
+                    self.function_inclusive[name] += elapsed
+                self.stacks[";".join(call_stack)] += own
+                call_stack.pop()
+        return profiled_call
+
+    def run(self):
+        """Ejecuta el programa con el perfilador y devuelve lo que devuelva run().
+
+        Cada handler y call_body envueltos añaden un marco de Python por nodo,
+        así que la pila se duplica: el límite de recursión se duplica mientras
+        dura la ejecución para que un programa recursivo llegue a la misma
+        profundidad que sin perfilador.
+        """
+        limit = sys.getrecursionlimit()
+        sys.setrecursionlimit(limit * 2)
+        start = time.perf_counter()
+        try:
+            return self.executor.run()
+        finally:
+            self.total += time.perf_counter() - start
+            sys.setrecursionlimit(limit)
+            self.stacks[PROGRAM_FRAME] += self.total - self._frames[0]
+
+    # --- Informes ---
+    def format_report(self, code: str = None, limit: int = 20) -> str:
+        total = self.total or 1e-12
+        source = code.splitlines() if code is not None else []
+
+        def share(seconds):
+            return f"{seconds * 1000:10.2f} ms {seconds / total:6.1%}"
+
+        lines = [f"Tiempo total: {self.total * 1000:.2f} ms", "", "Por tipo de nodo (tiempo propio):",
+                 f"{'tipo':<14} {'ejecuciones':>12} {'tiempo':>13} {'%':>6} {'µs/ejec':>9}"]
+        kinds = sorted((kind for kind in range(NODE_KINDS) if self.kind_count[kind]),
+                       key=lambda kind: -self.kind_time[kind])
+        for kind in kinds:
+            count, seconds = self.kind_count[kind], self.kind_time[kind]
+            lines.append(f"{KIND_NAMES[kind]:<14} {count:>12,} {share(seconds)} {seconds / count * 1e6:>9.2f}")
+
+        lines += ["", f"Líneas más costosas (tiempo propio, {limit} primeras):",
+                  f"{'línea':>6} {'nodos':>12} {'tiempo':>13} {'%':>6}  fuente"]
+        for line in sorted(self.line_time, key=lambda line: -self.line_time[line])[:limit]:
+            text = source[line - 1].strip() if 0 < line <= len(source) else ""
+            lines.append(f"{line:>6} {self.line_count[line]:>12,} {share(self.line_time[line])}  {text}")
+
+        if self.function_calls:
+            lines += ["", "Funciones y métodos:",
+                      f"{'función':<24} {'llamadas':>10} {'inclusivo':>13} {'%':>6} {'propio':>13} {'%':>6} {'µs/llamada':>11}"]
+            for name in sorted(self.function_calls, key=lambda name: -self.function_inclusive[name]):
+                calls = self.function_calls[name]
+                lines.append(f"{name:<24} {calls:>10,} {share(self.function_inclusive[name])} "
+                             f"{share(self.function_exclusive[name])} "
+                             f"{self.function_inclusive[name] / calls * 1e6:>11.2f}")
+        return "\n".join(lines)
+
+    def collapsed_stacks(self) -> str:
+        """Pilas colapsadas ("a;b;c microsegundos" por línea) para flamegraph.pl y similares."""
+        lines = []
+        for stack, seconds in sorted(self.stacks.items()):
+            micros = round(seconds * 1e6)
+            if micros > 0:
+                lines.append(f"{stack} {micros}")
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,213 @@
+# planificador.py
+# Ejecución cooperativa de muchos programas en un solo proceso. Cada
+# programa corre en su VirtualMachine como generador (resumable) que cede
+# cada quantum pasos; el planificador los reparte por turnos y termina los
+# que agotan su combustible (pasos totales) o su memoria sin afectar a los
+# demás ni al proceso. Solo el modo vm es reanudable: el Executor del modo
+# tree recorre el AST con la pila de Python y no puede ceder a mitad.
+import io
+import time
+import tracemalloc
+from collections import deque
+
+from compilador import run_front_end
+from entrada_salida import FLUSH_END, ProgramIO
+from maquina_virtual import MAX_DEPTH, BytecodeCompiler, VirtualMachine
+from optimizador import optimize
+
+DEFAULT_QUANTUM = 1000  # Pasos (vueltas de bucle o llamadas) por turno
+
+# Estados posibles de un programa
+STATUSES = ("pendiente", "terminado", "error_ejecucion", "error_compilacion", "sin_combustible",
+            "sin_memoria")
+
+class Task:
+    """Un programa del planificador con su máquina, su salida y sus contadores."""
+
+    __slots__ = ("name", "machine", "generator", "program_io", "stream", "status", "errors", "output",
+                 "result", "steps", "slices", "memory", "peak_memory", "cpu_time")
+
+    def __init__(self, name: str, machine=None, inputs=()):
+        self.name = name
+        self.machine = machine
+        self.generator = None
+        self.stream = io.StringIO()
+        self.program_io = ProgramIO(stream=self.stream, policy=FLUSH_END, lines=list(inputs))
+        if machine is not None:
+            machine.io = self.program_io
+        self.status = "pendiente"
+        self.errors = []
+        self.output = ""
+        self.result = None
+        self.steps = 0
+        self.slices = 0
+        self.memory = 0       # bytes netos reservados en sus turnos
+        self.peak_memory = 0
+        self.cpu_time = 0.0
+
+    def finish(self, status: str):
+        # La máquina y el generador se sueltan para que su memoria se libere ya
+        self.status = status
+        self.output = self.stream.getvalue()
+        self.machine = self.generator = self.program_io = self.stream = None
+
+class Scheduler:
+    """Reparte turnos de quantum pasos entre programas, en orden circular.
+
+    fuel es el máximo de pasos de cada programa y memory_limit el máximo de
+    bytes que puede tener reservados; None es sin límite. La memoria se
+    mide con tracemalloc (solo si hay límite, porque ralentiza): lo que se
+    reserva y libera durante el turno de un programa se le atribuye a él.
+    """
+
+    def __init__(self, quantum: int = DEFAULT_QUANTUM, fuel: int = None, memory_limit: int = None,
+                 max_depth: int = MAX_DEPTH):
+        if quantum < 1:
+            raise ValueError("El quantum debe ser al menos 1")
+        self.quantum = quantum
+        self.fuel = fuel
+        self.memory_limit = memory_limit
+        self.max_depth = max_depth
+        self.tasks = []
+        self.switches = 0
+
+    def add(self, name: str, code: str, inputs=()) -> Task:
+        """Compila code a bytecode y lo añade; los errores de compilación quedan en la tarea."""
+        try:
+            _, ast, analyzer = run_front_end(code)
+        except SyntaxError as e:
+            return self.add_failure(name, [str(e)])
+        if analyzer.errors:
+            return self.add_failure(name, analyzer.errors)
+        statements, _ = optimize(ast.body)
+        machine = VirtualMachine(BytecodeCompiler().compile_program(statements), {}, self.max_depth)
+        task = Task(name, machine, inputs)
+        self.tasks.append(task)
+        return task
+
+    def add_failure(self, name, errors):
+        task = Task(name)
+        task.errors = list(errors)
+        task.finish("error_compilacion")
+        self.tasks.append(task)
+        return task
+
+    def run(self):
+        """Ejecuta todos los programas pendientes; devuelve las tareas."""
+        ready = deque(task for task in self.tasks if task.status == "pendiente")
+        tracing = self.memory_limit is not None and not tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.start()
+        measure = self.memory_limit is not None
+        try:
+            while ready:
+                task = ready.popleft()
+                self.step(task, measure)
+                if task.status == "pendiente":
+                    ready.append(task)
+                self.switches += 1
+        finally:
+            if tracing:
+                tracemalloc.stop()
+        return self.tasks
+
+    def step(self, task: Task, measure: bool):
+        """Un turno de task; al terminar, actualiza su estado."""
+        quantum = self.quantum
+        if self.fuel is not None:
+            quantum = min(quantum, self.fuel - task.steps)
+        before = tracemalloc.get_traced_memory()[0] if measure else 0
+        start = time.perf_counter()
+        try:
+            if task.generator is None:
+                task.generator = task.machine.resumable(quantum)
+                next(task.generator)
+            else:
+                task.generator.send(quantum)
+        except StopIteration as stop:
+            task.steps += quantum - task.machine.unused_steps
+            task.result = stop.value
+            if task.machine.error is not None:
+                task.errors.append(str(task.machine.error))
+            task.cpu_time += time.perf_counter() - start
+            task.slices += 1
+            task.finish("error_ejecucion" if task.errors else "terminado")
+            return
+        task.cpu_time += time.perf_counter() - start
+        task.slices += 1
+        task.steps += quantum
+        if measure:
+            task.memory += tracemalloc.get_traced_memory()[0] - before
+            task.peak_memory = max(task.peak_memory, task.memory)
+            if task.memory > self.memory_limit:
+                task.generator.close()
+                task.errors.append(f"superó el límite de memoria ({self.memory_limit} bytes)")
+                task.finish("sin_memoria")
+                return
+        if self.fuel is not None and task.steps >= self.fuel:
+            task.generator.close()
+            task.errors.append(f"agotó su combustible ({self.fuel} pasos)")
+            task.finish("sin_combustible")
+
+    # --- Informe ---
+    def format_report(self) -> str:
+        counts = {}
+        for task in self.tasks:
+            counts[task.status] = counts.get(task.status, 0) + 1
+        lines = [f"{len(self.tasks)} programas, quantum {self.quantum}, {self.switches} turnos: "
+                 + ", ".join(f"{status.replace('_', ' ')}: {count}" for status, count in counts.items()),
+                 f"{'programa':<24} {'estado':<18} {'pasos':>10} {'turnos':>7} {'tiempo':>10}"
+                 + (f" {'memoria':>10}" if self.memory_limit is not None else "")]
+        for task in self.tasks:
+            line = (f"{task.name:<24} {task.status:<18} {task.steps:>10} {task.slices:>7} "
+                    f"{task.cpu_time * 1000:>7.1f} ms")
+            if self.memory_limit is not None:
+                line += f" {task.peak_memory / 1024:>7.0f} KB"
+            if task.errors:
+                line += f"  {task.errors[0]}"
+            lines.append(line)
+        return "\n".join(lines)
+
+def main():
+    import argparse
+    import sys
+
+    arg_parser = argparse.ArgumentParser(description="Ejecuta varios programas a la vez en la VM, por turnos")
+    arg_parser.add_argument("archivos", nargs="+", help="archivos .py a ejecutar")
+    arg_parser.add_argument("-q", "--quantum", type=int, default=DEFAULT_QUANTUM,
+                            help=f"pasos por turno (por defecto: {DEFAULT_QUANTUM})")
+    arg_parser.add_argument("--combustible", type=int, metavar="PASOS",
+                            help="pasos máximos de cada programa (por defecto: sin límite)")
+    arg_parser.add_argument("--memoria-mb", type=float, metavar="MB",
+                            help="memoria máxima de cada programa (por defecto: sin límite)")
+    arg_parser.add_argument("--entrada", metavar="ARCHIVO", help="líneas para los input() de cada programa")
+    arg_parser.add_argument("--salidas", action="store_true", help="imprimir la salida de cada programa")
+    args = arg_parser.parse_args()
+    if args.quantum < 1 or (args.combustible is not None and args.combustible < 1):
+        arg_parser.error("--quantum y --combustible deben ser al menos 1")
+    if args.memoria_mb is not None and args.memoria_mb <= 0:
+        arg_parser.error("--memoria-mb debe ser positivo")
+
+    inputs = []
+    if args.entrada:
+        with open(args.entrada, "r", encoding="utf-8") as file:
+            inputs = file.read().splitlines()
+    memory_limit = int(args.memoria_mb * 2**20) if args.memoria_mb is not None else None
+    scheduler = Scheduler(args.quantum, args.combustible, memory_limit)
+    for path in args.archivos:
+        try:
+            with open(path, "r", encoding="utf-8") as file:
+                scheduler.add(path, file.read(), inputs)
+        except OSError as e:
+            scheduler.add_failure(path, [str(e)])
+    scheduler.run()
+
+    if args.salidas:
+        for task in scheduler.tasks:
+            print(f"=== {task.name} ===")
+            print(task.output, end="")
+    print(scheduler.format_report(), file=sys.stderr)
+    sys.exit(0 if all(task.status == "terminado" for task in scheduler.tasks) else 1)
+
+if __name__ == "__main__":
+    main()
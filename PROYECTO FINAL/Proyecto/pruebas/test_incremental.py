@@ -0,0 +1,124 @@
+# test_incremental.py
+# Prueba diferencial del re-análisis incremental: se aplican ediciones de
+# líneas al azar (reemplazar, insertar y borrar) a un IncrementalDocument y
+# sus tokens y sentencias deben coincidir, con líneas y columnas, con los de
+# analizar el fuente completo desde cero. Se puede lanzar con pytest o
+# directamente como script.
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from compilador import Lexer, Parser
+from incremental import IncrementalDocument
+from nodos import to_data
+
+# Trozos válidos de programa, de una o varias líneas
+TROZOS = [
+    "x = 1\n",
+    "y = x * 2 + 3\n",
+    'nombre = "hola mundo"\n',
+    "print(x, y)\n",
+    "\n",
+    "if x > 0:\n    y = 1\nelse:\n    y = 2\n",
+    "if x > 0: y = 3\n",
+    "for i in range(3):\n    x = x + i\n    print(i)\n",
+    "while x < 10:\n    x = x + 1\n",
+    "def doble(n):\n    return n * 2\n",
+    "def vacia():\n    pass\n",
+    "class Caja:\n    def __init__(self, v):\n        self.v = v\n",
+    "class Nada:\n    pass\n",
+]
+
+# Trozos que dejan el programa inválido: el incremental debe fallar igual
+INVALIDOS = [
+    "    z = 4\n",
+    "if y:\n",
+    "else:\n    x = 0\n",
+]
+
+SEMILLAS = range(6)
+EDICIONES = 150
+
+def full_parse(code):
+    """Tokens y sentencias de analizar todo el fuente, o None si no es válido."""
+    tokens = list(Lexer(code).tokens)
+    try:
+        program = Parser(tokens).parse()
+    except SyntaxError:
+        return tokens, None
+    return tokens, [to_data(stmt) for stmt in program.body]
+
+def random_text(rng):
+    pieces = TROZOS if rng.random() < 0.8 else TROZOS + INVALIDOS
+    return "".join(rng.choice(pieces) for _ in range(rng.randint(0, 3)))
+
+def check_document(doc, code, seed, step):
+    tokens, statements = full_parse(code)
+    assert doc.code == code, f"semilla {seed}, edición {step}: el fuente no coincide"
+    assert doc.tokens == tokens, f"semilla {seed}, edición {step}: los tokens no coinciden"
+    data = [to_data(stmt) for stmt in doc.statements]
+    assert data == statements, f"semilla {seed}, edición {step}: las sentencias no coinciden"
+
+def check_seed(seed):
+    rng = random.Random(seed)
+    lines = [trozo for trozo in TROZOS for _ in range(2)]
+    rng.shuffle(lines)
+    lines = "".join(lines).splitlines(keepends=True)
+    doc = IncrementalDocument("".join(lines))
+    # Una ventana pequeña obliga al parser a ampliarla sobre desplazamientos pendientes
+    doc.PARSE_WINDOW = rng.choice((4, 16, IncrementalDocument.PARSE_WINDOW))
+
+    for step in range(EDICIONES):
+        first = rng.randint(1, len(lines) + 1)
+        operation = rng.choice(("reemplazar", "insertar", "borrar"))
+        if operation == "insertar":
+            last, text = first - 1, random_text(rng) or "x = 1\n"
+        else:
+            last = min(first + rng.randint(0, 2), len(lines))
+            first = min(first, last) if last else 1
+            text = random_text(rng) if operation == "reemplazar" else ""
+        if last < first - 1:
+            continue
+        removed = lines[first - 1:last]
+        new_lines = text.splitlines(keepends=True)
+        lines[first - 1:last] = new_lines
+        code = "".join(lines)
+
+        _, statements = full_parse(code)
+        try:
+            doc.edit(first, last, text)
+            failed = False
+        except SyntaxError:
+            failed = True
+        assert failed == (statements is None), (
+            f"semilla {seed}, edición {step}: el parser completo "
+            f"{'falla' if statements is None else 'acepta'} y el incremental "
+            f"{'falla' if failed else 'acepta'}")
+        if failed:
+            # Deshacer la edición: el documento debe recuperarse
+            lines[first - 1:first - 1 + len(new_lines)] = removed
+            doc.edit(first, first - 1 + len(new_lines), "".join(removed))
+            code = "".join(lines)
+        # Sin consultar en cada edición quedan desplazamientos pendientes
+        # que las ediciones siguientes deben aplicar bien
+        if failed or rng.random() < 0.3:
+            check_document(doc, code, seed, step)
+
+    check_document(doc, "".join(lines), seed, EDICIONES)
+
+def test_ediciones_aleatorias():
+    for seed in SEMILLAS:
+        check_seed(seed)
+
+if __name__ == "__main__":
+    failures = 0
+    for seed in SEMILLAS:
+        try:
+            check_seed(seed)
+            print(f"semilla {seed}: correcto")
+        except AssertionError as e:
+            failures += 1
+            print(e)
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,101 @@
+# test_modos.py
+# Prueba diferencial de los modos de ejecución: cada programa se ejecuta en
+# tree, vm, closures y native, y todos deben dar la salida esperada. Se
+# puede lanzar con pytest o directamente como script.
+import io
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from compilador import EXECUTION_MODES, create_executor, run_front_end
+from entrada_salida import FLUSH_END, ProgramIO
+
+# Nombre -> (programa, salida esperada). Las funciones y clases se definen
+# en la primera vuelta de un bucle y se usan en la segunda
+PROGRAMAS = {
+    # Un nombre que el módulo asigna es global dentro de la función aunque
+    # la asignación del módulo se ejecute después de la llamada
+    "global_asignado_despues": ('''for fase in range(2):
+    if fase == 0:
+        def poner():
+            y = 5
+    else:
+        poner()
+        print(y)
+        y = 1
+        print(y)
+''', "5\n1\n"),
+    # La variable de un for dentro de una función también es global
+    "for_sobre_global": ('''for fase in range(2):
+    if fase == 0:
+        def contar(n):
+            for i in range(n):
+                total = total + i
+    else:
+        total = 0
+        i = 0
+        contar(4)
+        print(total, i)
+''', "6 3\n"),
+    # Los parámetros tapan a las globales del mismo nombre
+    "parametro_local": ('''for fase in range(2):
+    if fase == 0:
+        def doble(x):
+            x = x * 2
+            return x
+    else:
+        x = 1
+        print(doble(5), x)
+''', "10 1\n"),
+    # El objeto va al primer parámetro del método, se llame self o no
+    "receptor_sin_self": ('''for fase in range(2):
+    if fase == 0:
+        class Caja:
+            def __init__(this, v):
+                this.v = v
+            def doble(yo):
+                return yo.v * 2
+    else:
+        caja = Caja(4)
+        print(caja.v, caja.doble())
+''', "4 8\n"),
+}
+
+def run_program(code: str, mode: str) -> str:
+    _, ast, analyzer = run_front_end(code)
+    assert not analyzer.errors, analyzer.errors
+    output = io.StringIO()
+    program_io = ProgramIO(stream=output, policy=FLUSH_END, lines=[])
+    create_executor(ast.body, {}, mode=mode, io=program_io).run()
+    program_io.flush()
+    return output.getvalue()
+
+def check(name: str):
+    code, expected = PROGRAMAS[name]
+    outputs = {mode: run_program(code, mode) for mode in EXECUTION_MODES}
+    different = {mode: output for mode, output in outputs.items() if output != expected}
+    assert not different, f"{name}: esperado {expected!r}, distinto en {different}"
+
+def test_global_asignado_despues():
+    check("global_asignado_despues")
+
+def test_for_sobre_global():
+    check("for_sobre_global")
+
+def test_parametro_local():
+    check("parametro_local")
+
+def test_receptor_sin_self():
+    check("receptor_sin_self")
+
+if __name__ == "__main__":
+    failures = 0
+    for name in PROGRAMAS:
+        try:
+            check(name)
+            print(f"{name}: correcto")
+        except AssertionError as e:
+            failures += 1
+            print(e)
+    sys.exit(1 if failures else 0)
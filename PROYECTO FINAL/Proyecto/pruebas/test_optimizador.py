@@ -0,0 +1,156 @@
+# test_optimizador.py
+# Prueba de las reescrituras del optimizador: cada programa se ejecuta en
+# todos los modos con y sin optimize(); las salidas deben coincidir y los
+# contadores de stats deben ser los esperados. Se puede lanzar con pytest o
+# directamente como script.
+import io
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from compilador import EXECUTION_MODES, create_executor, run_front_end
+from entrada_salida import FLUSH_END, ProgramIO
+from nodos import BINOP, walk
+from optimizador import MAX_FOLDED_STRING, REWRITES, optimize
+
+# Nombre -> (programa, salida esperada o None si depende del modo, contadores
+# distintos de cero). Los operandos de and/or no tienen efectos: sin
+# optimizar se evalúan los dos
+PROGRAMAS = {
+    # and/or constantes devuelven uno de los operandos, como en Python
+    "and_or_constantes": ('''a = 3
+print(0 or "x")
+print(5 and 0)
+print(3 and 4)
+print("" or 7)
+print(True and "si", False or False)
+print(0 or a, a and 0, a or 1)
+''', 'x\n0\n4\n7\nsi False\n3 0 3\n', {"constantes_plegadas": 7, "cortocircuitos": 2}),
+    # Una rama siempre cierta pasa a ser el else y las siguientes se descartan
+    "rama_cierta_a_else": ('''x = 2
+if x > 5:
+    print("grande")
+elif True:
+    print("cierta")
+elif x > 0:
+    print("nunca")
+else:
+    print("tampoco")
+if False:
+    print("no")
+elif x == 2:
+    print("dos")
+if True:
+    print("siempre")
+else:
+    print("nunca")
+while False:
+    print("nunca")
+''', "cierta\ndos\nsiempre\n", {"ramas_eliminadas": 4}),
+    # Lo que sigue a un return no se ejecuta, tampoco tras un if True plegado
+    "inalcanzable_tras_return": ('''def f(n):
+    if n > 0:
+        return "positivo"
+        print("nunca")
+    return "otro"
+    print("nunca")
+    n = 5
+def g():
+    if True:
+        return "g"
+    print("nunca")
+print(f(1), f(0), g())
+''', "positivo otro g\n", {"ramas_eliminadas": 1, "sentencias_inalcanzables": 4}),
+    # Se pliega lo seguro; la repetición que supera MAX_FOLDED_STRING no
+    "repeticion_enorme": (f'''print(7 % 3, 2 * 3 + 1, 10 / 4, "ab" * 3)
+texto = "ab" * {MAX_FOLDED_STRING}
+print(texto == "ab" * {MAX_FOLDED_STRING})
+''', "1 7 2.5 ababab\nTrue\n", {"constantes_plegadas": 5}),
+    # División y módulo por cero fallan al ejecutar, nunca al optimizar; cada
+    # modo informa a su manera, así que solo se compara con y sin optimizar
+    "division_por_cero": ('''print("antes")
+print(1 / 0)
+''', None, {}),
+    "modulo_por_cero": ('''print("antes")
+print(5 % 0)
+''', None, {}),
+}
+
+def run_program(code: str, mode: str, optimized: bool):
+    """Salida del programa y contadores del optimizador (None sin optimizar)."""
+    _, ast, analyzer = run_front_end(code)
+    assert not analyzer.errors, analyzer.errors
+    statements, stats = ast.body, None
+    if optimized:
+        statements, stats = optimize(statements)
+    output = io.StringIO()
+    program_io = ProgramIO(stream=output, policy=FLUSH_END, lines=[])
+    create_executor(statements, {}, mode=mode, io=program_io).run()
+    program_io.flush()
+    return output.getvalue(), stats
+
+def check(name: str):
+    code, expected, counters = PROGRAMAS[name]
+    expected_stats = dict.fromkeys(REWRITES, 0)
+    expected_stats.update(counters)
+    for mode in EXECUTION_MODES:
+        plain, _ = run_program(code, mode, optimized=False)
+        output, stats = run_program(code, mode, optimized=True)
+        assert output == plain, f"{name} ({mode}): sin optimizar {plain!r}, optimizado {output!r}"
+        if expected is not None:
+            assert output == expected, f"{name} ({mode}): esperado {expected!r}, obtenido {output!r}"
+        assert stats == expected_stats, f"{name}: contadores {stats}, esperados {expected_stats}"
+
+def binop_count(code: str) -> int:
+    _, ast, _ = run_front_end(code)
+    statements, _ = optimize(ast.body)
+    return sum(1 for stmt in statements for node in walk(stmt) if node.kind == BINOP)
+
+def test_and_or_constantes():
+    check("and_or_constantes")
+
+def test_rama_cierta_a_else():
+    check("rama_cierta_a_else")
+
+def test_inalcanzable_tras_return():
+    check("inalcanzable_tras_return")
+
+def test_repeticion_enorme():
+    check("repeticion_enorme")
+    # Las dos repeticiones grandes y su comparación siguen sin plegar
+    assert binop_count(PROGRAMAS["repeticion_enorme"][0]) == 3
+
+def test_division_por_cero():
+    check("division_por_cero")
+    assert binop_count(PROGRAMAS["division_por_cero"][0]) == 1
+
+def test_modulo_por_cero():
+    check("modulo_por_cero")
+    assert binop_count(PROGRAMAS["modulo_por_cero"][0]) == 1
+
+def test_cortocircuito_optimizado():
+    # Optimizado, el operando derecho solo se evalúa si hace falta, como en Python
+    code = '''def avisa(v):
+    print("avisa", v)
+    return v
+a = 3
+print(0 and avisa(1))
+print(1 or avisa(2))
+print(a and avisa(4))
+print(a or avisa(5))
+'''
+    for mode in EXECUTION_MODES:
+        output, _ = run_program(code, mode, optimized=True)
+        assert output == "0\n1\navisa 4\n4\n3\n", f"cortocircuito ({mode}): {output!r}"
+
+if __name__ == "__main__":
+    failures = 0
+    for name in PROGRAMAS:
+        try:
+            check(name)
+            print(f"{name}: correcto")
+        except AssertionError as e:
+            failures += 1
+            print(e)
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,89 @@
+# test_perfilador.py
+# El perfilador no debe cambiar lo que hace el programa: cada programa se
+# ejecuta en modo tree con y sin perfilador y las salidas deben coincidir,
+# también en recursiones que con las envolturas del perfilador duplican la
+# pila de Python. Se puede lanzar con pytest o directamente como script.
+import io
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from compilador import create_executor, run_front_end
+from entrada_salida import FLUSH_END, PYTHON_RECURSION_ERROR, ProgramIO
+from perfilador import Profiler
+
+RECURSIVO = '''def prof(n):
+    if n == 0:
+        return 0
+    return prof(n - 1) + 1
+print(prof(PROFUNDIDAD))
+'''
+
+# Nombre -> programa
+PROGRAMAS = {
+    "recursion_100": RECURSIVO.replace("PROFUNDIDAD", "100"),
+    # Demasiado profunda también sin perfilador: el error debe ser el mismo
+    "recursion_excesiva": RECURSIVO.replace("PROFUNDIDAD", "5000"),
+    "clases_y_bucles": '''class Punto:
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+    def suma(self):
+        return self.x + self.y
+total = 0
+for i in range(50):
+    p = Punto(i, i * 2)
+    total = total + p.suma()
+print(total)
+i = 0
+while i < 3:
+    print("vuelta", i)
+    i = i + 1
+''',
+}
+
+def run_program(code: str, profiled: bool) -> str:
+    _, ast, analyzer = run_front_end(code)
+    assert not analyzer.errors, analyzer.errors
+    output = io.StringIO()
+    program_io = ProgramIO(stream=output, policy=FLUSH_END, lines=[])
+    executor = create_executor(ast.body, {}, mode="tree", io=program_io)
+    if profiled:
+        # Como en main(): el perfilador mide el intérprete sin bucles especializados
+        executor.specializer.detach()
+        Profiler(executor).run()
+    else:
+        executor.run()
+    program_io.flush()
+    return output.getvalue()
+
+def check(name: str):
+    code = PROGRAMAS[name]
+    limit = sys.getrecursionlimit()
+    expected = run_program(code, profiled=False)
+    output = run_program(code, profiled=True)
+    assert output == expected, f"{name}: sin perfilador {expected!r}, con perfilador {output!r}"
+    assert sys.getrecursionlimit() == limit, f"{name}: el perfilador no restauró el límite de recursión"
+
+def test_recursion_100():
+    check("recursion_100")
+    assert run_program(PROGRAMAS["recursion_100"], profiled=True) == "100\n"
+
+def test_recursion_excesiva():
+    check("recursion_excesiva")
+    assert PYTHON_RECURSION_ERROR in run_program(PROGRAMAS["recursion_excesiva"], profiled=True)
+
+def test_clases_y_bucles():
+    check("clases_y_bucles")
+
+if __name__ == "__main__":
+    failures = 0
+    for name in PROGRAMAS:
+        try:
+            check(name)
+            print(f"{name}: correcto")
+        except AssertionError as e:
+            failures += 1
+            print(e)
+    sys.exit(1 if failures else 0)
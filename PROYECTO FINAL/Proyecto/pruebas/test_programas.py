@@ -0,0 +1,105 @@
+# test_programas.py
+# Prueba de extremo a extremo con los programas de ejemplo del repositorio:
+# compilador.py debe dar, en cada modo, la misma salida que CPython con la
+# misma entrada. prueba.py usa construcciones que la gramática no admite:
+# solo native lo ejecuta (con CPython) y los demás modos lo rechazan.
+import io
+import os
+import subprocess
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from compilador import EXECUTION_MODES, create_executor, run_front_end
+from entrada_salida import FLUSH_END, ProgramIO
+
+PROYECTO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Entrada de prueba.py: nombre, sumar 7 y 5, contar, una opción inválida y salir
+ENTRADA_MENU = "Ana\n1\n7\n5\n2\n9\n3\n"
+
+def run(args, entrada=""):
+    result = subprocess.run([sys.executable] + args, input=entrada, capture_output=True,
+                            text=True, encoding="utf-8", cwd=PROYECTO, timeout=60)
+    return result.stdout
+
+def run_cpython(programa: str, entrada: str = "") -> str:
+    return run([programa], entrada)
+
+def run_compilador(programa: str, mode: str, entrada: str = "") -> str:
+    return run(["compilador.py", "--modo", mode, "--sin-cache", programa], entrada)
+
+def check_all_modes(programa: str, entrada: str = ""):
+    expected = run_cpython(programa, entrada)
+    assert expected
+    for mode in EXECUTION_MODES:
+        output = run_compilador(programa, mode, entrada)
+        assert output == expected, f"{programa} con --modo {mode}:\n{output}"
+
+def test_prueba_funciones_clases():
+    check_all_modes("prueba_funciones_clases.py")
+
+def test_prueba_native():
+    expected = run_cpython("prueba.py", ENTRADA_MENU)
+    assert "Suma: 12" in expected
+    assert run_compilador("prueba.py", "native", ENTRADA_MENU) == expected
+
+def test_prueba_otros_modos_la_rechazan():
+    for mode in EXECUTION_MODES:
+        if mode == "native":
+            continue
+        output = run_compilador("prueba.py", mode, ENTRADA_MENU)
+        assert output.startswith("❌ Error sintáctico"), f"--modo {mode}:\n{output}"
+        assert "PROGRAMA DE PRUEBA" not in output
+
+def check_code(code: str, expected: str):
+    _, ast, analyzer = run_front_end(code)
+    assert not analyzer.errors, analyzer.errors
+    for mode in EXECUTION_MODES:
+        output = io.StringIO()
+        program_io = ProgramIO(stream=output, policy=FLUSH_END, lines=[])
+        create_executor(ast.body, {}, mode=mode, io=program_io).run()
+        program_io.flush()
+        assert output.getvalue() == expected, f"--modo {mode}:\n{output.getvalue()}"
+
+def test_indentacion_cierra_los_bloques():
+    # Lo que sigue a una función, menos indentado, ya no es parte de su cuerpo
+    check_code('''def f(x):
+    if x > 1:
+        return x
+    return 0
+print(f(3), f(0))
+for i in range(2):
+    print("dentro", i)
+print("fuera")
+''', "3 0\ndentro 0\ndentro 1\nfuera\n")
+
+# Fuentes que la gramática anidaría distinto que Python: se rechazan
+RECHAZADOS = {
+    "indentacion_inesperada": "x = 1\n    y = 2\n",
+    "sin_bloque": "if x:\nprint(x)\n",
+    "desindentacion_desigual": "if True:\n        x = 1\n    y = 2\n",
+    "sentencia_en_clase": "class A:\n    x = 1\n    def f(self):\n        return 1\n",
+    "dos_sentencias_en_una_linea": "x = 1 y = 2\n",
+    "compuesta_en_la_misma_linea": "if True: if True: x = 1\n",
+}
+
+def test_rechazados():
+    for name, code in RECHAZADOS.items():
+        try:
+            run_front_end(code)
+        except SyntaxError:
+            continue
+        raise AssertionError(f"{name}: el front end lo aceptó")
+
+if __name__ == "__main__":
+    failures = 0
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            try:
+                test()
+                print(f"{name}: correcto")
+            except AssertionError as e:
+                failures += 1
+                print(f"{name}: {e}")
+    sys.exit(1 if failures else 0)
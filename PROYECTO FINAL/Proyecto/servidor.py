@@ -0,0 +1,440 @@
+# servidor.py
+# Servidor de compilación: un proceso de larga duración que escucha en un
+# socket Unix y compila y ejecuta programas sin pagar el arranque de
+# Python ni la importación del compilador en cada invocación. El
+# protocolo es JSON por líneas: cada petición lleva el código y,
+# opcionalmente, las líneas de entrada; la respuesta trae las mismas
+# secciones que reporte.txt (tokens, AST, tabla de símbolos, errores) más
+# la salida del programa. asyncio atiende las conexiones y el trabajo va a
+# procesos del pool, que se matan y se sustituyen si una petición se pasa
+# de tiempo.
+import asyncio
+import io
+import json
+import os
+import signal
+import socket
+import sys
+import tempfile
+import time
+from collections import deque
+from multiprocessing import Pipe, Process
+
+from compilador import EXECUTION_MODES, Lexer, Parser, SemanticAnalyzer, create_executor
+from entrada_salida import FLUSH_END, RUNTIME_ERROR, ProgramIO
+from nodos import to_data
+from optimizador import optimize
+
+SECTIONS = ("tokens", "ast", "simbolos", "errores", "salida")
+
+# Estados posibles de una petición en la respuesta
+STATUSES = ("correcto", "error_lexico", "error_sintactico", "error_semantico", "error_ejecucion",
+            "fallo_interno", "tiempo_agotado", "rechazada", "peticion_invalida")
+
+DEFAULT_TIMEOUT = 10.0          # Segundos por petición, incluida la espera por un proceso
+DEFAULT_MAX_PENDING = 64        # Peticiones en curso o en cola antes de rechazar nuevas
+MAX_REQUEST_BYTES = 16 * 2**20  # Longitud máxima de una línea de petición
+LATENCY_WINDOW = 1000           # Peticiones recientes que entran en los percentiles
+
+def default_socket_path() -> str:
+    return os.path.join(tempfile.gettempdir(), f"compilador-{os.getuid()}.sock")
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 3)
+
+# ------------------------
+# TRABAJO DE CADA PETICIÓN (en los procesos del pool)
+# ------------------------
+def process_program(request):
+    """Compila y, si no hay errores, ejecuta el programa de una petición ya validada.
+
+    Devuelve un dict listo para JSON con el estado, las secciones pedidas y
+    el tiempo de cada fase. Como check_file en lote.py, el estado dice en
+    qué fase se detuvo.
+    """
+    sections = request["secciones"]
+    result = {"estado": "correcto", "errores": []}
+    timings = result["tiempos_ms"] = {}
+    phase = "error_lexico"
+    try:
+        start = time.perf_counter()
+        tokens = Lexer(request["codigo"]).tokens
+        timings["lexico"] = _ms(time.perf_counter() - start)
+        if "tokens" in sections:
+            result["tokens"] = list(tokens)
+
+        phase = "error_sintactico"
+        start = time.perf_counter()
+        ast = Parser(tokens).parse()
+        timings["sintactico"] = _ms(time.perf_counter() - start)
+        if "ast" in sections:
+            result["ast"] = [to_data(statement) for statement in ast.body]
+
+        phase = "error_semantico"
+        start = time.perf_counter()
+        analyzer = SemanticAnalyzer(tokens)
+        analyzer.analyze(ast.body)
+        timings["semantico"] = _ms(time.perf_counter() - start)
+        if "simbolos" in sections:
+            result["simbolos"] = {
+                "globales": analyzer.global_scope,
+                "funciones": [{"funcion": function.name, "linea": function.line, "simbolos": scope}
+                              for function, scope in analyzer.local_scopes],
+            }
+        if analyzer.errors:
+            result["estado"] = "error_semantico"
+            result["errores"] = analyzer.errors
+            return result
+
+        if "salida" in sections:
+            phase = "fallo_interno"
+            start = time.perf_counter()
+            statements, _ = optimize(ast.body)
+            output = io.StringIO()
+            program_io = ProgramIO(stream=output, policy=FLUSH_END, lines=request["entrada"])
+            create_executor(statements, mode=request["modo"], io=program_io).run()
+            program_io.flush()
+            timings["ejecucion"] = _ms(time.perf_counter() - start)
+            result["salida"] = output.getvalue()
+            if RUNTIME_ERROR in result["salida"]:
+                result["estado"] = "error_ejecucion"
+    except SyntaxError as e:
+        # El Lexer y el Parser señalan sus errores con SyntaxError
+        result["estado"] = phase
+        result["errores"].append(str(e))
+    except Exception as e:
+        result["estado"] = "fallo_interno"
+        result["errores"].append(f"{type(e).__name__}: {e}")
+    return result
+
+def _worker_main(connection):
+    # Bucle de cada proceso: una petición por mensaje hasta que se cierra la
+    # tubería. Ctrl+C llega a todo el grupo de procesos: lo atiende el servidor
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    while True:
+        try:
+            request = connection.recv()
+        except EOFError:
+            return
+        connection.send(process_program(request))
+
+# ------------------------
+# POOL DE PROCESOS
+# ------------------------
+class Worker:
+    """Proceso del pool con su extremo de la tubería."""
+
+    def __init__(self):
+        self.connection, child = Pipe()
+        self.process = Process(target=_worker_main, args=(child,), daemon=True)
+        self.process.start()
+        child.close()
+
+    def kill(self):
+        self.process.kill()
+        self.process.join()
+        self.connection.close()
+
+class WorkerPool:
+    """Procesos que ya han importado el compilador, repartidos por una cola.
+
+    run() espera un proceso libre, le envía la petición y espera la
+    respuesta sin bloquear el bucle de eventos (add_reader sobre la
+    tubería). Si se cancela a medias (tiempo agotado) o el proceso muere,
+    ese proceso se mata y se sustituye por uno nuevo: es la única forma de
+    parar un programa que no termina.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self.idle = asyncio.Queue()
+        for _ in range(size):
+            self.idle.put_nowait(Worker())
+        self.restarts = 0
+
+    async def run(self, request, timings):
+        start = time.perf_counter()
+        worker = await self.idle.get()
+        timings["cola"] = _ms(time.perf_counter() - start)
+        loop = asyncio.get_running_loop()
+        reply = loop.create_future()
+        descriptor = worker.connection.fileno()
+
+        def readable():
+            loop.remove_reader(descriptor)
+            if reply.done():
+                return
+            try:
+                reply.set_result(worker.connection.recv())
+            except (EOFError, OSError) as e:
+                reply.set_exception(RuntimeError(f"el proceso de trabajo terminó inesperadamente ({e})"))
+
+        finished = False
+        try:
+            worker.connection.send(request)
+            loop.add_reader(descriptor, readable)
+            result = await reply
+            finished = True
+            return result
+        finally:
+            if finished:
+                self.idle.put_nowait(worker)
+            else:
+                loop.remove_reader(descriptor)
+                worker.kill()
+                self.restarts += 1
+                self.idle.put_nowait(Worker())
+
+    def close(self):
+        while not self.idle.empty():
+            self.idle.get_nowait().kill()
+
+# ------------------------
+# SERVIDOR
+# ------------------------
+class LatencyStats:
+    """Contadores por estado y latencias de las últimas peticiones."""
+
+    def __init__(self):
+        self.counts = dict.fromkeys(STATUSES, 0)
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.started = time.time()
+
+    def add(self, status: str, latency_ms: float):
+        self.counts[status] += 1
+        self.latencies.append(latency_ms)
+
+    def summary(self):
+        latencies = sorted(self.latencies)
+
+        def percentile(fraction):
+            return latencies[min(len(latencies) - 1, int(len(latencies) * fraction))] if latencies else 0.0
+
+        return {
+            "peticiones": sum(self.counts.values()),
+            "estados": self.counts,
+            "segundos_activo": round(time.time() - self.started, 1),
+            "latencia_ms": {"p50": percentile(0.5), "p90": percentile(0.9), "p99": percentile(0.99),
+                            "maximo": latencies[-1] if latencies else 0.0},
+        }
+
+class CompilerServer:
+    """Atiende peticiones JSON por líneas en un socket Unix.
+
+    Una petición es {"codigo": ..., "entrada": [...], "modo": ...,
+    "secciones": [...], "id": ...}; solo "codigo" es obligatorio. También
+    se aceptan {"comando": "ping"} y {"comando": "estadisticas"}. Cada
+    conexión puede enviar varias peticiones seguidas: se atienden a la vez
+    y cada respuesta repite el "id" de su petición.
+    """
+
+    def __init__(self, path: str, workers: int = None, timeout: float = DEFAULT_TIMEOUT,
+                 max_pending: int = DEFAULT_MAX_PENDING):
+        self.path = path
+        self.workers = workers or os.cpu_count() or 1
+        self.timeout = timeout
+        self.max_pending = max_pending
+        self.pending = 0
+        self.stats = LatencyStats()
+        self.pool = None
+
+    async def serve(self, ready=None):
+        """Atiende peticiones hasta recibir SIGINT o SIGTERM."""
+        if os.path.exists(self.path):
+            try:
+                send_request(self.path, {"comando": "ping"}, timeout=1.0)
+            except OSError:
+                os.unlink(self.path)  # socket de una ejecución anterior que no se cerró bien
+            else:
+                raise RuntimeError(f"ya hay un servidor escuchando en {self.path}")
+        self.pool = WorkerPool(self.workers)
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for signal_number in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signal_number, stop.set)
+        try:
+            server = await asyncio.start_unix_server(self.handle_connection, path=self.path,
+                                                     limit=MAX_REQUEST_BYTES)
+            if ready is not None:
+                ready()
+            async with server:
+                await stop.wait()
+        finally:
+            self.pool.close()
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+
+    async def handle_connection(self, reader, writer):
+        tasks = set()
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ValueError, asyncio.LimitOverrunError):
+                    await self.send(writer, self.error("peticion_invalida",
+                                                       f"petición de más de {MAX_REQUEST_BYTES} bytes"))
+                    break
+                if not line:
+                    break
+                task = asyncio.create_task(self.respond(line, writer))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def respond(self, line, writer):
+        await self.send(writer, await self.handle(line))
+
+    @staticmethod
+    async def send(writer, response):
+        # default=str: la tabla de símbolos puede guardar valores que JSON no conoce
+        writer.write(json.dumps(response, ensure_ascii=False, default=str).encode("utf-8") + b"\n")
+        await writer.drain()
+
+    @staticmethod
+    def error(status: str, message: str, request_id=None):
+        return {"id": request_id, "estado": status, "errores": [message]}
+
+    async def handle(self, line):
+        start = time.perf_counter()
+        try:
+            request = json.loads(line)
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            response = self.error("peticion_invalida", f"JSON inválido: {e}")
+        else:
+            response = await self.dispatch(request) if isinstance(request, dict) else \
+                self.error("peticion_invalida", "la petición debe ser un objeto JSON")
+        if "comando" not in response:
+            total = _ms(time.perf_counter() - start)
+            response.setdefault("latencia_ms", {})["total"] = total
+            self.stats.add(response["estado"], total)
+        return response
+
+    async def dispatch(self, request):
+        request_id = request.get("id")
+        command = request.get("comando")
+        if command == "ping":
+            return {"id": request_id, "comando": command, "respuesta": "pong"}
+        if command == "estadisticas":
+            summary = self.stats.summary()
+            summary.update(procesos=self.workers, reinicios=self.pool.restarts, en_curso=self.pending)
+            return {"id": request_id, "comando": command, "estadisticas": summary}
+        if command is not None:
+            return self.error("peticion_invalida", f"comando desconocido: {command}", request_id)
+
+        try:
+            job = self.validate(request)
+        except ValueError as e:
+            return self.error("peticion_invalida", str(e), request_id)
+        if self.pending >= self.max_pending:
+            return self.error("rechazada", f"servidor ocupado ({self.pending} peticiones en curso)", request_id)
+
+        timings = {}
+        self.pending += 1
+        try:
+            result = await asyncio.wait_for(self.pool.run(job, timings), self.timeout)
+        except asyncio.TimeoutError:
+            result = self.error("tiempo_agotado", f"la petición superó {self.timeout} s")
+        except (RuntimeError, OSError) as e:
+            result = self.error("fallo_interno", str(e))
+        finally:
+            self.pending -= 1
+        result["id"] = request_id
+        result["latencia_ms"] = timings
+        return result
+
+    @staticmethod
+    def validate(request):
+        """La petición con sus valores por defecto; ValueError si algo no es válido."""
+        code = request.get("codigo")
+        if not isinstance(code, str):
+            raise ValueError("falta 'codigo' (texto del programa)")
+        inputs = request.get("entrada", [])
+        if isinstance(inputs, str):
+            inputs = inputs.splitlines()
+        if not isinstance(inputs, list):
+            raise ValueError("'entrada' debe ser una lista de líneas o un texto")
+        mode = request.get("modo", "native")
+        if not isinstance(mode, str) or mode not in EXECUTION_MODES:
+            raise ValueError(f"modo desconocido: {mode}")
+        sections = request.get("secciones", SECTIONS)
+        if not isinstance(sections, (list, tuple)) or not all(isinstance(section, str) for section in sections):
+            raise ValueError("'secciones' debe ser una lista de nombres de sección")
+        unknown = [section for section in sections if section not in SECTIONS]
+        if unknown:
+            raise ValueError(f"secciones desconocidas: {', '.join(map(str, unknown))}")
+        return {"codigo": code, "entrada": [str(item) for item in inputs], "modo": mode,
+                "secciones": list(sections)}
+
+# ------------------------
+# CLIENTE
+# ------------------------
+def send_request(path: str, request, timeout: float = None):
+    """Envía una petición al servidor de path y devuelve su respuesta."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.settimeout(timeout)
+        client.connect(path)
+        client.sendall(json.dumps(request, ensure_ascii=False).encode("utf-8") + b"\n")
+        client.shutdown(socket.SHUT_WR)
+        with client.makefile("rb") as replies:
+            return json.loads(replies.readline())
+
+def main():
+    import argparse
+
+    arg_parser = argparse.ArgumentParser(description="Servidor de compilación sobre un socket Unix")
+    arg_parser.add_argument("--socket", default=default_socket_path(),
+                            help=f"ruta del socket (por defecto: {default_socket_path()})")
+    commands = arg_parser.add_subparsers(dest="orden", required=True)
+
+    start = commands.add_parser("iniciar", help="arranca el servidor")
+    start.add_argument("-j", "--procesos", type=int, default=None,
+                       help="procesos del pool (por defecto: uno por núcleo)")
+    start.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT,
+                       help=f"segundos por petición (por defecto: {DEFAULT_TIMEOUT})")
+    start.add_argument("--max-pendientes", type=int, default=DEFAULT_MAX_PENDING,
+                       help=f"peticiones en curso antes de rechazar (por defecto: {DEFAULT_MAX_PENDING})")
+
+    send = commands.add_parser("enviar", help="envía un archivo .py al servidor e imprime la respuesta")
+    send.add_argument("archivo")
+    send.add_argument("--entrada", metavar="ARCHIVO", help="líneas para input()")
+    send.add_argument("--modo", choices=sorted(EXECUTION_MODES), default="native")
+    send.add_argument("--secciones", nargs="+", choices=SECTIONS, default=list(SECTIONS))
+
+    commands.add_parser("estadisticas", help="muestra los contadores y latencias del servidor")
+    args = arg_parser.parse_args()
+
+    if args.orden == "iniciar":
+        if args.timeout <= 0 or args.max_pendientes < 1:
+            arg_parser.error("--timeout y --max-pendientes deben ser positivos")
+        server = CompilerServer(args.socket, args.procesos, args.timeout, args.max_pendientes)
+        ready = lambda: print(f"Escuchando en {args.socket} con {server.workers} procesos", file=sys.stderr)
+        try:
+            asyncio.run(server.serve(ready))
+        except RuntimeError as e:
+            print(f"❌ {e}")
+            sys.exit(2)
+        return
+
+    try:
+        if args.orden == "estadisticas":
+            response = send_request(args.socket, {"comando": "estadisticas"})
+        else:
+            with open(args.archivo, "r", encoding="utf-8") as file:
+                request = {"codigo": file.read(), "modo": args.modo, "secciones": args.secciones}
+            if args.entrada:
+                with open(args.entrada, "r", encoding="utf-8") as file:
+                    request["entrada"] = file.read().splitlines()
+            response = send_request(args.socket, request)
+    except OSError as e:
+        print(f"❌ No se pudo contactar con el servidor: {e}")
+        sys.exit(2)
+    print(json.dumps(response, ensure_ascii=False, indent=2))
+    sys.exit(0 if response.get("estado", "correcto") == "correcto" else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,581 @@
+# tipos.py
+# Inferencia de tipos estática sobre el programa ya resuelto por
+# SemanticAnalyzer. Calcula el tipo de cada variable (por slot), de los
+# parámetros y valores devueltos de cada función y de los atributos de las
+# instancias de cada clase, anota cada BinOp con los tipos de sus operandos
+# para que el Executor elija la operación especializada, y señala como
+# errores las operaciones cuyos operandos nunca son compatibles.
+#
+# Un tipo es un frozenset con los tipos posibles: tipos de Python para los
+# valores predefinidos y el nombre de la clase (str) para sus instancias.
+# None significa "cualquiera". El análisis no sigue el orden del programa
+# salvo para saber si una variable puede leerse antes de asignarse: en los
+# modos interpretados esa lectura da el texto "[Variable x no definida]",
+# así que su tipo incluye str. Un nombre que el programa no define nunca
+# ya es un error de SemanticAnalyzer: su tipo es "cualquiera", para no
+# añadir un segundo error por el texto.
+from instancias import Instance
+from nodos import (VAR, CONST, BINOP, ATTR, CALL, METHOD_CALL, LOGICAL, ASSIGN, ATTR_ASSIGN, IF, WHILE,
+                   FOR, RETURN, PRINT, INPUT, FUNC_DEF, CLASS_DEF, walk)
+
+# ------------------------
+# ÁLGEBRA DE TIPOS
+# ------------------------
+INT = frozenset((int,))
+INTS = frozenset((int, bool))
+NUMBERS = frozenset((int, float, bool))
+FLOAT = frozenset((float,))
+BOOL = frozenset((bool,))
+STR = frozenset((str,))
+NONE = frozenset((type(None),))
+RANGE = frozenset((range,))
+NOTHING = frozenset()  # todavía sin ningún valor
+MAX_UNION = 3          # uniones más grandes pasan a "cualquiera"
+ORDERING = ('<', '>', '<=', '>=')
+
+def join(left, right):
+    if left is None or right is None:
+        return None
+    union = left | right
+    return union if len(union) <= MAX_UNION else None
+
+# Un solo frozenset por tipo para los literales
+_LITERAL_TYPES = {int: INT, float: FLOAT, bool: BOOL, str: STR, type(None): NONE}
+
+def type_of(value):
+    value_type = _LITERAL_TYPES.get(type(value))
+    if value_type is not None:
+        return value_type
+    if type(value) is Instance:
+        return frozenset((value.class_name,))
+    return frozenset((type(value),))
+
+def pair_type(op, left, right):
+    """Tipo de left op right para dos tipos concretos; None si no se sabe o puede fallar."""
+    if op in ORDERING:
+        if (left in NUMBERS and right in NUMBERS) or (left is str and right is str):
+            return bool
+        return None
+    if left in NUMBERS and right in NUMBERS:
+        return float if float in (left, right) else int
+    if left is str:
+        if (op == '+' and right is str) or (op == '*' and right in INTS) or op == '%':
+            return str
+    elif right is str and op == '*' and left in INTS:
+        return str
+    return None
+
+def binop_type(op, left, right):
+    if op in ('==', '!='):
+        return BOOL
+    if left is None or right is None:
+        return None
+    if op in ('and', 'or'):
+        return join(left, right)
+    if op == '/':
+        # Cero como divisor da "indefinida"
+        return frozenset((float, str)) if left <= NUMBERS and right <= NUMBERS else None
+    result = set()
+    for left_type in left:
+        for right_type in right:
+            pair = pair_type(op, left_type, right_type)
+            if pair is None:
+                return None
+            result.add(pair)
+    return frozenset(result)
+
+def binop_may_raise(op, left, right, right_node):
+    """Si la operación en sí puede lanzar una excepción (sin contar sus operandos)."""
+    if op in ('==', '!=', 'and', 'or'):
+        return False
+    if left is None or right is None:
+        return True
+    if op in ORDERING:
+        return binop_type(op, left, right) is None
+    if op in ('+', '-', '*'):
+        # Mezclar enteros enormes con float puede desbordar
+        if (left <= INTS and right <= INTS) or (left <= FLOAT and right <= FLOAT):
+            return False
+        return not (op == '+' and left == STR and right == STR)
+    if op == '%':
+        return not (left <= INTS and right <= INTS and right_node.kind == CONST and right_node.value != 0)
+    return True
+
+def binop_conflict(op, left, right) -> bool:
+    """Si la operación falla con cualquier par de valores de esos tipos."""
+    if op in ('==', '!=', 'and', 'or') or not left or not right:
+        return False
+    if op == '/':
+        # Con un divisor que puede ser cero el resultado es "indefinida", no un error
+        return not right & NUMBERS
+    return all(pair_type(op, left_type, right_type) is None for left_type in left for right_type in right)
+
+def element_type(iterable):
+    if iterable == RANGE:
+        return INT
+    if iterable == STR:
+        return STR
+    return None
+
+def nonzero_constant(node) -> bool:
+    return node.kind == CONST and type(node.value) in NUMBERS and node.value != 0
+
+def format_type(value_type) -> str:
+    if not value_type:
+        return "unknown"
+    names = sorted("None" if member is type(None) else member if isinstance(member, str) else member.__name__
+                   for member in value_type)
+    return " | ".join(names)
+
+# ------------------------
+# INFERENCIA
+# ------------------------
+BUILTIN_CALLS = ("print", "input", "int", "range")
+
+class TypeInference:
+    """Punto fijo de tipos sobre todo el programa.
+
+    Cada vuelta recorre el programa y los cuerpos de todas las funciones y
+    une a los resúmenes (slots globales, slots locales de cada función,
+    valor devuelto de cada función, atributos de cada clase) los tipos que
+    encuentra; termina cuando una vuelta no cambia ninguno. Las uniones solo
+    crecen y pasan a "cualquiera" a partir de MAX_UNION tipos, así que el
+    número de vueltas está acotado. Cada vuelta anota los BinOp y comprueba
+    los conflictos de nuevo: los de la última, que ya no cambió nada, son
+    los definitivos.
+    """
+
+    def __init__(self, analyzer):
+        self.analyzer = analyzer
+        self.global_types = [NOTHING] * len(analyzer.global_names)
+        self.local_types = {}    # id(FunctionDef) -> tipo de cada slot local
+        self.returns = {}        # id(FunctionDef) -> tipo devuelto
+        self.attributes = {}     # (clase, atributo) -> tipo
+        self.functions = {}      # nombre -> FunctionDef con ese nombre
+        self.classes = {}        # nombre -> {método: FunctionDef}, con los heredados
+        self.owners = {}         # id(FunctionDef) de un método -> clases que lo usan
+        self.initialized = {}    # clase -> atributos que __init__ siempre asigna
+        self.bodies = []         # FunctionDef de todas las funciones y métodos
+        self.maybe_undefined = set()  # id de los nodos que pueden leer una variable sin asignar
+        self.errors = []
+        self.changed = False
+        self.binop_results = {}  # (op, izquierda, derecha) -> (tipo, conflicto)
+
+    def run(self, statements, predefined=()):
+        statements = [stmt for stmt in statements if stmt is not None]
+        self.collect(statements)
+        defined = set()
+        for name in predefined:
+            slot = self.analyzer.global_slot(name)
+            defined.add(slot)
+            # Sin valores (solo los nombres) una predefinida puede ser cualquier cosa
+            self.global_types[~slot] = type_of(predefined[name].get("value")) if isinstance(predefined, dict) else None
+        self.find_undefined_reads(statements, frozenset(defined))
+
+        while True:
+            self.changed = False
+            self.errors = []
+            self.infer_all(statements)
+            if not self.changed:
+                break
+        self.annotate_symbols()
+        return self.errors
+
+    def annotate_symbols(self):
+        # Los tipos inferidos sustituyen al "unknown" de la tabla de símbolos
+        analyzer = self.analyzer
+        names = {}
+
+        def name_of(value_type):
+            name = names.get(value_type)
+            if name is None:
+                name = names[value_type] = format_type(value_type)
+            return name
+
+        for index, name in enumerate(analyzer.global_names):
+            info = analyzer.global_scope[name]
+            if info["kind"] == "var":
+                info["type"] = name_of(self.global_types[index])
+            elif info["kind"] == "function":
+                for function in self.functions.get(name, ()):
+                    info["returns"] = name_of(self.returns[id(function)])
+        for function, scope in analyzer.local_scopes:
+            for info in scope.values():
+                info["type"] = name_of(self.local_types[id(function)][info["slot"]])
+
+    def infer_all(self, statements):
+        self.block(statements, None)
+        for function in self.bodies:
+            self.block(function.body, function)
+            if not _always_returns(function.body):
+                self.merge_return(function, NONE)
+
+    # --- Funciones y clases del programa ---
+    def collect(self, statements):
+        class_defs = {}
+        for node in _definitions(statements):
+            if node.kind == FUNC_DEF:
+                self.bodies.append(node)
+                self.local_types[id(node)] = [NOTHING] * len(node.frame)
+                self.returns[id(node)] = NOTHING
+            else:
+                class_defs[node.name] = node
+        methods = {id(method) for node in class_defs.values() for method in node.methods}
+        for function in self.bodies:
+            if id(function) not in methods:
+                self.functions.setdefault(function.name, []).append(function)
+
+        def methods_of(name, seen):
+            node = class_defs.get(name)
+            if node is None or name in seen:
+                return {}
+            resolved = dict(methods_of(node.base, seen | {name})) if node.base is not None else {}
+            resolved.update((method.name, method) for method in node.methods)
+            return resolved
+
+        self.implementations = {}  # nombre de método -> FunctionDef que pueden responder
+        for name in class_defs:
+            self.classes[name] = methods_of(name, frozenset())
+            for method_name, method in self.classes[name].items():
+                self.owners[id(method)] = self.owners.get(id(method), frozenset()) | {name}
+                self.implementations.setdefault(method_name, {})[id(method)] = method
+            init = self.classes[name].get("__init__")
+            self.initialized[name] = _initialized_attributes(init) if init is not None else frozenset()
+
+    # --- Lecturas antes de asignar ---
+    def find_undefined_reads(self, statements, predefined):
+        self.at_calls = None     # globales asignadas en todos los puntos que llaman a una función
+        self.short_calls = set() # funciones a las que alguna llamada deja parámetros sin valor
+        self.param_reads = {}    # id(FunctionDef) -> lecturas de un parámetro antes de reasignarlo
+        self.assigned_block(statements, set(predefined), None)
+        at_calls = predefined if self.at_calls is None else self.at_calls
+
+        methods = self.owners
+        for function in self.bodies:
+            defined = set(at_calls)
+            if id(function) not in methods:
+                # Se está ejecutando porque alguien la llamó por su nombre
+                defined.add(function.name)
+            self.assigned_block(function.body, defined, function)
+        for function in self.short_calls:
+            self.maybe_undefined.update(self.param_reads.get(function, ()))
+
+    def assigned_block(self, body, defined, function):
+        """Recorre un bloque añadiendo a defined (que modifica) lo que asigna seguro.
+
+        Devuelve defined, o None si el bloque siempre termina en return.
+        """
+        for stmt in body:
+            if not self.assigned_stmt(stmt, defined, function):
+                return None
+        return defined
+
+    def assigned_stmt(self, node, defined, function) -> bool:
+        # False si después de la sentencia no se sigue ejecutando el bloque
+        kind = node.kind
+        if kind == ASSIGN:
+            self.check_reads(node.value, defined, function)
+            defined.add(node.slot)
+        elif kind == ATTR_ASSIGN:
+            self.check_reads(node.value, defined, function)
+            self.check_slot(node, defined, function)
+        elif kind == IF:
+            self.check_reads(node.condition, defined, function)
+            branches = [self.assigned_block(node.body, set(defined), function)]
+            for condition, body in node.elifs:
+                self.check_reads(condition, defined, function)
+                branches.append(self.assigned_block(body, set(defined), function))
+            branches.append(self.assigned_block(node.orelse, set(defined), function))
+            branches = [branch for branch in branches if branch is not None]
+            if not branches:
+                return False
+            defined.update(set.intersection(*branches))
+        elif kind == WHILE:
+            # El cuerpo puede no ejecutarse: lo que asigna no cuenta después
+            self.check_reads(node.condition, defined, function)
+            self.assigned_block(node.body, set(defined), function)
+        elif kind == FOR:
+            self.check_reads(node.iterable, defined, function)
+            self.assigned_block(node.body, defined | {node.slot}, function)
+        elif kind == RETURN:
+            self.check_reads(node.value, defined, function)
+            return False
+        elif kind == FUNC_DEF or kind == CLASS_DEF:
+            # El nombre (str) marca que la función o clase ya se puede llamar:
+            # el Executor no las olvida aunque luego se reasigne la variable
+            defined.add(node.slot)
+            defined.add(node.name)
+        elif kind == PRINT or kind == INPUT:
+            for arg in node.args:
+                self.check_reads(arg, defined, function)
+        else:
+            self.check_reads(node, defined, function)
+        return True
+
+    def check_reads(self, node, defined, function):
+        if node is None:
+            return
+        kind = node.kind
+        if kind == VAR or kind == ATTR:
+            self.check_slot(node, defined, function)
+        elif kind == BINOP or kind == LOGICAL:
+            self.check_reads(node.left, defined, function)
+            self.check_reads(node.right, defined, function)
+        elif kind == CALL or kind == METHOD_CALL or kind == INPUT:
+            for arg in node.args:
+                self.check_reads(arg, defined, function)
+            if kind == INPUT or (kind == CALL and node.func in BUILTIN_CALLS):
+                return
+            given = len(node.args)
+            if kind == METHOD_CALL:
+                self.check_slot(node, defined, function)
+                targets = self.implementations.get(node.method, {}).values()
+                given += 1
+            elif node.func in self.functions:
+                targets = self.functions[node.func]
+            else:
+                init = self.classes.get(node.func, {}).get("__init__")
+                targets = () if init is None else (init,)
+                given += 1
+            for target in targets:
+                if given < len(target.params):
+                    self.short_calls.add(id(target))
+            if kind == CALL and node.func not in defined:
+                # Llamar a una función o clase todavía sin definir da None
+                self.maybe_undefined.add(id(node))
+            if function is None:
+                self.at_calls = set(defined) if self.at_calls is None else self.at_calls & defined
+
+    def check_slot(self, node, defined, function):
+        slot = node.slot
+        if slot in defined:
+            return
+        if function is not None and 0 <= slot < len(function.params):
+            # Solo queda sin valor si alguna llamada pasa menos argumentos
+            self.param_reads.setdefault(id(function), []).append(id(node))
+        else:
+            self.maybe_undefined.add(id(node))
+
+    # --- Resúmenes ---
+    def read(self, node, function):
+        slot = node.slot
+        if slot in self.analyzer.undefined_slots:
+            return None
+        value_type = self.global_types[~slot] if slot < 0 else self.local_types[id(function)][slot]
+        if id(node) in self.maybe_undefined:
+            value_type = join(value_type, STR)
+        return value_type
+
+    def store(self, slot, value_type, function):
+        types = self.global_types if slot < 0 else self.local_types[id(function)]
+        index = ~slot if slot < 0 else slot
+        merged = join(types[index], value_type)
+        if merged != types[index]:
+            types[index] = merged
+            self.changed = True
+
+    def merge_return(self, function, value_type):
+        merged = join(self.returns[id(function)], value_type)
+        if merged != self.returns[id(function)]:
+            self.returns[id(function)] = merged
+            self.changed = True
+
+    def merge_attribute(self, key, value_type):
+        current = self.attributes.get(key, NOTHING)
+        merged = join(current, value_type)
+        if merged != current:
+            self.attributes[key] = merged
+            self.changed = True
+
+    def call(self, function, arg_types):
+        # Une los argumentos a los parámetros; devuelve el tipo del resultado.
+        # self, el primer parámetro de un método, ya tiene su tipo: las clases que lo usan
+        method = id(function) in self.owners
+        if method and function.params:
+            self.store(0, self.owners[id(function)], function)
+        for index, value_type in enumerate(arg_types[:max(len(function.params) - method, 0)], method):
+            self.store(index, value_type, function)
+        return self.returns[id(function)]
+
+    # --- Sentencias ---
+    def block(self, body, function):
+        for stmt in body:
+            self.stmt(stmt, function)
+
+    def stmt(self, node, function):
+        kind = node.kind
+        if kind == ASSIGN:
+            self.store(node.slot, self.expr(node.value, function), function)
+        elif kind == ATTR_ASSIGN:
+            value_type = self.expr(node.value, function)
+            receiver = self.read(node, function)
+            for cls in (self.classes if receiver is None else receiver):
+                if isinstance(cls, str):
+                    self.merge_attribute((cls, node.attr), value_type)
+        elif kind == IF:
+            self.expr(node.condition, function)
+            self.block(node.body, function)
+            for condition, body in node.elifs:
+                self.expr(condition, function)
+                self.block(body, function)
+            self.block(node.orelse, function)
+        elif kind == WHILE:
+            self.expr(node.condition, function)
+            self.block(node.body, function)
+        elif kind == FOR:
+            self.store(node.slot, element_type(self.expr(node.iterable, function)), function)
+            self.block(node.body, function)
+        elif kind == RETURN:
+            value_type = self.expr(node.value, function) if node.value is not None else NONE
+            if function is not None:
+                self.merge_return(function, value_type)
+        elif kind == FUNC_DEF or kind == CLASS_DEF:
+            # Leer el nombre de una función o clase da None
+            self.store(node.slot, NONE, function)
+        elif kind == PRINT or kind == INPUT:
+            for arg in node.args:
+                self.expr(arg, function)
+        else:
+            self.expr(node, function)
+
+    # --- Expresiones ---
+    def expr(self, node, function):
+        kind = node.kind
+        if kind == VAR:
+            return self.read(node, function)
+        if kind == CONST:
+            return type_of(node.value)
+        if kind == BINOP or kind == LOGICAL:
+            left = self.expr(node.left, function)
+            right = self.expr(node.right, function)
+            if kind == LOGICAL:
+                return join(left, right)
+            op = node.op
+            node.operand_types = (left, right)
+            key = (op, left, right)
+            result = self.binop_results.get(key)
+            if result is None:
+                # Se repiten mucho: cada combinación se calcula una vez
+                result = self.binop_results[key] = (binop_type(op, left, right), binop_conflict(op, left, right))
+            if result[1]:
+                self.errors.append(f"Ln {node.line}: Tipos incompatibles en '{op}': "
+                                   f"{format_type(left)} y {format_type(right)}")
+            if op == '/' and nonzero_constant(node.right) and left is not None and left <= NUMBERS:
+                return FLOAT
+            return result[0]
+        if kind == ATTR:
+            receiver = self.read(node, function)
+            if receiver is None:
+                return None
+            result = NOTHING
+            for cls in receiver:
+                if not isinstance(cls, str):
+                    result = join(result, NONE)
+                    continue
+                if cls not in self.classes:
+                    # Instancia predefinida de una clase que este programa no define
+                    return None
+                result = join(result, self.attributes.get((cls, node.attr), NOTHING))
+                if node.attr not in self.initialized[cls]:
+                    # Leído antes de asignarse, un atributo vale None
+                    result = join(result, NONE)
+            return result
+        if kind == INPUT:
+            for arg in node.args:
+                self.expr(arg, function)
+            return STR
+        if kind == CALL:
+            return self.expr_call(node, function)
+        if kind == METHOD_CALL:
+            return self.expr_method_call(node, function)
+        return None
+
+    def expr_call(self, node, function):
+        arg_types = [self.expr(arg, function) for arg in node.args]
+        name = node.func
+        if name == "print":
+            return NONE
+        if name == "input":
+            return STR
+        if name == "int":
+            return INT
+        if name == "range":
+            return RANGE if 1 <= len(arg_types) <= 3 else NONE
+        result = NONE if id(node) in self.maybe_undefined else NOTHING
+        if name in self.functions:
+            for function in self.functions[name]:
+                result = join(result, self.call(function, arg_types))
+            return result
+        methods = self.classes.get(name)
+        if methods is not None:
+            init = methods.get("__init__")
+            if init is not None:
+                self.call(init, arg_types)
+            return join(result, frozenset((name,)))
+        return NONE
+
+    def expr_method_call(self, node, function):
+        arg_types = [self.expr(arg, function) for arg in node.args]
+        receiver = self.read(node, function)
+        if receiver is None:
+            # Cualquier clase con ese método puede recibir la llamada
+            for methods in self.classes.values():
+                method = methods.get(node.method)
+                if method is not None:
+                    self.call(method, arg_types)
+            return None
+        result = NOTHING
+        for cls in receiver:
+            if isinstance(cls, str) and cls not in self.classes:
+                return None
+            method = self.classes[cls].get(node.method) if isinstance(cls, str) else None
+            result = join(result, NONE if method is None else self.call(method, arg_types))
+        return result
+
+# ------------------------
+# AUXILIARES
+# ------------------------
+def _definitions(body):
+    """FunctionDef y ClassDef de un bloque, también las anidadas."""
+    for stmt in body:
+        if stmt is None:
+            continue
+        kind = stmt.kind
+        if kind == FUNC_DEF:
+            yield stmt
+            yield from _definitions(stmt.body)
+        elif kind == CLASS_DEF:
+            yield stmt
+            yield from _definitions(stmt.methods)
+        elif kind == IF:
+            yield from _definitions(stmt.body)
+            for _, elif_body in stmt.elifs:
+                yield from _definitions(elif_body)
+            yield from _definitions(stmt.orelse)
+        elif kind == WHILE or kind == FOR:
+            yield from _definitions(stmt.body)
+
+def _always_returns(body) -> bool:
+    for stmt in body:
+        if stmt.kind == RETURN:
+            return True
+        if stmt.kind == IF and stmt.orelse and _always_returns(stmt.body) and \
+                all(_always_returns(elif_body) for _, elif_body in stmt.elifs) and _always_returns(stmt.orelse):
+            return True
+    return False
+
+def _initialized_attributes(init) -> frozenset:
+    """Atributos que __init__ asigna a self antes de hacer cualquier otra cosa.
+
+    Solo cuenta el tramo inicial de asignaciones self.x = valor cuyo valor
+    no llama a nada ni lee atributos: hasta ahí nadie puede ver la
+    instancia sin esos atributos.
+    """
+    names = set()
+    for stmt in init.body:
+        if stmt.kind != ATTR_ASSIGN or stmt.slot != 0:
+            break
+        if any(node.kind in (ATTR, CALL, METHOD_CALL, INPUT) for node in walk(stmt.value)):
+            break
+        names.add(stmt.attr)
+    return frozenset(names)
@@ -0,0 +1,271 @@
+# vectores.py
+# Ejecución de un programa contra muchos vectores de prueba: cada vector
+# es una secuencia de líneas para input() y, opcionalmente, la salida
+# esperada. El programa pasa una sola vez por Lexer, Parser,
+# SemanticAnalyzer y el optimizador; los procesos del pool reciben el AST
+# ya analizado y ejecutan sus vectores con la entrada y la salida en
+# memoria (entrada_salida.ProgramIO). El informe es JSON Lines, como el
+# de lote.py: una línea de resumen y después una por vector.
+import difflib
+import io
+import json
+import os
+import sys
+import time
+from multiprocessing import Pool
+
+from compilador import create_executor, run_front_end
+from entrada_salida import FLUSH_END, RUNTIME_ERROR, ProgramIO
+from nodos import from_data, to_data
+from optimizador import optimize
+
+# Estados posibles de un vector en el informe
+STATUSES = ("correcto", "salida_distinta", "error_ejecucion", "sin_esperado", "fallo_interno")
+
+MAX_DIFF_LINES = 40  # Líneas del diff que se guardan por vector
+
+def load_vectors(path: str):
+    """Vectores de un archivo JSON Lines.
+
+    Cada línea es un objeto con "entrada" (lista de líneas o texto con
+    saltos de línea) y, si se quiere comparar, "esperado" (la salida
+    completa). "nombre" es opcional; por defecto es el número de línea.
+    """
+    vectors = []
+    with open(path, "r", encoding="utf-8") as file:
+        for number, line in enumerate(file, 1):
+            if not line.strip():
+                continue
+            try:
+                data = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{path}:{number}: JSON inválido: {e}") from None
+            inputs = data.get("entrada", [])
+            if isinstance(inputs, str):
+                inputs = inputs.splitlines()
+            if not isinstance(inputs, list):
+                raise ValueError(f"{path}:{number}: 'entrada' debe ser una lista o un texto")
+            vectors.append({"nombre": str(data.get("nombre", number)),
+                            "entrada": [str(item) for item in inputs],
+                            "esperado": data.get("esperado")})
+    return vectors
+
+# ------------------------
+# PROCESOS DEL POOL
+# ------------------------
+# Estado de cada proceso, preparado una vez por _init_worker
+_worker = {}
+
+def _init_worker(program_data, mode):
+    """Reconstruye el programa en el proceso; los vectores solo llevan su entrada."""
+    statements = [from_data(data) for data in program_data]
+    _worker["new_executor"] = _executor_factory(statements, mode)
+
+def _executor_factory(statements, mode):
+    """Función io -> ejecutor listo para run(), con lo reutilizable ya preparado.
+
+    native compila el programa una vez y cada run() usa un espacio de
+    nombres nuevo, así que basta cambiar su io; vm reutiliza el bytecode.
+    tree y closures guardan estado de la ejecución y se crean cada vez.
+    """
+    if mode == "native":
+        executor = create_executor(statements, mode=mode)
+
+        def reuse_native(program_io):
+            executor.io = program_io
+            return executor
+        return reuse_native
+    if mode == "vm":
+        from maquina_virtual import BytecodeCompiler, VirtualMachine
+        code = BytecodeCompiler().compile_program(statements)
+        return lambda program_io: VirtualMachine(code, {}, io=program_io)
+    return lambda program_io: create_executor(statements, {}, mode=mode, io=program_io)
+
+def _diff(expected: str, output: str):
+    lines = list(difflib.unified_diff(expected.splitlines(), output.splitlines(),
+                                      "esperado", "obtenido", lineterm=""))
+    if len(lines) > MAX_DIFF_LINES:
+        lines = lines[:MAX_DIFF_LINES] + [f"... ({len(lines) - MAX_DIFF_LINES} líneas más)"]
+    return lines
+
+def run_vector(item):
+    """Ejecuta un vector (índice, vector); devuelve su entrada del informe."""
+    index, vector = item
+    result = {"indice": index, "nombre": vector["nombre"], "estado": "correcto", "tiempo_ms": 0.0,
+              "entradas_leidas": 0}
+    output = io.StringIO()
+    program_io = ProgramIO(stream=output, policy=FLUSH_END, lines=vector["entrada"])
+    start = time.perf_counter()
+    try:
+        _worker["new_executor"](program_io).run()
+    except Exception as e:
+        # Lo que el ejecutor no captura no debe parar el resto de vectores
+        result["estado"] = "fallo_interno"
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["tiempo_ms"] = round((time.perf_counter() - start) * 1000, 3)
+    program_io.flush()
+    text = output.getvalue()
+    result["entradas_leidas"] = program_io.lines_read
+    if result["estado"] == "fallo_interno":
+        return result
+
+    expected = vector["esperado"]
+    if expected is None:
+        result["estado"] = "sin_esperado"
+        result["salida"] = text
+    elif text != expected:
+        # Un error en ejecución que el vector no esperaba cuenta aparte
+        # (el mensaje puede seguir a un prompt de input en la misma línea)
+        errors = [line for line in text.splitlines() if RUNTIME_ERROR in line]
+        if errors and RUNTIME_ERROR not in expected:
+            result["estado"] = "error_ejecucion"
+            result["error"] = errors[0][errors[0].index(RUNTIME_ERROR):]
+        else:
+            result["estado"] = "salida_distinta"
+        result["diff"] = _diff(expected, text)
+    return result
+
+# ------------------------
+# LOTE DE VECTORES
+# ------------------------
+def compile_program(code: str):
+    """Front end y optimizador una sola vez; lanza SyntaxError o ValueError si el programa no es válido."""
+    _, ast, analyzer = run_front_end(code)
+    if analyzer.errors:
+        raise ValueError("; ".join(analyzer.errors))
+    statements, _ = optimize(ast.body)
+    return statements
+
+def run_vectors(statements, vectors, mode: str = "native", processes: int = None):
+    """Resultados de run_vector para cada vector, en el orden en que terminan."""
+    processes = processes or os.cpu_count() or 1
+    program_data = [to_data(statement) for statement in statements]
+    items = list(enumerate(vectors))
+    if processes == 1 or len(items) < 2:
+        _init_worker(program_data, mode)
+        yield from map(run_vector, items)
+        return
+    # Como en lote.py: bloques grandes, pero varios por proceso para repartir el final
+    chunksize = max(1, len(items) // (processes * 8))
+    with Pool(processes, initializer=_init_worker, initargs=(program_data, mode)) as pool:
+        yield from pool.imap_unordered(run_vector, items, chunksize)
+
+class VectorReport:
+    """Informe JSON Lines de un lote de vectores, ordenado por vector."""
+
+    def __init__(self, program: str, mode: str, processes: int):
+        self.program = program
+        self.mode = mode
+        self.processes = processes
+        self.counts = dict.fromkeys(STATUSES, 0)
+        self.results = []
+        self.elapsed = 0.0
+        self.compile_time = 0.0
+
+    def add(self, result):
+        self.counts[result["estado"]] += 1
+        self.results.append(result)
+
+    @property
+    def ok(self) -> bool:
+        return self.counts["correcto"] + self.counts["sin_esperado"] == len(self.results)
+
+    def summary(self):
+        times = sorted(result["tiempo_ms"] for result in self.results)
+        return {
+            "programa": self.program,
+            "modo": self.mode,
+            "vectores": len(self.results),
+            "estados": self.counts,
+            "procesos": self.processes,
+            "compilacion_ms": round(self.compile_time * 1000, 3),
+            "segundos": round(self.elapsed, 3),
+            "vectores_por_segundo": round(len(self.results) / self.elapsed, 1) if self.elapsed else None,
+            "tiempo_ms": {
+                "total": round(sum(times), 3),
+                "mediana": times[len(times) // 2] if times else 0.0,
+                "maximo": times[-1] if times else 0.0,
+            },
+        }
+
+    def write(self, file):
+        file.write(json.dumps({"resumen": self.summary()}, ensure_ascii=False) + "\n")
+        self.results.sort(key=lambda result: result["indice"])
+        file.writelines(json.dumps(result, ensure_ascii=False) + "\n" for result in self.results)
+
+    def format_summary(self) -> str:
+        summary = self.summary()
+        states = ", ".join(f"{state.replace('_', ' ')}: {count}"
+                           for state, count in self.counts.items() if count)
+        times = summary["tiempo_ms"]
+        lines = [f"{len(self.results)} vectores en {self.elapsed:.2f} s con {self.processes} procesos "
+                 f"({summary['vectores_por_segundo'] or 0:.0f} vectores/s, modo {self.mode})",
+                 f"Estados: {states or 'ninguno'}",
+                 f"Tiempo por vector: mediana {times['mediana']:.2f} ms, máximo {times['maximo']:.2f} ms"]
+        failed = [result for result in sorted(self.results, key=lambda result: result["indice"])
+                  if result["estado"] not in ("correcto", "sin_esperado")]
+        for result in failed[:10]:
+            lines.append(f"  ✗ {result['nombre']}: {result['estado'].replace('_', ' ')}"
+                         + (f" ({result['error']})" if "error" in result else ""))
+        if len(failed) > 10:
+            lines.append(f"  ... y {len(failed) - 10} más")
+        return "\n".join(lines)
+
+def run_batch(program_path: str, vectors_path: str, mode: str = "native", processes: int = None) -> VectorReport:
+    processes = processes or os.cpu_count() or 1
+    with open(program_path, "r", encoding="utf-8") as file:
+        code = file.read()
+    vectors = load_vectors(vectors_path)
+    report = VectorReport(program_path, mode, processes)
+    start = time.perf_counter()
+    statements = compile_program(code)
+    report.compile_time = time.perf_counter() - start
+    for result in run_vectors(statements, vectors, mode, processes):
+        report.add(result)
+    report.elapsed = time.perf_counter() - start
+    return report
+
+def main():
+    import argparse
+
+    from compilador import EXECUTION_MODES
+
+    arg_parser = argparse.ArgumentParser(description="Ejecuta un programa contra vectores de entrada y salida esperada")
+    arg_parser.add_argument("programa", help="archivo .py a ejecutar")
+    arg_parser.add_argument("vectores", help="archivo JSON Lines con 'entrada' y 'esperado' por vector")
+    arg_parser.add_argument("--modo", choices=sorted(EXECUTION_MODES), default="native",
+                            help="modo de ejecución (por defecto: native)")
+    arg_parser.add_argument("-j", "--procesos", type=int, default=None,
+                            help="procesos del pool (por defecto: uno por núcleo)")
+    arg_parser.add_argument("-o", "--salida", default="reporte_vectores.jsonl",
+                            help="archivo del informe JSON Lines ('-' para stdout)")
+    args = arg_parser.parse_args()
+
+    for path in (args.programa, args.vectores):
+        if not os.path.exists(path):
+            print(f"❌ {path} no existe.")
+            sys.exit(2)
+
+    try:
+        report = run_batch(args.programa, args.vectores, args.modo, args.procesos)
+    except SyntaxError as e:
+        print(e)
+        sys.exit(2)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(2)
+
+    if args.salida == "-":
+        report.write(sys.stdout)
+        print(report.format_summary(), file=sys.stderr)
+    else:
+        with open(args.salida, "w", encoding="utf-8") as file:
+            report.write(file)
+        print(report.format_summary())
+        print(f"Informe: {args.salida}")
+
+    # Código de salida distinto de cero si algún vector no coincide
+    sys.exit(0 if report.ok else 1)
+
+if __name__ == "__main__":
+    main()